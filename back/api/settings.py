@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "users.middleware.QueryMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -47,6 +49,10 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "users.authentication.CookieJwtAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "users.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -56,6 +62,75 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": False,
 }
 
+# Authenticate access tokens from their claims instead of loading the user row.
+JWT_STATELESS_AUTH = os.environ.get("JWT_STATELESS_AUTH", "false").lower() in {"1", "true", "yes"}
+JWT_USER_CACHE_TTL = int(os.environ.get("JWT_USER_CACHE_TTL", "60"))
+JWT_USER_CACHE_SIZE = int(os.environ.get("JWT_USER_CACHE_SIZE", "1024"))
+
+# Process-local Bloom filter of blacklisted refresh tokens; refreshes only
+# query the blacklist for tokens it cannot rule out. New blacklist rows from
+# other processes are picked up within JWT_BLACKLIST_SYNC_INTERVAL seconds.
+JWT_BLACKLIST_SYNC_INTERVAL = float(os.environ.get("JWT_BLACKLIST_SYNC_INTERVAL", "5"))
+JWT_BLACKLIST_BLOOM_CAPACITY = int(os.environ.get("JWT_BLACKLIST_BLOOM_CAPACITY", "100000"))
+JWT_BLACKLIST_BLOOM_ERROR_RATE = float(os.environ.get("JWT_BLACKLIST_BLOOM_ERROR_RATE", "0.001"))
+
+# Maximum number of matched students per teacher for bulk auto-matching.
+MATCHING_TEACHER_CAPACITY = int(os.environ.get("MATCHING_TEACHER_CAPACITY", "10"))
+
+# "durable" writes lesson events in the request transaction; "batched" buffers
+# them per process and bulk-inserts after commit, retrying rows that fail for
+# up to LESSON_EVENT_FLUSH_ATTEMPTS flushes.
+LESSON_EVENT_LOG_MODE = os.environ.get("LESSON_EVENT_LOG_MODE", "durable")
+LESSON_EVENT_BATCH_SIZE = int(os.environ.get("LESSON_EVENT_BATCH_SIZE", "100"))
+LESSON_EVENT_FLUSH_INTERVAL = float(os.environ.get("LESSON_EVENT_FLUSH_INTERVAL", "1.0"))
+LESSON_EVENT_FLUSH_ATTEMPTS = int(os.environ.get("LESSON_EVENT_FLUSH_ATTEMPTS", "3"))
+
+# Server-sent lesson events (lessons/events/, answered with 501 outside ASGI,
+# see README.md for running under uvicorn). The local broker
+# only reaches subscribers in the publishing process; with several workers use
+# users.streams.PostgresBroker, which relays events through LISTEN/NOTIFY.
+LESSON_STREAM_BROKER = os.environ.get("LESSON_STREAM_BROKER", "users.streams.LocalBroker")
+LESSON_STREAM_HEARTBEAT = float(os.environ.get("LESSON_STREAM_HEARTBEAT", "15"))
+LESSON_STREAM_QUEUE_SIZE = int(os.environ.get("LESSON_STREAM_QUEUE_SIZE", "100"))
+LESSON_STREAM_REPLAY_LIMIT = int(os.environ.get("LESSON_STREAM_REPLAY_LIMIT", "500"))
+LESSON_STREAM_RETRY_MS = int(os.environ.get("LESSON_STREAM_RETRY_MS", "3000"))
+
+# Per-view SQL query budgets checked by users.middleware.QueryMetricsMiddleware,
+# set to the counts measured by users/tests/test_query_budgets.py, which calls
+# every view listed here. Counts include the savepoints Django's TestCase wraps
+# around atomic blocks. Exceeding a budget raises during test runs (or when
+# QUERY_BUDGET_ENFORCE=true).
+QUERY_BUDGETS = {
+    "AuthMeView": 1,
+    "StudentMeView": 3,
+    "SubmitApplicationView": 2,
+    "TeacherMeView": 3,
+    "StudentDashboardView": 4,
+    "TeacherDashboardView": 4,
+    "TeachersListView": 2,
+    "TeacherSlotsView": 3,
+    "AvailabilityBlockListCreateView": 2,
+    "AvailabilityBlockDetailView": 3,
+    "AdminApplicationsListView": 2,
+    "AdminApplicationDetailView": 2,
+    "AdminApplicationMatchView": 5,
+    "LessonListCreateView": 7,
+    "LessonSeriesCreateView": 8,
+    "LessonEventStreamView": 1,
+    "LessonDetailView": 2,
+    "LessonProposeView": 8,
+    "LessonConfirmView": 12,
+    "LessonCancelView": 10,
+    "LessonBulkConfirmView": 12,
+    "LessonBulkCancelView": 10,
+    "CalendarFeedTokenView": 3,
+    "calendar_feed": 3,
+}
+QUERY_BUDGET_ENFORCE = os.environ.get(
+    "QUERY_BUDGET_ENFORCE", "true" if sys.argv[1:2] == ["test"] else "false"
+).lower() in {"1", "true", "yes"}
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 ROOT_URLCONF = "api.urls"
 
 TEMPLATES = [
@@ -73,6 +148,10 @@ TEMPLATES = [
     }
 ]
 
+# The API is deployed under ASGI (see README.md). AsyncReadAPIView routes are
+# coroutines, so a WSGI server runs each of them through async_to_sync; the
+# WSGI application is only kept for runserver and management tooling.
+ASGI_APPLICATION = "api.asgi.application"
 WSGI_APPLICATION = "api.wsgi.application"
 
 if os.environ.get("POSTGRES_DB"):
@@ -84,8 +163,38 @@ if os.environ.get("POSTGRES_DB"):
             "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
             "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
             "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # Persistent connections only suit sync (WSGI) workers. Under ASGI,
+            # the default deployment, each request runs its queries in a fresh
+            # thread, so set POSTGRES_POOL there.
+            "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": os.environ.get("POSTGRES_CONN_HEALTH_CHECKS", "true").lower() in {"1", "true", "yes"},
+            "OPTIONS": {},
         }
     }
+
+    # psycopg connection pool, one per process. Django does not combine it
+    # with persistent connections, so the pool owns connection lifetime and
+    # CONN_HEALTH_CHECKS turns on its connection check.
+    if os.environ.get("POSTGRES_POOL", "false").lower() in {"1", "true", "yes"}:
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("POSTGRES_POOL_MAX_IDLE", "300")),
+            "max_lifetime": float(os.environ.get("POSTGRES_POOL_MAX_LIFETIME", "3600")),
+        }
+
+    # Optional streaming replica; list and detail GET views read from it.
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = {
+            **DATABASES["default"],
+            "HOST": os.environ["POSTGRES_REPLICA_HOST"],
+            "PORT": os.environ.get("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+            "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_ROUTERS = ["users.routers.ReadReplicaRouter"]
 else:
     DATABASES = {
         "default": {
@@ -94,6 +203,29 @@ else:
         }
     }
 
+# Local memory by default. RESPONSE_CACHE_URL points the response cache at
+# Redis or any server speaking its protocol (needs the redis package).
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+if os.environ.get("RESPONSE_CACHE_URL"):
+    CACHES["responses"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["RESPONSE_CACHE_URL"],
+    }
+else:
+    CACHES["responses"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "responses",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "10000"))},
+    }
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+# Rendered iCalendar feeds live in the response cache; they are keyed by
+# version, so the TTL only bounds memory held for idle feeds.
+CALENDAR_FEED_CACHE_TTL = int(os.environ.get("CALENDAR_FEED_CACHE_TTL", "86400"))
+CALENDAR_UID_DOMAIN = os.environ.get("CALENDAR_UID_DOMAIN", "lang")
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
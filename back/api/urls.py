@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from users.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("users.urls")),
+    path("metrics/", metrics_view, name="metrics"),
 ]
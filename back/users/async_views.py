@@ -0,0 +1,93 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+def is_asgi(request):
+    """Whether the (DRF or Django) request is being served by the ASGI handler."""
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+class AsyncReadAPIView(APIView):
+    """
+    APIView whose read handlers (``get``) are coroutines served on the
+    event loop, with async authentication and no thread hop of their own.
+
+    Every other method keeps the regular sync DRF pipeline and runs in a
+    worker thread, so write paths behave exactly as before. Authenticators
+    may provide ``aauthenticate``; those that do not run in a thread.
+    """
+
+    async_methods = {"get", "head"}
+
+    # Handlers are mixed sync/async on purpose; the sync half is served by
+    # the regular DRF view, which must not be marked as a coroutine.
+    view_is_async = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        sync_view = sync_to_async(super().as_view(**initkwargs))
+
+        async def view(request, *args, **kwargs):
+            if request.method.lower() not in cls.async_methods:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.setup(request, *args, **kwargs)
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        view.cls = cls
+        view.initkwargs = initkwargs
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # APIView.initial() minus its lazy sync authentication.
+            self.format_kwarg = self.get_format_suffix(**kwargs)
+            request.accepted_renderer, request.accepted_media_type = self.perform_content_negotiation(request)
+            request.version, request.versioning_scheme = self.determine_version(request, *args, **kwargs)
+            await self.aperform_authentication(request)
+            self.check_permissions(request)
+            self.check_throttles(request)
+            handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return await self._rendered(self.response)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None) or sync_to_async(authenticator.authenticate)
+            result = await authenticate(request)
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+        request._authenticator = None
+        request._not_authenticated()
+
+    async def _rendered(self, response):
+        # A response with a render() method makes Django render it in a
+        # worker thread; hand back plain bytes instead. JSON renders inline,
+        # the browsable API may touch the ORM and renders in a thread.
+        if not isinstance(response, Response):
+            return response
+        if getattr(response.accepted_renderer, "format", None) == "json":
+            content = response.rendered_content
+        else:
+            content = await sync_to_async(lambda: response.rendered_content)()
+        rendered = HttpResponse(content, status=response.status_code)
+        for key, value in response.items():
+            rendered[key] = value
+        rendered.cookies = response.cookies
+        return rendered
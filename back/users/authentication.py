@@ -1,36 +1,212 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 from rest_framework.exceptions import AuthenticationFailed
 
+from .profiles import PROFILE_RELATIONS
+
+
+class UserCache:
+    """
+    Process-local LRU cache of full user rows with a per-entry TTL.
+    """
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user_id, user):
+        with self._lock:
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, "JWT_USER_CACHE_TTL", 60),
+    maxsize=getattr(settings, "JWT_USER_CACHE_SIZE", 1024),
+)
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight user built from access token claims (see UserRefreshToken).
+    """
+
+    @cached_property
+    def id(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", "student")
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+
+def resolve_user(user):
+    """
+    Returns the full CustomUser row for ``user``, going through the
+    process-local cache when ``user`` is a ClaimsUser.
+    """
+    if not isinstance(user, ClaimsUser):
+        return user
+
+    full_user = user_cache.get(user.id)
+    if full_user is None:
+        full_user = get_user_model().objects.get(pk=user.id)
+        user_cache.set(user.id, full_user)
+    return full_user
+
+
+async def aresolve_user(user):
+    """Async counterpart of ``resolve_user``."""
+    if not isinstance(user, ClaimsUser):
+        return user
+
+    full_user = user_cache.get(user.id)
+    if full_user is None:
+        full_user = await get_user_model().objects.aget(pk=user.id)
+        user_cache.set(user.id, full_user)
+    return full_user
+
+
 class CookieJwtAuthentication(JWTAuthentication):
     """
     Custom JWT authentication class that retrieves the token from a cookie.
+
+    With ``JWT_STATELESS_AUTH`` enabled, tokens that carry the role claims are
+    turned into a ClaimsUser instead of loading the user from the database.
     """
     def authenticate(self, request):
-        token = request.COOKIES.get('access_token')
-
-        if not token:
-            print("No token found in cookies")
+        validated_token = self._validated_token(request)
+        if validated_token is None:
             return None
+
+        user = self._claims_user(validated_token)
+        if user is not None:
+            return user, validated_token
+
         try:
-            validated_token = self.get_validated_token(token)
+            user = self.get_user(validated_token)
+            return user, validated_token
+
         except AuthenticationFailed as e:
-            raise AuthenticationFailed('Invalid token' + str(e))
-        
+            raise AuthenticationFailed('User not found' + str(e))
+
+    async def aauthenticate(self, request):
+        """
+        Async counterpart of ``authenticate`` for views served on the event
+        loop; the user row is loaded through the async ORM.
+        """
+        validated_token = self._validated_token(request)
+        if validated_token is None:
+            return None
+
+        user = self._claims_user(validated_token)
+        if user is not None:
+            return user, validated_token
 
         try:
-            user = self.get_user(validated_token)
+            user = await self.aget_user(validated_token)
             return user, validated_token
-            
+
         except AuthenticationFailed as e:
             raise AuthenticationFailed('User not found' + str(e))
-        
-        
-        
-        
+
+    def get_user(self, validated_token):
+        try:
+            user = self.get_user_queryset().get(**{api_settings.USER_ID_FIELD: self._user_id(validated_token)})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        return self._checked_user(validated_token, user)
+
+    async def aget_user(self, validated_token):
+        try:
+            user = await self.get_user_queryset().aget(**{api_settings.USER_ID_FIELD: self._user_id(validated_token)})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        return self._checked_user(validated_token, user)
+
+    def get_user_queryset(self):
+        # The caller's role profile is joined in; see users.profiles.role_profile.
+        return self.user_model.objects.select_related(*PROFILE_RELATIONS)
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+    def _checked_user(self, validated_token, user):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+
+        return user
+
+    def _validated_token(self, request):
+        token = request.COOKIES.get('access_token')
+
+        if not token:
+            return None
+        try:
+            return self.get_validated_token(token)
+        except AuthenticationFailed as e:
+            raise AuthenticationFailed('Invalid token' + str(e))
+
+    def _claims_user(self, validated_token):
+        if getattr(settings, "JWT_STATELESS_AUTH", False) and "role" in validated_token:
+            user = ClaimsUser(validated_token)
+            if not user.is_active:
+                raise AuthenticationFailed('User is inactive')
+            return user
+        return None
 
     # def get_raw_token(self, request):
     #     """
     #     Extracts the raw JWT token from the 'jwt' cookie.
     #     """
     #     cookie_token = request.COOKIES.get('jwt')
-    #     return cookie_token
\ No newline at end of file
+    #     return cookie_token
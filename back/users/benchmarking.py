@@ -0,0 +1,490 @@
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from rest_framework.renderers import JSONRenderer
+
+from .counters import reconcile_counters
+from .models import (
+    AvailabilityBlock,
+    CustomUser,
+    Lesson,
+    LessonEventLog,
+    StudentProfile,
+    TeacherProfile,
+    profile_completion_percent,
+)
+from .renderers import ORJSONRenderer
+from .serializers import LessonSerializer, fast_lesson_serializer
+from .tokens import UserRefreshToken
+
+BENCH_EMAIL_DOMAIN = "bench.invalid"
+BENCH_PASSWORD = "bench-password"
+BENCH_HOST = "localhost"
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+TRACKS = ["art", "cooking", "business", "engineering", "general"]
+FOCUS_SKILLS = ["spoken", "listening", "writing", "reading", "pronunciation", "grammar", "vocabulary"]
+LESSON_STATUSES = ["requested", "proposed", "confirmed", "canceled", "completed"]
+LESSON_STATUS_WEIGHTS = [0.15, 0.1, 0.45, 0.1, 0.2]
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def bench_email(role, index):
+    return f"{role}-{index}@{BENCH_EMAIL_DOMAIN}"
+
+
+def clear_benchmark_data():
+    """Deletes every benchmark user; profiles, lessons and events cascade."""
+    deleted, _ = CustomUser.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").delete()
+    return deleted
+
+
+class _TableWriter:
+    """
+    Inserts plain row tuples for a model: COPY on PostgreSQL, bulk_create
+    elsewhere. Columns the caller leaves out take the field default, and
+    auto_now(_add) columns take ``now``.
+    """
+
+    def __init__(self, model, now):
+        self.model = model
+        self.fields = list(model._meta.concrete_fields)
+        self.defaults = {}
+        for field in self.fields:
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                self.defaults[field.attname] = now
+            else:
+                self.defaults[field.attname] = field.get_default()
+
+    def reserve_ids(self, count):
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)", [table, count]
+                )
+                return [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {connection.ops.quote_name(table)}")
+            first = cursor.fetchone()[0] + 1
+        return list(range(first, first + count))
+
+    def row(self, **values):
+        return [values[field.attname] if field.attname in values else self.defaults[field.attname] for field in self.fields]
+
+    def insert(self, rows, batch_size):
+        if connection.vendor != "postgresql":
+            attnames = [field.attname for field in self.fields]
+            self.model.objects.bulk_create(
+                [self.model(**dict(zip(attnames, row))) for row in rows], batch_size=batch_size
+            )
+            return
+
+        json_columns = [index for index, field in enumerate(self.fields) if field.get_internal_type() == "JSONField"]
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in self.fields)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    for index in json_columns:
+                        row[index] = json.dumps(row[index])
+                    copy.write_row(row)
+
+
+def seed_benchmark_data(teachers=2000, students=20000, lessons=200000, seed=42, batch_size=5000, log=None):
+    """
+    Generates a deterministic dataset of users and profiles, weekly
+    availability blocks, lessons and their event logs, streamed into the
+    tables as plain rows. The columns save() and signals would maintain
+    (profile completion, lesson counters) are filled in as well.
+
+    Lessons are laid out on an hourly grid where every teacher and every
+    student has at most one lesson per hour, so confirmed lessons never
+    violate the overlap constraints.
+    """
+    log = log or (lambda message: None)
+    if students < teachers:
+        raise ValueError("students must be >= teachers so each hour has distinct students")
+
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)
+    now = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    started = time.perf_counter()
+    users = _TableWriter(CustomUser, now)
+
+    def add_users(role, count, **extra):
+        ids = users.reserve_ids(count)
+        users.insert(
+            [
+                users.row(
+                    id=user_id, email=bench_email(role, index), username=bench_email(role, index),
+                    password=password, full_name=f"{role.title()} {index}", role=role, **extra,
+                )
+                for index, user_id in enumerate(ids)
+            ],
+            batch_size,
+        )
+        return ids
+
+    with transaction.atomic():
+        admin_email = bench_email("admin", 0)
+        add_users("admin", 1)
+
+        teacher_user_ids = add_users("teacher", teachers, timezone="Europe/Paris")
+        teacher_writer = _TableWriter(TeacherProfile, now)
+        teacher_ids = teacher_writer.reserve_ids(teachers)
+        teacher_writer.insert(
+            [
+                teacher_writer.row(
+                    id=teacher_id, user_id=user_id, languages=["fr"],
+                    levels_supported=rng.sample(LEVELS, 3), teaching_tracks=rng.sample(TRACKS, 2),
+                    bio_short="Benchmark teacher",
+                )
+                for teacher_id, user_id in zip(teacher_ids, teacher_user_ids)
+            ],
+            batch_size,
+        )
+
+        block_writer = _TableWriter(AvailabilityBlock, now)
+        block_ids = iter(block_writer.reserve_ids(teachers * 4))
+        blocks = []
+        for teacher_id in teacher_ids:
+            for day in rng.sample(range(7), 4):
+                start_hour = rng.choice([8, 9, 10])
+                blocks.append(
+                    block_writer.row(
+                        id=next(block_ids), teacher_id=teacher_id, day_of_week=day, start_time=dt_time(start_hour),
+                        end_time=dt_time(start_hour + rng.choice([2, 3, 4])), slot_duration=rng.choice([30, 60]),
+                    )
+                )
+        block_writer.insert(blocks, batch_size)
+        log(f"Seeded {teachers} teachers in {time.perf_counter() - started:.1f}s")
+
+        student_user_ids = add_users("student", students)
+        student_writer = _TableWriter(StudentProfile, now)
+        student_ids = student_writer.reserve_ids(students)
+        student_rows = []
+        for index, (student_id, user_id) in enumerate(zip(student_ids, student_user_ids)):
+            profile = dict(
+                id=student_id, user_id=user_id, cefr_level=rng.choice(LEVELS), preparing_for="job",
+                target_field=rng.choice(TRACKS), target_start_date_unknown=True,
+                focus_skills=rng.sample(FOCUS_SKILLS, 2), learning_style=["conversation_heavy"],
+                weekly_time_budget_hours=rng.randint(1, 6), preferred_session_duration=60,
+                books_resources_text="Benchmark books", availability_notes="Evenings",
+                # Every seventh application leaves a field out, so completion varies.
+                homework_preference="" if index % 7 == 0 else "standard",
+                goals_summary="Benchmark goals", terms_accepted_at=now, privacy_accepted_at=now,
+                application_status="matched" if index % 5 else "submitted",
+                submitted_at=now - timedelta(days=rng.randint(1, 60)),
+                matched_teacher_id=teacher_ids[index % teachers] if index % 5 else None,
+            )
+            # COPY skips StudentProfile.save(), which maintains completion_percent.
+            user = CustomUser(email=bench_email("student", index), full_name=f"Student {index}", timezone="UTC")
+            profile["completion_percent"] = profile_completion_percent(StudentProfile(**profile), user)
+            student_rows.append(student_writer.row(**profile))
+        student_writer.insert(student_rows, batch_size)
+        log(f"Seeded {students} students in {time.perf_counter() - started:.1f}s")
+
+        lesson_writer = _TableWriter(Lesson, now)
+        event_writer = _TableWriter(LessonEventLog, now)
+        start_hour = -(lessons // teachers) // 2
+        for offset in range(0, lessons, batch_size):
+            count = min(batch_size, lessons - offset)
+            lesson_rows, event_rows = [], []
+            for index, lesson_id in zip(range(offset, offset + count), lesson_writer.reserve_ids(count)):
+                hour, teacher_index = divmod(index, teachers)
+                student_index = (hour * teachers + teacher_index) % students
+                starts_at = now + timedelta(hours=start_hour + hour)
+                lesson_status = rng.choices(LESSON_STATUSES, LESSON_STATUS_WEIGHTS)[0]
+                lesson_rows.append(
+                    lesson_writer.row(
+                        id=lesson_id, teacher_id=teacher_ids[teacher_index], student_id=student_ids[student_index],
+                        starts_at_utc=starts_at, ends_at_utc=starts_at + timedelta(minutes=60),
+                        duration_minutes=60, status=lesson_status, requested_by_role="student",
+                        status_changed_at=now,
+                    )
+                )
+                event_rows.append(
+                    event_writer.row(
+                        lesson_id=lesson_id, actor_id=student_user_ids[student_index], event_type="requested",
+                        payload_json={"starts_at_utc": str(starts_at), "duration_minutes": 60}, created_at=now,
+                    )
+                )
+                if lesson_status != "requested":
+                    event_rows.append(
+                        event_writer.row(
+                            lesson_id=lesson_id, actor_id=teacher_user_ids[teacher_index],
+                            event_type=lesson_status, payload_json={}, created_at=now,
+                        )
+                    )
+            for row, event_id in zip(event_rows, event_writer.reserve_ids(len(event_rows))):
+                row[0] = event_id
+            lesson_writer.insert(lesson_rows, batch_size)
+            event_writer.insert(event_rows, batch_size)
+            log(f"Seeded {offset + count}/{lessons} lessons in {time.perf_counter() - started:.1f}s")
+
+    # Rows were written without save() or signals, so no counters exist yet.
+    reconcile_counters(batch_size=batch_size)
+    log(f"Built lesson counters in {time.perf_counter() - started:.1f}s")
+
+    return {
+        "admin": admin_email,
+        "teachers": teachers,
+        "students": students,
+        "lessons": lessons,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+class _Worker:
+    """One benchmark thread: a set of logged-in clients reused across requests."""
+
+    def __init__(self, rng, fixtures):
+        self.rng = rng
+        self.fixtures = fixtures
+        self.clients = {}
+
+    def client_for(self, email):
+        # Cookies are minted directly so password hashing, which the login
+        # scenario measures on its own, does not dominate the run.
+        client = self.clients.get(email)
+        if client is None:
+            client = Client(SERVER_NAME=BENCH_HOST)
+            refresh = UserRefreshToken.for_user(self.fixtures["users"][email])
+            client.cookies["access_token"] = str(refresh.access_token)
+            client.cookies["refresh_token"] = str(refresh)
+            self.clients[email] = client
+        return client
+
+    def pick(self, role):
+        return self.rng.choice(self.fixtures[role])
+
+
+def _scenarios():
+    def login(worker):
+        client = Client(SERVER_NAME=BENCH_HOST)
+        email = worker.pick("students")
+        return [("login", lambda: client.post(
+            "/api/v1/auth/login/", {"email": email, "password": BENCH_PASSWORD}, content_type="application/json"
+        ))]
+
+    def auth_me(worker):
+        client = worker.client_for(worker.pick("students"))
+        return [("auth_me", lambda: client.get("/api/v1/auth/me/"))]
+
+    def lessons_list(worker):
+        role = worker.rng.choice(["students", "teachers", "admins"])
+        client = worker.client_for(worker.pick(role))
+        return [(f"lessons_list_{role}", lambda: client.get("/api/v1/lessons/"))]
+
+    def lesson_cycle(worker):
+        lesson_id, teacher_email = worker.rng.choice(worker.fixtures["requested_lessons"])
+        client = worker.client_for(teacher_email)
+        starts_at = (datetime.now(dt_timezone.utc) + timedelta(days=worker.rng.randint(400, 800))).replace(
+            minute=0, second=0, microsecond=0
+        )
+        return [
+            ("lesson_propose", lambda: client.post(
+                f"/api/v1/lessons/{lesson_id}/propose/",
+                {"starts_at_utc": starts_at.isoformat(), "duration_minutes": 60},
+                content_type="application/json",
+            )),
+            ("lesson_confirm", lambda: client.post(f"/api/v1/lessons/{lesson_id}/confirm/")),
+            ("lesson_cancel", lambda: client.post(f"/api/v1/lessons/{lesson_id}/cancel/")),
+        ]
+
+    def admin_applications(worker):
+        client = worker.client_for(worker.pick("admins"))
+        return [("admin_applications", lambda: client.get("/api/v1/admin/applications/?status=submitted"))]
+
+    return [
+        (login, 0.05),
+        (auth_me, 0.3),
+        (lessons_list, 0.35),
+        (lesson_cycle, 0.2),
+        (admin_applications, 0.1),
+    ]
+
+
+def _load_fixtures(sample_size=500):
+    domain = f"@{BENCH_EMAIL_DOMAIN}"
+    fixtures = {
+        role: list(
+            CustomUser.objects.filter(email__endswith=domain, role=role[:-1]).order_by("id").values_list("email", flat=True)[:sample_size]
+        )
+        for role in ("students", "teachers", "admins")
+    }
+    fixtures["requested_lessons"] = list(
+        Lesson.objects.filter(status="requested", teacher__user__email__endswith=domain)
+        .order_by("id")
+        .values_list("id", "teacher__user__email")[:sample_size]
+    )
+    if not all(fixtures.values()):
+        raise ValueError("Benchmark data missing; run manage.py bench_seed first")
+    emails = {*fixtures["students"], *fixtures["teachers"], *fixtures["admins"]}
+    emails.update(email for _, email in fixtures["requested_lessons"])
+    fixtures["users"] = CustomUser.objects.in_bulk(emails, field_name="email")
+    return fixtures
+
+
+def _percentiles(samples):
+    values = np.array(samples, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def run_benchmark(requests=2000, concurrency=8, seed=42, warmup=50):
+    """
+    Drives the real endpoints through Django's test client from
+    ``concurrency`` threads and returns latency percentiles, throughput,
+    status codes and query counts per scenario.
+    """
+    if BENCH_HOST not in settings.ALLOWED_HOSTS and not settings.DEBUG:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, BENCH_HOST]
+
+    fixtures = _load_fixtures()
+    scenarios = _scenarios()
+    weights = [weight for _, weight in scenarios]
+    results = {}
+    lock = threading.Lock()
+    per_worker = [requests // concurrency + (1 if index < requests % concurrency else 0) for index in range(concurrency)]
+
+    def work(index, count, record):
+        rng = random.Random(seed + index)
+        worker = _Worker(rng, fixtures)
+        local = {}
+        try:
+            for _ in range(count):
+                scenario = rng.choices(scenarios, weights)[0][0]
+                for name, call in scenario(worker):
+                    started = time.perf_counter()
+                    response = call()
+                    elapsed = time.perf_counter() - started
+                    match = SERVER_TIMING_QUERIES.search(response.get("Server-Timing", ""))
+                    entry = local.setdefault(name, {"latencies": [], "queries": [], "statuses": {}})
+                    entry["latencies"].append(elapsed)
+                    entry["queries"].append(int(match.group(1)) if match else 0)
+                    entry["statuses"][response.status_code] = entry["statuses"].get(response.status_code, 0) + 1
+        finally:
+            connection.close()
+        if record:
+            with lock:
+                for name, entry in local.items():
+                    merged = results.setdefault(name, {"latencies": [], "queries": [], "statuses": {}})
+                    merged["latencies"].extend(entry["latencies"])
+                    merged["queries"].extend(entry["queries"])
+                    for code, total in entry["statuses"].items():
+                        merged["statuses"][code] = merged["statuses"].get(code, 0) + total
+
+    if warmup:
+        work(-1, warmup, record=False)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(index, count, True)) for index, count in enumerate(per_worker)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "database": connection.vendor,
+            "requests": requests,
+            "concurrency": concurrency,
+            "seed": seed,
+            "lessons": Lesson.objects.count(),
+            "events": LessonEventLog.objects.count(),
+        },
+        "scenarios": {},
+    }
+    all_latencies = []
+    for name, entry in sorted(results.items()):
+        all_latencies.extend(entry["latencies"])
+        report["scenarios"][name] = {
+            "requests": len(entry["latencies"]),
+            "throughput_rps": round(len(entry["latencies"]) / wall, 2),
+            **_percentiles(entry["latencies"]),
+            "queries_mean": round(float(np.mean(entry["queries"])), 2),
+            "queries_max": int(max(entry["queries"])),
+            "statuses": {str(code): total for code, total in sorted(entry["statuses"].items())},
+        }
+    report["total"] = {
+        "requests": len(all_latencies),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(all_latencies) / wall, 2) if wall else None,
+        **(_percentiles(all_latencies) if all_latencies else {}),
+    }
+    return report
+
+
+def _best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def benchmark_serializers(lessons=10000, repeat=5):
+    """
+    Times a ``lessons``-row lesson response through ModelSerializer plus
+    JSONRenderer against the ``.values()`` fast serializer plus
+    ORJSONRenderer, and checks both produce the same bytes.
+    """
+    queryset = Lesson.objects.order_by("starts_at_utc", "id")[:lessons]
+    count = queryset.count()
+    if not count:
+        raise ValueError("Benchmark data missing; run manage.py bench_seed first")
+
+    drf_renderer, fast_renderer = JSONRenderer(), ORJSONRenderer()
+    instances = list(queryset)
+    rows = list(fast_lesson_serializer.values(queryset))
+    paths = {
+        "drf": {
+            "fetch": lambda: list(queryset.all()),
+            "serialize": lambda: LessonSerializer(instances, many=True).data,
+            "render": drf_renderer.render,
+        },
+        "fast": {
+            "fetch": lambda: list(fast_lesson_serializer.values(queryset)),
+            "serialize": lambda: fast_lesson_serializer.many(rows),
+            "render": fast_renderer.render,
+        },
+    }
+
+    report = {"meta": {"database": connection.vendor, "lessons": count, "repeat": repeat}}
+    content = {}
+    for name, path in paths.items():
+        fetch, _ = _best_of(repeat, path["fetch"])
+        serialize, data = _best_of(repeat, path["serialize"])
+        render, content[name] = _best_of(repeat, lambda: path["render"](data))
+        report[name] = {
+            "fetch_ms": round(fetch * 1000, 3),
+            "serialize_ms": round(serialize * 1000, 3),
+            "render_ms": round(render * 1000, 3),
+            "total_ms": round((fetch + serialize + render) * 1000, 3),
+            "bytes": len(content[name]),
+        }
+    report["identical"] = content["drf"] == content["fast"]
+    report["speedup"] = {
+        stage: round(report["drf"][stage] / report["fast"][stage], 2) if report["fast"][stage] else None
+        for stage in ("fetch_ms", "serialize_ms", "render_ms", "total_ms")
+    }
+    return report
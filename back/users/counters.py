@@ -0,0 +1,302 @@
+import datetime
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Case, Count, DateField, DateTimeField, F, Func, OuterRef, Q, Subquery, Sum, Value, When
+from django.utils import timezone
+
+from .models import Lesson, StudentCounters, StudentProfile, TeacherCounters, TeacherProfile, TeacherWeeklyLoad
+from .response_cache import ROLE_SCOPE, invalidate_responses
+from .slots import zone_or_utc
+
+STATUS_FIELDS = {status: f"{status}_lessons" for status, _ in Lesson.STATUS_CHOICES}
+# Statuses whose minutes count towards TeacherWeeklyLoad.
+BOOKED_STATUSES = ("confirmed", "completed")
+
+LessonState = namedtuple("LessonState", ["teacher_id", "student_id", "status", "starts_at_utc", "duration_minutes"])
+
+
+def lesson_state(lesson):
+    return LessonState(*(getattr(lesson, name) for name in LessonState._fields))
+
+
+def loaded_lesson_state(lesson):
+    """The counted columns ``lesson`` was loaded with, or None when they are not known."""
+    loaded = lesson.__dict__.get("_loaded_values")
+    if loaded is None or any(name not in loaded for name in LessonState._fields):
+        return None
+    return LessonState(*(loaded[name] for name in LessonState._fields))
+
+
+def saved_lesson_state(lesson, before, update_fields):
+    """The counted columns a save with ``update_fields`` left in the row, given the loaded ``before``."""
+    after = lesson_state(lesson)
+    if update_fields is None:
+        return after
+    return LessonState(
+        *(
+            value if name in update_fields or name.removesuffix("_id") in update_fields else previous
+            for name, value, previous in zip(LessonState._fields, after, before)
+        )
+    )
+
+
+def week_start(value, tz_name=None):
+    """The Monday of ``value``'s week in the ``tz_name`` zone, or in UTC when the zone is unknown."""
+    day = value.astimezone(zone_or_utc(tz_name)).date()
+    return day - datetime.timedelta(days=day.weekday())
+
+
+class LocalWeekStart(Func):
+    """SQL counterpart of ``week_start``: LocalWeekStart(timestamp, zone name)."""
+
+    arity = 2
+    arg_joiner = " AT TIME ZONE "
+    template = "(date_trunc('week', %(expressions)s))::date"
+    output_field = DateField()
+
+
+def teacher_zones(teacher_ids):
+    return dict(TeacherProfile.objects.filter(pk__in=teacher_ids).values_list("pk", "user__timezone"))
+
+
+def _case_deltas(changes, key_q):
+    names = sorted({name for deltas in changes.values() for name in deltas})
+    return {
+        name: F(name)
+        + Case(
+            *(When(key_q(key), then=Value(deltas[name])) for key, deltas in changes.items() if deltas.get(name)),
+            default=Value(0),
+        )
+        for name in names
+    }
+
+
+def _increment_counters(model, changes, now):
+    """Adds ``{pk: {field: delta}}`` to existing rows; returns the pks that have no row."""
+    if not changes:
+        return []
+    if len(changes) == 1:
+        ((pk, deltas),) = changes.items()
+        updated = model.objects.filter(pk=pk).update(updated_at=now, **{name: F(name) + delta for name, delta in deltas.items()})
+        return [] if updated else [pk]
+    with transaction.atomic():
+        # Locked in key order first; a multi-row UPDATE locks in scan order.
+        present = list(model.objects.select_for_update().filter(pk__in=changes).order_by("pk").values_list("pk", flat=True))
+        if present:
+            model.objects.filter(pk__in=present).update(updated_at=now, **_case_deltas(changes, lambda pk: Q(pk=pk)))
+    present = set(present)
+    return [pk for pk in changes if pk not in present]
+
+
+def _increment_weeks(weeks, create):
+    """Adds ``{(teacher id, week): minutes}`` to the loads, with ``create`` adding the rows new weeks need."""
+    if not weeks:
+        return
+    new = [TeacherWeeklyLoad(teacher_id=teacher_id, week_start=week) for (teacher_id, week), minutes in weeks.items() if minutes > 0]
+    if create and new:
+        # A week without a row has no booked minutes yet.
+        TeacherWeeklyLoad.objects.bulk_create(new, ignore_conflicts=True)
+    keys = Q()
+    for teacher_id, week in weeks:
+        keys |= Q(teacher_id=teacher_id, week_start=week)
+    deltas = {key: {"booked_minutes": minutes} for key, minutes in weeks.items()}
+    # Writers lock the teacher's counters first, so these rows need no ordering of their own.
+    TeacherWeeklyLoad.objects.filter(keys).update(**_case_deltas(deltas, lambda key: Q(teacher_id=key[0], week_start=key[1])))
+
+
+def with_workload(teachers):
+    """Annotates each teacher's booked minutes in their current local week as ``minutes_this_week``."""
+    current_week = LocalWeekStart(Value(timezone.now(), output_field=DateTimeField()), F("user__timezone"))
+    minutes = TeacherWeeklyLoad.objects.filter(teacher=OuterRef("pk"), week_start=OuterRef("current_week_start"))
+    return teachers.alias(current_week_start=current_week).annotate(
+        minutes_this_week=Subquery(minutes.values("booked_minutes")[:1])
+    )
+
+
+class CounterChanges:
+    """
+    Collects counter deltas for a set of lesson and match changes and
+    applies them as F() updates in the caller's transaction.
+
+    Rows are updated in a fixed order (teachers, students, then weeks, each
+    by key) so concurrent writers cannot deadlock, and a teacher's row is
+    always locked before their weekly rows, which reconcile relies on. A
+    missing counters row is rebuilt from the lessons instead, which already
+    include the change. Weeks are the teachers' local weeks, so booked
+    minutes are keyed by start time until ``apply`` looks up the zones.
+    """
+
+    def __init__(self):
+        self.teachers = defaultdict(Counter)
+        self.students = defaultdict(Counter)
+        self.bookings = Counter()
+
+    def lesson(self, before, after):
+        if before == after:
+            return
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            field = STATUS_FIELDS[state.status]
+            self.teachers[state.teacher_id][field] += sign
+            self.students[state.student_id][field] += sign
+            if state.status in BOOKED_STATUSES:
+                self.bookings[(state.teacher_id, state.starts_at_utc)] += sign * state.duration_minutes
+
+    def match(self, before_teacher_id, after_teacher_id):
+        if before_teacher_id == after_teacher_id:
+            return
+        if before_teacher_id is not None:
+            self.teachers[before_teacher_id]["matched_students"] -= 1
+        if after_teacher_id is not None:
+            self.teachers[after_teacher_id]["matched_students"] += 1
+
+    def _weeks(self):
+        bookings = {key: minutes for key, minutes in self.bookings.items() if minutes}
+        if not bookings:
+            return {}
+        zones = teacher_zones({teacher_id for teacher_id, _ in bookings})
+        weeks = Counter()
+        for (teacher_id, starts_at), minutes in bookings.items():
+            weeks[(teacher_id, week_start(starts_at, zones.get(teacher_id)))] += minutes
+        return {key: minutes for key, minutes in sorted(weeks.items()) if minutes}
+
+    def apply(self, rebuild_missing=True):
+        weeks = self._weeks()
+        week_teachers = {teacher_id for teacher_id, _ in weeks}
+        teachers = {
+            pk: {name: delta for name, delta in deltas.items() if delta}
+            for pk, deltas in sorted(self.teachers.items())
+        }
+        teachers = {pk: deltas for pk, deltas in teachers.items() if deltas or pk in week_teachers}
+        students = {
+            pk: {name: delta for name, delta in deltas.items() if delta}
+            for pk, deltas in sorted(self.students.items())
+        }
+        students = {pk: deltas for pk, deltas in students.items() if deltas}
+        if not teachers and not students:
+            return
+
+        now = timezone.now()
+        for model, changes in ((TeacherCounters, teachers), (StudentCounters, students)):
+            missing = _increment_counters(model, changes, now)
+            if missing and rebuild_missing:
+                rebuild_counters(model, missing)
+        _increment_weeks(weeks, create=rebuild_missing)
+        if teachers:
+            invalidate_responses(["TeachersListView"], ROLE_SCOPE, "admin")
+
+
+def record_lesson_changes(changes, rebuild_missing=True):
+    """Applies ``(before, after)`` LessonState pairs; None stands for a created or deleted lesson."""
+    counters = CounterChanges()
+    for before, after in changes:
+        counters.lesson(before, after)
+    counters.apply(rebuild_missing)
+
+
+def record_match_changes(changes, rebuild_missing=True):
+    """Applies ``(previous teacher id, new teacher id)`` pairs of student matches."""
+    counters = CounterChanges()
+    for before, after in changes:
+        counters.match(before, after)
+    counters.apply(rebuild_missing)
+
+
+def rebuild_counters(model, ids, lock=False):
+    """
+    Recomputes the TeacherCounters or StudentCounters rows of ``ids`` from
+    the lessons and matches. With ``lock`` the rows are created if needed
+    and locked first, so writers waiting on them apply their deltas on top
+    of the rebuilt values once the caller's transaction commits.
+    """
+    ids = sorted(ids)
+    owner = model._meta.pk.name
+    if lock:
+        model.objects.bulk_create([model(pk=pk) for pk in ids], ignore_conflicts=True)
+        list(model.objects.select_for_update().filter(pk__in=ids).order_by("pk").values_list("pk", flat=True))
+
+    counts = defaultdict(dict)
+    rows = (
+        Lesson.objects.filter(**{f"{owner}_id__in": ids})
+        .order_by()
+        .values(f"{owner}_id", "status")
+        .annotate(total=Count("id"))
+    )
+    for row in rows:
+        counts[row[f"{owner}_id"]][STATUS_FIELDS[row["status"]]] = row["total"]
+    extra = {}
+    if model is TeacherCounters:
+        matched = dict(
+            StudentProfile.objects.filter(matched_teacher_id__in=ids)
+            .order_by()
+            .values("matched_teacher_id")
+            .annotate(total=Count("id"))
+            .values_list("matched_teacher_id", "total")
+        )
+        extra = {pk: {"matched_students": matched.get(pk, 0)} for pk in ids}
+
+    model.objects.bulk_create(
+        [
+            model(pk=pk, **{field: counts[pk].get(field, 0) for field in STATUS_FIELDS.values()}, **extra.get(pk, {}))
+            for pk in ids
+        ],
+        update_conflicts=True,
+        unique_fields=[owner],
+        update_fields=[*STATUS_FIELDS.values(), *(["matched_students"] if extra else []), "updated_at"],
+    )
+
+
+def rebuild_lesson_owners(lesson):
+    """Rebuilds the counters a lesson feeds when its previous state is unknown."""
+    rebuild_counters(TeacherCounters, [lesson.teacher_id])
+    rebuild_counters(StudentCounters, [lesson.student_id])
+    rebuild_weekly_loads([lesson.teacher_id])
+
+
+def rebuild_weekly_loads(teacher_ids):
+    """Recomputes every TeacherWeeklyLoad row of ``teacher_ids``."""
+    rows = (
+        Lesson.objects.filter(teacher_id__in=teacher_ids, status__in=BOOKED_STATUSES)
+        .order_by()
+        .values("teacher_id", week=LocalWeekStart(F("starts_at_utc"), F("teacher__user__timezone")))
+        .annotate(total=Sum("duration_minutes"))
+    )
+    minutes = {(row["teacher_id"], row["week"]): row["total"] for row in rows}
+    computed = [
+        TeacherWeeklyLoad(teacher_id=teacher_id, week_start=week, booked_minutes=total)
+        for (teacher_id, week), total in sorted(minutes.items())
+    ]
+    loads = TeacherWeeklyLoad.objects.filter(teacher_id__in=teacher_ids)
+    stale = [pk for pk, *key in loads.values_list("pk", "teacher_id", "week_start") if tuple(key) not in minutes]
+    if stale:
+        TeacherWeeklyLoad.objects.filter(pk__in=stale).delete()
+    TeacherWeeklyLoad.objects.bulk_create(
+        computed,
+        update_conflicts=True,
+        unique_fields=["teacher", "week_start"],
+        update_fields=["booked_minutes"],
+    )
+
+
+def reconcile_counters(batch_size=500, log=None):
+    """
+    Rebuilds every teacher's and student's counters, and the teachers'
+    weekly loads, in batches of ``batch_size`` owners per transaction.
+    Returns the number of (teachers, students) reconciled.
+    """
+    totals = []
+    for model, profiles in ((TeacherCounters, TeacherProfile), (StudentCounters, StudentProfile)):
+        ids = list(profiles.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start : start + batch_size]
+            with transaction.atomic():
+                rebuild_counters(model, batch, lock=True)
+                if model is TeacherCounters:
+                    rebuild_weekly_loads(batch)
+            if log:
+                log(f"Reconciled {start + len(batch)} of {len(ids)} {model._meta.pk.name}s")
+        totals.append(len(ids))
+    invalidate_responses(["TeachersListView"], ROLE_SCOPE, "admin")
+    return tuple(totals)
@@ -0,0 +1,197 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import LessonEventLog
+from .streams import publish_lesson_events
+
+logger = logging.getLogger(__name__)
+
+DURABLE = "durable"
+BATCHED = "batched"
+
+
+class LessonEventWriter:
+    """
+    Process-local buffer of lesson events written with bulk_create.
+
+    Events are enqueued once the surrounding transaction commits and
+    flushed by a background thread when the buffer reaches ``batch_size``
+    or the oldest event is ``flush_interval`` seconds old, and at process
+    exit. A failed batch is retried row by row; rows that still fail are
+    put back and dropped after ``max_attempts`` flushes.
+    """
+
+    def __init__(self, batch_size, flush_interval, max_attempts=3):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def enqueue(self, event):
+        self.enqueue_many([event])
+
+    def enqueue_many(self, events):
+        if not events:
+            return
+        with self._lock:
+            self._ensure_thread()
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.extend(events)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            # The writer thread does the INSERT; the request only signals it.
+            self._wake.set()
+
+    def flush(self):
+        with self._lock:
+            events, self._buffer, self._oldest = self._buffer, [], None
+        if not events:
+            return 0
+        with self._flush_lock:
+            written = self._write(events)
+        if written:
+            _publish(written)
+        return len(written)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _write(self, events):
+        try:
+            with transaction.atomic():
+                LessonEventLog.objects.bulk_create(events, batch_size=self.batch_size)
+            return events
+        except DatabaseError:
+            logger.warning("Bulk insert of %d lesson events failed, retrying one by one", len(events), exc_info=True)
+
+        written, failed = [], []
+        for event in events:
+            # bulk_create may have assigned ids before the rollback.
+            event.pk = None
+            event._state.adding = True
+            try:
+                with transaction.atomic():
+                    event.save(force_insert=True)
+            except DatabaseError:
+                failed.append(event)
+            else:
+                written.append(event)
+        self._requeue(failed)
+        return written
+
+    def _requeue(self, events):
+        retry = []
+        for event in events:
+            event._flush_attempts = getattr(event, "_flush_attempts", 0) + 1
+            if event._flush_attempts < self.max_attempts:
+                retry.append(event)
+        if len(retry) < len(events):
+            logger.error("Dropped %d lesson events after %d failed flushes", len(events) - len(retry), self.max_attempts)
+        if not retry:
+            return
+        with self._lock:
+            self._buffer[:0] = retry
+            self._oldest = time.monotonic()
+
+    def _is_stale(self):
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    def _ensure_thread(self):
+        # Threads do not survive fork, so a forked worker starts its own.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._buffer, self._oldest = [], None
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lesson-event-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                age = 0 if self._oldest is None else time.monotonic() - self._oldest
+            self._wake.wait(max(self.flush_interval - age, 0.01))
+            self._wake.clear()
+            with self._lock:
+                due = len(self._buffer) >= self.batch_size or self._is_stale()
+            if due:
+                self.flush()
+                connection.close()
+
+
+def _publish(events):
+    # Streaming is best effort; clients catch up on reconnect.
+    try:
+        publish_lesson_events(events)
+    except Exception:
+        logger.exception("Failed to publish %d lesson events", len(events))
+
+
+event_writer = LessonEventWriter(
+    batch_size=getattr(settings, "LESSON_EVENT_BATCH_SIZE", 100),
+    flush_interval=getattr(settings, "LESSON_EVENT_FLUSH_INTERVAL", 1.0),
+    max_attempts=getattr(settings, "LESSON_EVENT_FLUSH_ATTEMPTS", 3),
+)
+atexit.register(event_writer.flush)
+
+
+def record_lesson_event(lesson, actor_id, event_type, payload=None):
+    """
+    Records a lesson event according to ``LESSON_EVENT_LOG_MODE``.
+
+    ``durable`` inserts the row right away, inside the caller's transaction.
+    ``batched`` hands it to the process-local writer once that transaction
+    commits, keeping the INSERT off the request path.
+    """
+    event = LessonEventLog(
+        lesson=lesson,
+        actor_id=actor_id,
+        event_type=event_type,
+        payload_json=payload or {},
+        created_at=timezone.now(),
+    )
+    if getattr(settings, "LESSON_EVENT_LOG_MODE", DURABLE) == BATCHED:
+        transaction.on_commit(lambda: event_writer.enqueue(event))
+    else:
+        event.save()
+        transaction.on_commit(lambda: _publish([event]))
+    return event
+
+
+def record_lesson_events(lessons, actor_id, event_type, payloads=None):
+    """
+    Records one event per lesson like ``record_lesson_event``, with a
+    single bulk INSERT in ``durable`` mode.
+    """
+    created_at = timezone.now()
+    events = [
+        LessonEventLog(
+            lesson=lesson,
+            actor_id=actor_id,
+            event_type=event_type,
+            payload_json=(payloads[index] if payloads else None) or {},
+            created_at=created_at,
+        )
+        for index, lesson in enumerate(lessons)
+    ]
+    if getattr(settings, "LESSON_EVENT_LOG_MODE", DURABLE) == BATCHED:
+        transaction.on_commit(lambda: event_writer.enqueue_many(events))
+    else:
+        LessonEventLog.objects.bulk_create(events)
+        transaction.on_commit(lambda: _publish(events))
+    return events
@@ -0,0 +1,142 @@
+import csv
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Lesson, LessonEventLog
+
+DEFAULT_CHUNK_SIZE = 2000
+
+DATASETS = {
+    "lessons": {
+        "queryset": lambda: Lesson.objects.order_by("id"),
+        "fields": [
+            "id",
+            "student_id",
+            "teacher_id",
+            "starts_at_utc",
+            "ends_at_utc",
+            "duration_minutes",
+            "status",
+            "requested_by_role",
+            "meeting_url",
+            "notes",
+            "status_changed_at",
+            "created_at",
+            "updated_at",
+        ],
+        "date_field": "starts_at_utc",
+    },
+    "events": {
+        "queryset": lambda: LessonEventLog.objects.order_by("id"),
+        "fields": ["id", "lesson_id", "actor_id", "event_type", "payload_json", "created_at"],
+        "date_field": "created_at",
+    },
+}
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(dataset, start=None, end=None, chunk_size=DEFAULT_CHUNK_SIZE, asynchronous=False):
+    """
+    Iterates the dataset's rows as tuples through a server-side cursor, so
+    memory stays bounded by ``chunk_size`` regardless of table size. With
+    ``asynchronous`` the rows come from an async iterator instead.
+    """
+    spec = DATASETS[dataset]
+    queryset = spec["queryset"]()
+    if start is not None:
+        queryset = queryset.filter(**{f"{spec['date_field']}__gte": start})
+    if end is not None:
+        queryset = queryset.filter(**{f"{spec['date_field']}__lt": end})
+    if asynchronous:
+        # Plain values_list() runs its query as soon as it is iterated, which
+        # aiterator() does on the event loop; the named variant defers it to
+        # the worker thread fetching each chunk.
+        return queryset.values_list(*spec["fields"], named=True).aiterator(chunk_size=chunk_size)
+    return queryset.values_list(*spec["fields"]).iterator(chunk_size=chunk_size)
+
+
+_encoder = DjangoJSONEncoder()
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=DjangoJSONEncoder)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return _encoder.default(value)
+    return value
+
+
+def csv_lines(dataset):
+    """Returns the header line and a function formatting one row as a CSV line."""
+    writer = csv.writer(_Echo())
+
+    def format_row(row):
+        return writer.writerow([_csv_value(value) for value in row])
+
+    return writer.writerow(DATASETS[dataset]["fields"]), format_row
+
+
+def ndjson_lines(dataset):
+    """Returns an empty header and a function formatting one row as a JSON line."""
+    fields = DATASETS[dataset]["fields"]
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+    def format_row(row):
+        return encoder.encode(dict(zip(fields, row))) + "\n"
+
+    return "", format_row
+
+
+LINE_FORMATS = {"csv": csv_lines, "ndjson": ndjson_lines}
+
+
+def stream_lines(header, format_row, rows, lines_per_chunk=500):
+    if header:
+        yield header
+    buffer = []
+    for row in rows:
+        buffer.append(format_row(row))
+        if len(buffer) >= lines_per_chunk:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+async def astream_lines(header, format_row, rows, lines_per_chunk=500):
+    if header:
+        yield header
+    buffer = []
+    async for row in rows:
+        buffer.append(format_row(row))
+        if len(buffer) >= lines_per_chunk:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_export(dataset, export_format, asynchronous=False, **kwargs):
+    """
+    Streams the export in chunks of lines. Under ASGI pass ``asynchronous``:
+    Django consumes a sync iterator there by collecting it in a thread, which
+    would hold the whole export in memory before the first byte is sent.
+    """
+    header, format_row = LINE_FORMATS[export_format](dataset)
+    rows = export_rows(dataset, asynchronous=asynchronous, **kwargs)
+    if asynchronous:
+        return astream_lines(header, format_row, rows)
+    return stream_lines(header, format_row, rows)
@@ -0,0 +1,167 @@
+import datetime
+import hashlib
+import secrets
+from calendar import timegm
+from functools import cached_property
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import CustomUser, Lesson
+
+FEED_ROLES = ("student", "teacher")
+PRODID = "-//lang//Lessons//EN"
+# Bump when render_event() output changes so cached feeds get new ETags.
+FEED_FORMAT = 1
+
+EVENT_FIELDS = ("id", "starts_at_utc", "ends_at_utc", "duration_minutes", "meeting_url", "notes", "updated_at")
+
+
+def new_feed_token():
+    return secrets.token_urlsafe(32)
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line):
+    """Splits a content line into 75-octet pieces without breaking UTF-8 sequences."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(pieces)
+
+
+def _stamp(value):
+    return value.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(row):
+    """VEVENT text for a ``Lesson.values(*EVENT_FIELDS)`` row."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:lesson-{row['id']}@{settings.CALENDAR_UID_DOMAIN}",
+        f"DTSTAMP:{_stamp(row['updated_at'])}",
+        f"LAST-MODIFIED:{_stamp(row['updated_at'])}",
+        f"DTSTART:{_stamp(row['starts_at_utc'])}",
+        f"DTEND:{_stamp(row['ends_at_utc'])}",
+        f"SUMMARY:Lesson ({row['duration_minutes']} min)",
+        "STATUS:CONFIRMED",
+    ]
+    if row["meeting_url"]:
+        lines.append(f"LOCATION:{_escape(row['meeting_url'])}")
+        lines.append(f"URL:{row['meeting_url']}")
+    if row["notes"]:
+        lines.append(f"DESCRIPTION:{_escape(row['notes'])}")
+    lines.append("END:VEVENT")
+    return "".join(f"{_fold(line)}\r\n" for line in lines)
+
+
+def _lesson_stat(role, aggregate):
+    lessons = Lesson.objects.filter(**{f"{role}_id": OuterRef(f"{role}_profile__id")}).order_by().values(f"{role}_id")
+    return Subquery(lessons.annotate(value=aggregate).values("value"))
+
+
+def feed_for_token(token):
+    """
+    Resolves a feed token to its CalendarFeed, or None, in one query: the
+    user row plus the latest ``updated_at`` and row count of the owner's
+    lessons, read from the (owner, updated_at) indexes.
+    """
+    stats = {}
+    for role in FEED_ROLES:
+        stats[f"{role}_latest"] = _lesson_stat(role, Max("updated_at"))
+        stats[f"{role}_total"] = _lesson_stat(role, Count("*"))
+    row = (
+        CustomUser.objects.filter(calendar_token=token, is_active=True, role__in=FEED_ROLES)
+        .values("role", "student_profile__id", "teacher_profile__id", **stats)
+        .first()
+    )
+    if row is None:
+        return None
+    role = row["role"]
+    profile_id = row[f"{role}_profile__id"]
+    if profile_id is None:
+        return None
+    return CalendarFeed(role, profile_id, row[f"{role}_latest"], row[f"{role}_total"] or 0)
+
+
+class CalendarFeed:
+    """
+    The confirmed lessons of one student or teacher as an iCalendar body.
+
+    Any write to the owner's lessons moves their latest ``updated_at``, and a
+    deletion changes their count, so the pair identifies the feed version
+    without reading the lessons. The cached copy keeps each rendered event
+    with the ``updated_at`` it was rendered from, so a changed feed only
+    re-renders the lessons that changed since.
+    """
+
+    def __init__(self, role, profile_id, latest, total):
+        self.role = role
+        self.profile_id = profile_id
+        self.latest = latest
+        self.total = total
+        version = f"{FEED_FORMAT}:{role}:{profile_id}:{latest.isoformat() if latest else ''}:{total}"
+        self.etag = f'"{hashlib.blake2b(version.encode(), digest_size=16).hexdigest()}"'
+
+    @property
+    def cache_key(self):
+        return f"calendar:{self.role}:{self.profile_id}"
+
+    @cached_property
+    def _cached(self):
+        return caches[settings.RESPONSE_CACHE_ALIAS].get(self.cache_key)
+
+    @cached_property
+    def last_modified(self):
+        """Unix timestamp for Last-Modified, or None for a feed that never had lessons."""
+        cached = self._cached
+        if cached is not None:
+            if cached["etag"] == self.etag:
+                return cached["last_modified"]
+            if self.latest is None or timegm(self.latest.utctimetuple()) <= cached["last_modified"]:
+                # A lesson was deleted; the remaining rows cannot date that.
+                return max(int(timezone.now().timestamp()), cached["last_modified"] + 1)
+        return None if self.latest is None else timegm(self.latest.utctimetuple())
+
+    def _events(self, events):
+        lessons = Lesson.objects.filter(**{f"{self.role}_id": self.profile_id}, status="confirmed")
+        current = list(lessons.values_list("id", "updated_at"))
+        stale = [pk for pk, updated_at in current if pk not in events or events[pk][0] != updated_at]
+        if stale:
+            rows = Lesson.objects.filter(pk__in=stale, status="confirmed").values(*EVENT_FIELDS)
+            events = {**events, **{row["id"]: (row["updated_at"], row["starts_at_utc"], render_event(row)) for row in rows}}
+        return {pk: events[pk] for pk, _ in current if pk in events}
+
+    def body(self):
+        cached = self._cached
+        if cached is not None and cached["etag"] == self.etag:
+            return cached["body"]
+        events = self._events(cached["events"] if cached is not None else {})
+        ordered = sorted(events.items(), key=lambda item: (item[1][1], item[0]))
+        body = "".join(
+            [
+                "BEGIN:VCALENDAR\r\n",
+                "VERSION:2.0\r\n",
+                f"PRODID:{PRODID}\r\n",
+                "CALSCALE:GREGORIAN\r\n",
+                "METHOD:PUBLISH\r\n",
+                *(text for _, (_, _, text) in ordered),
+                "END:VCALENDAR\r\n",
+            ]
+        ).encode()
+        entry = {"etag": self.etag, "last_modified": self.last_modified, "events": events, "body": body}
+        caches[settings.RESPONSE_CACHE_ALIAS].set(self.cache_key, entry, settings.CALENDAR_FEED_CACHE_TTL)
+        self._cached = entry
+        return body
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from users.matching import auto_match_submitted
+
+
+class Command(BaseCommand):
+    help = "Match all submitted applications to teachers in one global assignment."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--capacity", type=int, default=None, help="Max matched students per teacher.")
+        parser.add_argument("--top-k", type=int, default=10, help="Candidate teachers kept per student.")
+        parser.add_argument("--min-score", type=float, default=0.5, help="Minimum score for a match.")
+        parser.add_argument("--dry-run", action="store_true", help="Solve without writing the results.")
+
+    def handle(self, *args, **options):
+        result = auto_match_submitted(
+            capacity=options["capacity"],
+            top_k=options["top_k"],
+            min_score=options["min_score"],
+            dry_run=options["dry_run"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Matched {result['matched']}/{result['students']} applications "
+                f"across {result['teachers_used']} teachers in {result['elapsed_seconds']}s "
+                f"({result['students_per_second']} students/s)"
+                + (" [dry run]" if result["dry_run"] else "")
+            )
+        )
@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from users.benchmarking import run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Drive the booking API concurrently and report latency percentiles, throughput and query counts as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--output", "-o", default="-", help="Write the JSON report here instead of stdout.")
+
+    def handle(self, *args, **options):
+        report = run_benchmark(
+            requests=options["requests"],
+            concurrency=options["concurrency"],
+            seed=options["seed"],
+            warmup=options["warmup"],
+        )
+        payload = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"] == "-":
+            self.stdout.write(payload)
+            return
+
+        with open(options["output"], "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Wrote benchmark report to {options['output']}"))
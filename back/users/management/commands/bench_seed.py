@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from users.benchmarking import clear_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate a deterministic benchmark dataset (users, availability, lessons, events)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=2000)
+        parser.add_argument("--students", type=int, default=20000)
+        parser.add_argument("--lessons", type=int, default=200000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--reset", action="store_true", help="Delete existing benchmark data first.")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            deleted = clear_benchmark_data()
+            self.stdout.write(f"Deleted {deleted} benchmark rows")
+
+        result = seed_benchmark_data(
+            teachers=options["teachers"],
+            students=options["students"],
+            lessons=options["lessons"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded benchmark data in {result['seconds']}s (admin: {result['admin']})"))
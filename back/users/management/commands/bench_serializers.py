@@ -0,0 +1,19 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from users.benchmarking import benchmark_serializers
+
+
+class Command(BaseCommand):
+    help = "Compare DRF and fast lesson serialization plus JSON rendering on a large response and report timings as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        report = benchmark_serializers(lessons=options["lessons"], repeat=options["repeat"])
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        if not report["identical"]:
+            self.stderr.write(self.style.ERROR("Fast path output differs from the DRF output"))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from users.exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = "Stream lessons or lesson events to CSV or NDJSON with constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(DATASETS))
+        parser.add_argument("--format", dest="export_format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", "-o", default="-", help="Output file path, or - for stdout.")
+        parser.add_argument("--from", dest="start", help="Inclusive lower bound (ISO datetime).")
+        parser.add_argument("--to", dest="end", help="Exclusive upper bound (ISO datetime).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        bounds = {}
+        for key in ("start", "end"):
+            if options[key]:
+                parsed = parse_datetime(options[key])
+                if parsed is None:
+                    raise CommandError(f"Invalid datetime: {options[key]}")
+                bounds[key] = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+        chunks = stream_export(
+            options["dataset"], options["export_format"], chunk_size=options["chunk_size"], **bounds
+        )
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}"))
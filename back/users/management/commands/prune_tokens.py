@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding refresh tokens and their blacklist entries in batches. "
+        "Meant to run on a schedule, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from users.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the teacher and student lesson counters and the teachers' weekly loads from the lessons. "
+        "Meant to run on a schedule, e.g. nightly from cron, to repair any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        teachers, students = reconcile_counters(
+            batch_size=options["batch_size"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {teachers} teachers and {students} students"))
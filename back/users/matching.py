@@ -0,0 +1,283 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DurationField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+from .counters import record_match_changes
+from .models import AvailabilityBlock, StudentProfile, TeacherProfile
+from .response_cache import USER_SCOPE, invalidate_responses
+
+LEVELS = [code for code, _ in TeacherProfile.CEFR_CHOICES]
+TRACKS = [code for code, _ in TeacherProfile.TEACHING_TRACK_CHOICES]
+
+LEVEL_WEIGHT = 0.4
+TRACK_WEIGHT = 0.3
+AVAILABILITY_WEIGHT = 0.2
+LOAD_WEIGHT = 0.1
+
+GENERAL_TRACK_CREDIT = 0.6
+NEUTRAL_CREDIT = 0.5
+
+# Assignment costs are 1 - score (plus an epsilon so no edge weighs zero);
+# leaving a student unassigned costs more than any real match.
+COST_EPSILON = 1e-6
+UNASSIGNED_COST = 2.0
+
+
+def _mask(values, codes):
+    mask = 0
+    for value in values or ():
+        if value in codes:
+            mask |= 1 << codes.index(value)
+    return mask
+
+
+def _bit(value, codes):
+    return 1 << codes.index(value) if value in codes else 0
+
+
+def teacher_queryset():
+    """Active teachers annotated with their matched-student load and weekly available minutes."""
+    load = (
+        StudentProfile.objects.filter(matched_teacher=OuterRef("pk"))
+        .order_by()
+        .values("matched_teacher")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    weekly = (
+        AvailabilityBlock.objects.filter(teacher=OuterRef("pk"))
+        .order_by()
+        .values("teacher")
+        .annotate(total=Sum(F("end_time") - F("start_time")))
+        .values("total")
+    )
+    return TeacherProfile.objects.filter(active=True).annotate(
+        matched_students=Coalesce(Subquery(load), 0),
+        weekly_available=Coalesce(Subquery(weekly, output_field=DurationField()), Value(timedelta(0))),
+    )
+
+
+def prefilter_for(student):
+    """Teachers sharing the student's level or track; served by the GIN indexes on the array fields."""
+    condition = Q()
+    if student.cefr_level:
+        condition |= Q(levels_supported__contains=[student.cefr_level])
+    if student.target_field:
+        condition |= Q(teaching_tracks__overlap=[student.target_field, "general"])
+    return condition
+
+
+def load_teachers(queryset):
+    """Loads teacher rows into the column arrays used by ``score_matrix``."""
+    rows = list(
+        queryset.values_list(
+            "id",
+            "user__email",
+            "user__full_name",
+            "levels_supported",
+            "teaching_tracks",
+            "matched_students",
+            "weekly_available",
+        )
+    )
+    return {
+        "id": np.array([row[0] for row in rows], dtype=np.int64),
+        "email": [row[1] for row in rows],
+        "full_name": [row[2] for row in rows],
+        "levels": np.array([_mask(row[3], LEVELS) for row in rows], dtype=np.int64),
+        "tracks": np.array([_mask(row[4], TRACKS) for row in rows], dtype=np.int64),
+        "load": np.array([row[5] for row in rows], dtype=np.float64),
+        "weekly_minutes": np.array([row[6].total_seconds() / 60 for row in rows], dtype=np.float64),
+    }
+
+
+def load_students(students):
+    """Builds the per-student column arrays used by ``score_matrix``."""
+    return {
+        "id": np.array([student.pk for student in students], dtype=np.int64),
+        "level": np.array([_bit(student.cefr_level, LEVELS) for student in students], dtype=np.int64),
+        "track": np.array([_bit(student.target_field, TRACKS) for student in students], dtype=np.int64),
+        "budget_minutes": np.array(
+            [(student.weekly_time_budget_hours or 0) * 60 for student in students], dtype=np.float64
+        ),
+    }
+
+
+def score_components(students, teachers):
+    """Returns the (students x teachers) level, track, availability and load score matrices in [0, 1]."""
+    level_bit = students["level"][:, None]
+    level = np.where(level_bit == 0, NEUTRAL_CREDIT, (teachers["levels"][None, :] & level_bit) != 0)
+
+    track_bit = students["track"][:, None]
+    general = (teachers["tracks"] & _bit("general", TRACKS)) != 0
+    track = np.where(
+        (teachers["tracks"][None, :] & track_bit) != 0,
+        1.0,
+        np.where(general[None, :], GENERAL_TRACK_CREDIT, 0.0),
+    )
+    track = np.where(track_bit == 0, NEUTRAL_CREDIT, track)
+
+    budget = students["budget_minutes"][:, None]
+    weekly = teachers["weekly_minutes"][None, :]
+    availability = np.where(
+        budget > 0,
+        np.minimum(weekly / np.maximum(budget, 1.0), 1.0),
+        (weekly > 0).astype(np.float64),
+    )
+
+    load = np.broadcast_to(1.0 / (1.0 + teachers["load"])[None, :], availability.shape)
+    return level.astype(np.float64), track, availability, load
+
+
+def combine_scores(level, track, availability, load):
+    return LEVEL_WEIGHT * level + TRACK_WEIGHT * track + AVAILABILITY_WEIGHT * availability + LOAD_WEIGHT * load
+
+
+def score_matrix(students, teachers):
+    return combine_scores(*score_components(students, teachers))
+
+
+def rank_teachers(student, limit=10):
+    """Returns the ``limit`` best teacher candidates for ``student``, best first."""
+    teachers = load_teachers(teacher_queryset().filter(prefilter_for(student)))
+    if not len(teachers["id"]):
+        return []
+
+    students = load_students([student])
+    level, track, availability, load = (matrix[0] for matrix in score_components(students, teachers))
+    scores = combine_scores(level, track, availability, load)
+
+    # Highest score first, lowest teacher id breaking ties.
+    top = np.lexsort((teachers["id"], -scores))[:limit]
+
+    return [
+        {
+            "teacher_id": int(teachers["id"][index]),
+            "email": teachers["email"][index],
+            "full_name": teachers["full_name"][index],
+            "score": round(float(scores[index]), 4),
+            "level_match": round(float(level[index]), 4),
+            "track_match": round(float(track[index]), 4),
+            "availability": round(float(availability[index]), 4),
+            "matched_students": int(teachers["load"][index]),
+            "weekly_available_hours": round(float(teachers["weekly_minutes"][index]) / 60, 2),
+        }
+        for index in top
+    ]
+
+
+def solve_assignment(students, teachers, remaining, top_k=10, min_score=0.5, batch_size=512):
+    """
+    Min-cost assignment of students to teachers with ``remaining[t]`` free
+    seats each. Every teacher seat becomes a column; each student keeps
+    edges to its ``top_k`` teachers (scored in batches) plus a private
+    "unassigned" column, so a full matching always exists.
+
+    Returns an array holding, per student, the index of the assigned teacher
+    or -1.
+    """
+    student_count = len(students["id"])
+    teacher_count = len(teachers["id"])
+    assigned = np.full(student_count, -1, dtype=np.int64)
+    if not student_count or not teacher_count or not remaining.sum():
+        return assigned
+
+    seat_offsets = np.concatenate(([0], np.cumsum(remaining)))
+    seat_count = int(seat_offsets[-1])
+    k = max(1, min(top_k, teacher_count))
+
+    rows, cols, costs = [], [], []
+    for start in range(0, student_count, batch_size):
+        chunk = {key: value[start:start + batch_size] for key, value in students.items()}
+        scores = score_matrix(chunk, teachers)
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        keep = (candidate_scores >= min_score) & (remaining[candidates] > 0)
+
+        row_index, column_index = np.nonzero(keep)
+        teacher_index = candidates[row_index, column_index]
+        seats = remaining[teacher_index]
+        seat_step = np.arange(seats.sum()) - np.repeat(np.cumsum(seats) - seats, seats)
+
+        rows.append(np.repeat(row_index + start, seats))
+        cols.append(np.repeat(seat_offsets[teacher_index], seats) + seat_step)
+        costs.append(np.repeat(1.0 - candidate_scores[row_index, column_index] + COST_EPSILON, seats))
+
+    students_range = np.arange(student_count)
+    rows.append(students_range)
+    cols.append(seat_count + students_range)
+    costs.append(np.full(student_count, UNASSIGNED_COST))
+
+    graph = csr_matrix(
+        (np.concatenate(costs), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(student_count, seat_count + student_count),
+    )
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+    real = matched_cols < seat_count
+    assigned[matched_rows[real]] = np.searchsorted(seat_offsets, matched_cols[real], side="right") - 1
+    return assigned
+
+
+def auto_match_submitted(capacity=None, top_k=10, min_score=0.5, dry_run=False):
+    """
+    Matches every submitted application in one global assignment and
+    writes the results with a single bulk_update. Returns a summary with
+    throughput figures.
+    """
+    capacity = settings.MATCHING_TEACHER_CAPACITY if capacity is None else capacity
+    started = time.perf_counter()
+
+    with transaction.atomic():
+        profiles = list(
+            StudentProfile.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(application_status="submitted")
+            .order_by("submitted_at", "id")
+        )
+        teachers = load_teachers(teacher_queryset().filter(matched_students__lt=capacity))
+        remaining = np.maximum(capacity - teachers["load"].astype(np.int64), 0)
+
+        assigned = solve_assignment(load_students(profiles), teachers, remaining, top_k=top_k, min_score=min_score)
+
+        now = timezone.now()
+        updated, matches = [], []
+        for profile, teacher_index in zip(profiles, assigned.tolist()):
+            if teacher_index < 0:
+                continue
+            matches.append((profile.matched_teacher_id, int(teachers["id"][teacher_index])))
+            profile.matched_teacher_id = matches[-1][1]
+            profile.application_status = "matched"
+            profile.updated_at = now
+            updated.append(profile)
+
+        if updated and not dry_run:
+            # Only the teacher varies per row; the constant columns go in one UPDATE.
+            StudentProfile.objects.bulk_update(updated, ["matched_teacher"], batch_size=1000)
+            StudentProfile.objects.filter(pk__in=[profile.pk for profile in updated]).update(
+                application_status="matched", updated_at=now
+            )
+            # Bulk updates send no post_save; update the counters and drop the cached profiles directly.
+            record_match_changes(matches)
+            invalidate_responses(["StudentMeView"], USER_SCOPE, *(profile.user_id for profile in updated))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "students": len(profiles),
+        "matched": len(updated),
+        "unmatched": len(profiles) - len(updated),
+        "teachers_considered": len(teachers["id"]),
+        "teachers_used": len({profile.matched_teacher_id for profile in updated}),
+        "dry_run": dry_run,
+        "assignments": [
+            {"student_id": profile.pk, "teacher_id": profile.matched_teacher_id} for profile in updated
+        ],
+        "elapsed_seconds": round(elapsed, 4),
+        "students_per_second": round(len(profiles) / elapsed, 1) if elapsed else None,
+    }
@@ -0,0 +1,172 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class ViewMetrics:
+    """Process-local per-view request, query and timing counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, queries, db_seconds, total_seconds):
+        with self._lock:
+            entry = self._views.get(view)
+            if entry is None:
+                entry = self._views[view] = {
+                    "requests": 0,
+                    "queries": 0,
+                    "db_seconds": 0.0,
+                    "total_seconds": 0.0,
+                    "max_queries": 0,
+                    "buckets": [0] * len(LATENCY_BUCKETS),
+                }
+            entry["requests"] += 1
+            entry["queries"] += queries
+            entry["db_seconds"] += db_seconds
+            entry["total_seconds"] += total_seconds
+            entry["max_queries"] = max(entry["max_queries"], queries)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if total_seconds <= bound:
+                    entry["buckets"][index] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {view: {**entry, "buckets": list(entry["buckets"])} for view, entry in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render_prometheus(self):
+        lines = [
+            "# TYPE http_view_requests_total counter",
+            "# TYPE http_view_queries_total counter",
+            "# TYPE http_view_db_seconds_total counter",
+            "# TYPE http_view_max_queries gauge",
+            "# TYPE http_view_duration_seconds histogram",
+        ]
+        for view, entry in sorted(self.snapshot().items()):
+            label = f'view="{view}"'
+            lines.append(f"http_view_requests_total{{{label}}} {entry['requests']}")
+            lines.append(f"http_view_queries_total{{{label}}} {entry['queries']}")
+            lines.append(f"http_view_db_seconds_total{{{label}}} {entry['db_seconds']:.6f}")
+            lines.append(f"http_view_max_queries{{{label}}} {entry['max_queries']}")
+            for bound, count in zip(LATENCY_BUCKETS, entry["buckets"]):
+                lines.append(f'http_view_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'http_view_duration_seconds_bucket{{{label},le="+Inf"}} {entry["requests"]}')
+            lines.append(f"http_view_duration_seconds_sum{{{label}}} {entry['total_seconds']:.6f}")
+            lines.append(f"http_view_duration_seconds_count{{{label}}} {entry['requests']}")
+        return "\n".join(lines) + "\n"
+
+
+view_metrics = ViewMetrics()
+
+
+class _QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# The recorder for the current request. Context variables follow the request
+# into the worker threads the async ORM runs queries in, unlike connections,
+# which are per thread.
+_current_recorder = ContextVar("query_metrics_recorder", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.count += 1
+        recorder.seconds += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def _view_name(view_func):
+    view_class = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+    if view_class is not None:
+        return view_class.__name__
+    return getattr(view_func, "__name__", "unknown")
+
+
+class QueryMetricsMiddleware:
+    """
+    Records query count, DB time and total time per view, reports them in
+    a Server-Timing header and enforces ``QUERY_BUDGETS`` when
+    ``QUERY_BUDGET_ENFORCE`` is on.
+
+    Works in both sync and async stacks; the view is taken from the
+    resolver match so no sync ``process_view`` hop is needed under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before the connection_created hook was wired up.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self._finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self._finish(request, response, recorder, started)
+
+    def _finish(self, request, response, recorder, started):
+        total = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return response
+
+        view = _view_name(match.func)
+        view_metrics.record(view, recorder.count, recorder.seconds, total)
+        response["Server-Timing"] = (
+            f'db;dur={recorder.seconds * 1000:.2f};desc="{recorder.count} queries", '
+            f"app;dur={total * 1000:.2f}"
+        )
+
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(view)
+        if budget is not None and recorder.count > budget and getattr(settings, "QUERY_BUDGET_ENFORCE", False):
+            raise QueryBudgetExceeded(f"{view} ran {recorder.count} queries, budget is {budget}")
+        return response
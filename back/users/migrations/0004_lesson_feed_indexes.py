@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_mvp_models'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['starts_at_utc', 'id'], name='lesson_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['teacher', 'starts_at_utc', 'id'], name='lesson_teacher_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['student', 'starts_at_utc', 'id'], name='lesson_student_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['status', 'starts_at_utc', 'id'], name='lesson_status_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:10
+
+import django.contrib.postgres.constraints
+import users.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class AddPostgresConstraint(migrations.AddConstraint):
+    """Exclusion constraints are PostgreSQL-only; other backends keep the state change only."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_lesson_feed_indexes'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(condition=models.Q(('status', 'confirmed')), fields=['teacher', 'starts_at_utc', 'ends_at_utc'], name='lesson_teacher_confirmed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(condition=models.Q(('status', 'confirmed')), fields=['student', 'starts_at_utc', 'ends_at_utc'], name='lesson_student_confirmed_idx'),
+        ),
+        AddPostgresConstraint(
+            model_name='lesson',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'confirmed')), expressions=[(users.models.TsTzRange('starts_at_utc', 'ends_at_utc'), '&&'), ('teacher', '=')], name='lesson_teacher_no_overlap'),
+        ),
+        AddPostgresConstraint(
+            model_name='lesson',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'confirmed')), expressions=[(users.models.TsTzRange('starts_at_utc', 'ends_at_utc'), '&&'), ('student', '=')], name='lesson_student_no_overlap'),
+        ),
+    ]
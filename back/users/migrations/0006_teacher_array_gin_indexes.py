@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:13
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_lesson_overlap_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['levels_supported'], name='teacher_levels_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='teacherprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['teaching_tracks'], name='teacher_tracks_gin'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_teacher_array_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lessoneventlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
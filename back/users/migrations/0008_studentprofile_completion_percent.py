@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+def profile_completion_percent(profile, user):
+    # Frozen copy of users.models.profile_completion_percent as of this
+    # migration, so later changes to the model code cannot alter the backfill.
+    required_values = [
+        user.full_name,
+        user.email,
+        user.timezone,
+        profile.cefr_level,
+        profile.preparing_for,
+        profile.target_field,
+        profile.weekly_time_budget_hours,
+        profile.preferred_session_duration,
+        profile.books_resources_text,
+        profile.homework_preference,
+        profile.availability_notes,
+        profile.goals_summary,
+        profile.terms_accepted_at,
+        profile.privacy_accepted_at,
+    ]
+    if profile.target_field == "other":
+        required_values.append(profile.target_field_other_text)
+    if not (profile.target_start_date or profile.target_start_date_unknown):
+        required_values.append(None)
+    if not profile.focus_skills:
+        required_values.append(None)
+    if not profile.learning_style:
+        required_values.append(None)
+
+    completed = sum(
+        1 for value in required_values if value is not None and not (isinstance(value, str) and not value.strip())
+    )
+    return int((completed / len(required_values)) * 100)
+
+
+def backfill_completion(apps, schema_editor):
+    StudentProfile = apps.get_model("users", "StudentProfile")
+    batch = []
+    for profile in StudentProfile.objects.select_related("user").iterator(chunk_size=2000):
+        profile.completion_percent = profile_completion_percent(profile, profile.user)
+        batch.append(profile)
+        if len(batch) >= 2000:
+            StudentProfile.objects.bulk_update(batch, ["completion_percent"])
+            batch = []
+    if batch:
+        StudentProfile.objects.bulk_update(batch, ["completion_percent"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_lessoneventlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentprofile',
+            name='completion_percent',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_completion, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['application_status', 'completion_percent', 'id'], name='student_status_completion_idx'),
+        ),
+    ]
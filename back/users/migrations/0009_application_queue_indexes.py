@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:37
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0008_studentprofile_completion_percent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('full_name', 'email', config='simple'), name='user_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('email'), name='text_pattern_ops'), name='user_email_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['submitted_at', 'id'], name='student_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=models.Index(fields=['application_status', 'submitted_at', 'id'], name='student_status_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('goals_summary', config='simple'), name='student_goals_search_idx'),
+        ),
+    ]
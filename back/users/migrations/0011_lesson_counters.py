@@ -0,0 +1,109 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:06
+
+import django.db.models.deletion
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Lesson = apps.get_model("users", "Lesson")
+    StudentProfile = apps.get_model("users", "StudentProfile")
+    TeacherProfile = apps.get_model("users", "TeacherProfile")
+    TeacherCounters = apps.get_model("users", "TeacherCounters")
+    StudentCounters = apps.get_model("users", "StudentCounters")
+    TeacherWeeklyLoad = apps.get_model("users", "TeacherWeeklyLoad")
+    CustomUser = apps.get_model("users", "CustomUser")
+
+    matched = dict(
+        StudentProfile.objects.exclude(matched_teacher=None)
+        .order_by()
+        .values("matched_teacher_id")
+        .annotate(total=Count("id"))
+        .values_list("matched_teacher_id", "total")
+    )
+    for owner, Profile, Counters in (("teacher", TeacherProfile, TeacherCounters), ("student", StudentProfile, StudentCounters)):
+        counts = {}
+        rows = Lesson.objects.order_by().values(f"{owner}_id", "status").annotate(total=Count("id"))
+        for row in rows:
+            counts.setdefault(row[f"{owner}_id"], {})[f"{row['status']}_lessons"] = row["total"]
+        batch = []
+        for pk in Profile.objects.values_list("pk", flat=True):
+            row = Counters(pk=pk, **counts.get(pk, {}))
+            if owner == "teacher":
+                row.matched_students = matched.get(pk, 0)
+            batch.append(row)
+        Counters.objects.bulk_create(batch, batch_size=2000)
+
+    # Weeks start on Monday in the teacher's zone; names PostgreSQL does not know count as UTC.
+    schema_editor.execute(
+        f"""
+        INSERT INTO {TeacherWeeklyLoad._meta.db_table} (teacher_id, week_start, booked_minutes)
+        SELECT lesson.teacher_id,
+               date_trunc('week', lesson.starts_at_utc AT TIME ZONE zone.name)::date,
+               SUM(lesson.duration_minutes)
+        FROM {Lesson._meta.db_table} lesson
+        JOIN {TeacherProfile._meta.db_table} teacher ON teacher.id = lesson.teacher_id
+        JOIN {CustomUser._meta.db_table} teacher_user ON teacher_user.id = teacher.user_id
+        CROSS JOIN LATERAL (
+            SELECT CASE WHEN teacher_user.timezone IN (SELECT name FROM pg_timezone_names)
+                   THEN teacher_user.timezone ELSE 'UTC' END AS name
+        ) zone
+        WHERE lesson.status IN ('confirmed', 'completed')
+        GROUP BY 1, 2
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_calendar_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCounters',
+            fields=[
+                ('requested_lessons', models.IntegerField(default=0)),
+                ('proposed_lessons', models.IntegerField(default=0)),
+                ('confirmed_lessons', models.IntegerField(default=0)),
+                ('canceled_lessons', models.IntegerField(default=0)),
+                ('completed_lessons', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='users.studentprofile')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherCounters',
+            fields=[
+                ('requested_lessons', models.IntegerField(default=0)),
+                ('proposed_lessons', models.IntegerField(default=0)),
+                ('confirmed_lessons', models.IntegerField(default=0)),
+                ('canceled_lessons', models.IntegerField(default=0)),
+                ('completed_lessons', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='users.teacherprofile')),
+                ('matched_students', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherWeeklyLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('booked_minutes', models.IntegerField(default=0)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_loads', to='users.teacherprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('teacher', 'week_start'), name='teacher_weekly_load_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
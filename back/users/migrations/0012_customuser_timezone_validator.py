@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:47
+
+import users.models
+from django.db import migrations, models
+
+
+def reset_unknown_timezones(apps, schema_editor):
+    CustomUser = apps.get_model("users", "CustomUser")
+    # Weekly loads already bucket these users' lessons in UTC (see 0011).
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM pg_timezone_names")
+        known = {name for (name,) in cursor.fetchall()}
+    names = set(CustomUser.objects.values_list("timezone", flat=True).distinct())
+    CustomUser.objects.filter(timezone__in=names - known).update(timezone="UTC")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_lesson_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64, validators=[users.models.validate_timezone]),
+        ),
+        migrations.RunPython(reset_unknown_timezones, migrations.RunPython.noop),
+    ]
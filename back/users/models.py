@@ -1,11 +1,88 @@
+import copy
+
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import ArrayField, DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.utils import timezone
 from .managers import CustomUserManager
 
 
-class CustomUser(AbstractUser):
+class TrackedFieldsMixin:
+    """
+    Remembers the column values an instance was loaded with, so changed
+    fields can be detected without reading the row back. ``tracked_fields``
+    limits this to the named fields; by default every field is tracked.
+    """
+
+    tracked_fields = None
+
+    @classmethod
+    def _tracked(cls):
+        fields = cls._meta.concrete_fields
+        if cls.tracked_fields is None:
+            return fields
+        return [field for field in fields if field.name in cls.tracked_fields]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_fields(fields)
+
+    def _snapshot_fields(self, names=None):
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        deferred = self.get_deferred_fields()
+        for field in self._tracked():
+            if field.attname in deferred:
+                continue
+            if names is not None and field.name not in names and field.attname not in names:
+                continue
+            loaded[field.attname] = copy.deepcopy(getattr(self, field.attname))
+
+    def get_dirty_fields(self):
+        """
+        Returns the names of fields changed since load, or None when the
+        instance was not loaded from the database.
+        """
+        loaded = self.__dict__.get("_loaded_values")
+        if loaded is None:
+            return None
+        deferred = self.get_deferred_fields()
+        dirty = []
+        for field in self._tracked():
+            if field.attname in deferred:
+                continue
+            # Deferred on load but assigned since: always written.
+            if field.attname not in loaded or getattr(self, field.attname) != loaded[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+
+def validate_timezone(value):
+    """
+    Accepts IANA zone names. Weekly loads are bucketed with ``AT TIME ZONE``
+    in Postgres, which rejects a name it does not know.
+    """
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"{value!r} is not a known time zone.")
+    if value == "localtime":
+        raise ValidationError("Use a zone name rather than the server's local time.")
+
+
+class CustomUser(TrackedFieldsMixin, AbstractUser):
     ROLE_CHOICES = [
         ("student", "student"),
         ("teacher", "teacher"),
@@ -17,11 +94,32 @@ class CustomUser(AbstractUser):
 
     email = models.EmailField(unique=True)
     full_name = models.CharField(max_length=255, blank=True)
-    timezone = models.CharField(max_length=64, default="UTC")
+    timezone = models.CharField(max_length=64, default="UTC", validators=[validate_timezone])
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default="student")
+    # Secret part of the user's iCalendar feed URL; calendar apps cannot send cookies.
+    calendar_token = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
 
     objects = CustomUserManager()
 
+    # Fields that feed StudentProfile.completion_percent.
+    tracked_fields = ("full_name", "email", "timezone")
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(SearchVector("full_name", "email", config="simple"), name="user_search_idx"),
+            # Serves email__istartswith; full-text search keeps an email as a single lexeme.
+            models.Index(OpClass(Upper("email"), name="text_pattern_ops"), name="user_email_prefix_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        dirty = self.get_dirty_fields()
+        super().save(*args, **kwargs)
+        self._snapshot_fields()
+        # A new user has no profile yet; it computes its own completion.
+        if not adding and self.role == "student" and (dirty is None or dirty):
+            StudentProfile.refresh_completion_for(self)
+
 
 class TeacherProfile(models.Model):
     CEFR_CHOICES = [
@@ -54,11 +152,17 @@ class TeacherProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["levels_supported"], name="teacher_levels_gin"),
+            GinIndex(fields=["teaching_tracks"], name="teacher_tracks_gin"),
+        ]
+
     def __str__(self):
         return f"TeacherProfile({self.user.email})"
 
 
-class StudentProfile(models.Model):
+class StudentProfile(TrackedFieldsMixin, models.Model):
     CEFR_CHOICES = [
         ("A0", "A0"),
         ("A1", "A1"),
@@ -152,57 +256,121 @@ class StudentProfile(models.Model):
     matched_teacher = models.ForeignKey("TeacherProfile", null=True, blank=True, on_delete=models.SET_NULL)
     onboarding_notes = models.TextField(blank=True)
 
+    # Maintained on save from the fields in COMPLETION_FIELDS and the user's
+    # CustomUser.tracked_fields, so lists can filter and sort on it in SQL.
+    completion_percent = models.PositiveSmallIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    COMPLETION_FIELDS = (
+        "cefr_level",
+        "preparing_for",
+        "target_field",
+        "target_field_other_text",
+        "target_start_date",
+        "target_start_date_unknown",
+        "focus_skills",
+        "learning_style",
+        "weekly_time_budget_hours",
+        "preferred_session_duration",
+        "books_resources_text",
+        "homework_preference",
+        "availability_notes",
+        "goals_summary",
+        "terms_accepted_at",
+        "privacy_accepted_at",
+    )
+    # matched_teacher is tracked for the teachers' matched-student counters.
+    tracked_fields = (*COMPLETION_FIELDS, "matched_teacher")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["submitted_at", "id"], name="student_queue_idx"),
+            models.Index(fields=["application_status", "submitted_at", "id"], name="student_status_queue_idx"),
+            models.Index(
+                fields=["application_status", "completion_percent", "id"], name="student_status_completion_idx"
+            ),
+            GinIndex(SearchVector("goals_summary", config="simple"), name="student_goals_search_idx"),
+        ]
+
     def __str__(self):
         return f"StudentProfile({self.user.email})"
 
-    def completion_percent(self):
-        required_values = [
-            self.user.full_name,
-            self.user.email,
-            self.user.timezone,
-            self.cefr_level,
-            self.preparing_for,
-            self.target_field,
-            self.weekly_time_budget_hours,
-            self.preferred_session_duration,
-            self.books_resources_text,
-            self.homework_preference,
-            self.availability_notes,
-            self.goals_summary,
-            self.terms_accepted_at,
-            self.privacy_accepted_at,
-        ]
+    def save(self, *args, **kwargs):
+        dirty = None if self._state.adding else self.get_dirty_fields()
+        if dirty is None or any(name in self.COMPLETION_FIELDS for name in dirty):
+            self.completion_percent = self.compute_completion_percent()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "completion_percent"}
+        super().save(*args, **kwargs)
+        self._snapshot_fields()
+
+    def compute_completion_percent(self):
+        return profile_completion_percent(self, self.user)
+
+    def is_profile_complete(self):
+        return self.completion_percent == 100
 
-        if self.target_field == "other":
-            required_values.append(self.target_field_other_text)
+    @classmethod
+    def refresh_completion_for(cls, user):
+        """Recomputes the stored completion of ``user``'s profile after their user fields changed."""
+        if CustomUser.student_profile.is_cached(user):
+            profile = user.student_profile
+        else:
+            profile = cls.objects.filter(user_id=user.pk).first()
+        if profile is None:
+            return
+        profile.user = user
+        value = profile.compute_completion_percent()
+        if value != profile.completion_percent:
+            cls.objects.filter(pk=profile.pk).update(completion_percent=value)
+            profile.completion_percent = value
+
+
+def profile_completion_percent(profile, user):
+    """Share of the application fields that are filled in, as a whole percentage."""
+    required_values = [
+        user.full_name,
+        user.email,
+        user.timezone,
+        profile.cefr_level,
+        profile.preparing_for,
+        profile.target_field,
+        profile.weekly_time_budget_hours,
+        profile.preferred_session_duration,
+        profile.books_resources_text,
+        profile.homework_preference,
+        profile.availability_notes,
+        profile.goals_summary,
+        profile.terms_accepted_at,
+        profile.privacy_accepted_at,
+    ]
 
-        if not (self.target_start_date or self.target_start_date_unknown):
-            required_values.append(None)
+    if profile.target_field == "other":
+        required_values.append(profile.target_field_other_text)
 
-        if not self.focus_skills:
-            required_values.append(None)
+    if not (profile.target_start_date or profile.target_start_date_unknown):
+        required_values.append(None)
 
-        if not self.learning_style:
-            required_values.append(None)
+    if not profile.focus_skills:
+        required_values.append(None)
 
-        total = len(required_values)
-        completed = 0
-        for value in required_values:
-            if value is None:
-                continue
-            if isinstance(value, str) and not value.strip():
-                continue
-            completed += 1
+    if not profile.learning_style:
+        required_values.append(None)
 
-        if total == 0:
-            return 0
-        return int((completed / total) * 100)
+    total = len(required_values)
+    completed = 0
+    for value in required_values:
+        if value is None:
+            continue
+        if isinstance(value, str) and not value.strip():
+            continue
+        completed += 1
 
-    def is_profile_complete(self):
-        return self.completion_percent() == 100
+    if total == 0:
+        return 0
+    return int((completed / total) * 100)
 
 
 class AvailabilityBlock(models.Model):
@@ -234,7 +402,12 @@ class AvailabilityBlock(models.Model):
         return f"AvailabilityBlock({self.teacher.user.email}, {self.day_of_week})"
 
 
-class Lesson(models.Model):
+class TsTzRange(models.Func):
+    function = "TSTZRANGE"
+    output_field = DateTimeRangeField()
+
+
+class Lesson(TrackedFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ("requested", "requested"),
         ("proposed", "proposed"),
@@ -268,14 +441,71 @@ class Lesson(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["starts_at_utc", "id"], name="lesson_feed_idx"),
+            models.Index(fields=["teacher", "starts_at_utc", "id"], name="lesson_teacher_feed_idx"),
+            models.Index(fields=["student", "starts_at_utc", "id"], name="lesson_student_feed_idx"),
+            models.Index(fields=["status", "starts_at_utc", "id"], name="lesson_status_feed_idx"),
+            # Latest change per owner for the calendar feed ETags.
+            models.Index(fields=["teacher", "updated_at"], name="lesson_teacher_updated_idx"),
+            models.Index(fields=["student", "updated_at"], name="lesson_student_updated_idx"),
+            models.Index(
+                fields=["teacher", "starts_at_utc", "ends_at_utc"],
+                name="lesson_teacher_confirmed_idx",
+                condition=models.Q(status="confirmed"),
+            ),
+            models.Index(
+                fields=["student", "starts_at_utc", "ends_at_utc"],
+                name="lesson_student_confirmed_idx",
+                condition=models.Q(status="confirmed"),
+            ),
+        ]
+        constraints = [
+            ExclusionConstraint(
+                name="lesson_teacher_no_overlap",
+                expressions=[
+                    (TsTzRange("starts_at_utc", "ends_at_utc"), RangeOperators.OVERLAPS),
+                    ("teacher", RangeOperators.EQUAL),
+                ],
+                condition=models.Q(status="confirmed"),
+            ),
+            ExclusionConstraint(
+                name="lesson_student_no_overlap",
+                expressions=[
+                    (TsTzRange("starts_at_utc", "ends_at_utc"), RangeOperators.OVERLAPS),
+                    ("student", RangeOperators.EQUAL),
+                ],
+                condition=models.Q(status="confirmed"),
+            ),
+        ]
+
     def save(self, *args, **kwargs):
-        if self.pk:
+        if self._state.adding:
+            self.status_changed_at = timezone.now()
+            super().save(*args, **kwargs)
+            self._snapshot_fields()
+            return
+
+        dirty = self.get_dirty_fields()
+        if dirty is None:
             previous_status = Lesson.objects.filter(pk=self.pk).values_list("status", flat=True).first()
             if previous_status != self.status:
                 self.status_changed_at = timezone.now()
-        else:
+            super().save(*args, **kwargs)
+            self._snapshot_fields()
+            return
+
+        update_fields = kwargs.get("update_fields")
+        update_fields = set(dirty) if update_fields is None else set(update_fields)
+        if "status" in dirty and "status" in update_fields:
             self.status_changed_at = timezone.now()
+            update_fields.add("status_changed_at")
+        if update_fields:
+            update_fields.add("updated_at")
+        kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
+        self._snapshot_fields(update_fields)
 
     def __str__(self):
         return f"Lesson({self.student.user.email}, {self.teacher.user.email}, {self.status})"
@@ -286,7 +516,56 @@ class LessonEventLog(models.Model):
     actor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="lesson_events")
     event_type = models.CharField(max_length=30)
     payload_json = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Stamped when the event is recorded, not when a batched writer flushes it.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f"LessonEventLog({self.lesson_id}, {self.event_type})"
+
+
+class LessonCounters(models.Model):
+    """
+    Lesson counts by status, kept current by users.counters with F()
+    updates as lessons change and rebuilt by ``manage.py reconcile_counters``.
+    """
+
+    requested_lessons = models.IntegerField(default=0)
+    proposed_lessons = models.IntegerField(default=0)
+    confirmed_lessons = models.IntegerField(default=0)
+    canceled_lessons = models.IntegerField(default=0)
+    completed_lessons = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class TeacherCounters(LessonCounters):
+    teacher = models.OneToOneField(TeacherProfile, on_delete=models.CASCADE, primary_key=True, related_name="counters")
+    matched_students = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"TeacherCounters({self.teacher_id})"
+
+
+class StudentCounters(LessonCounters):
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, primary_key=True, related_name="counters")
+
+    def __str__(self):
+        return f"StudentCounters({self.student_id})"
+
+
+class TeacherWeeklyLoad(models.Model):
+    """Minutes of confirmed and completed lessons per teacher and week (starting Monday in the teacher's zone)."""
+
+    teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name="weekly_loads")
+    week_start = models.DateField()
+    booked_minutes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["teacher", "week_start"], name="teacher_weekly_load_unique"),
+        ]
+
+    def __str__(self):
+        return f"TeacherWeeklyLoad({self.teacher_id}, {self.week_start})"
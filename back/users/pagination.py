@@ -0,0 +1,128 @@
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over ``(ordering_field, id)``.
+
+    The cursor encodes the last row of the page, so every page is a single
+    index range scan no matter how deep the client pages. When
+    ``ordering_choices`` is set, clients pick one of them (``-`` for
+    descending) with ``ordering_query_param``. NULLs sort as PostgreSQL
+    sorts them by default: last ascending, first descending.
+    """
+
+    ordering_field = "starts_at_utc"
+    ordering_choices = ()
+    ordering_query_param = "ordering"
+    cursor_query_param = "cursor"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.take_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.take_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """The queryset for the requested page, with one extra row to detect a next page."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(request)
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+        field = queryset.model._meta.get_field(self.field_name)
+
+        cursor = self.decode_cursor(request, field)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(field, *cursor))
+        id_ordering = "-id" if self.descending else "id"
+        return queryset.order_by(ordering, id_ordering)[: self.page_size + 1]
+
+    def get_ordering(self, request):
+        requested = request.query_params.get(self.ordering_query_param)
+        if requested and requested in self.ordering_choices:
+            return requested
+        return self.ordering_field
+
+    def after(self, field, value, pk):
+        """Rows that sort after ``(value, pk)`` in the current ordering."""
+        name = self.field_name
+        id_after = Q(id__lt=pk) if self.descending else Q(id__gt=pk)
+        if value is None:
+            if self.descending:
+                return (Q(**{f"{name}__isnull": True}) & id_after) | Q(**{f"{name}__isnull": False})
+            return Q(**{f"{name}__isnull": True}) & id_after
+
+        lookup = "lt" if self.descending else "gt"
+        condition = Q(**{f"{name}__{lookup}": value}) | (Q(**{name: value}) & id_after)
+        if field.null and not self.descending:
+            condition |= Q(**{f"{name}__isnull": True})
+        return condition
+
+    def take_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request, field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            value, pk = raw.rsplit("|", 1)
+            if value == "" and field.null:
+                return None, int(pk)
+            return field.to_python(value), int(pk)
+        except (binascii.Error, UnicodeError, ValueError, ValidationError):
+            raise NotFound("Invalid cursor")
+
+    def encode_cursor(self, row):
+        # Pages may hold model instances or ``.values()`` rows.
+        if isinstance(row, dict):
+            value, pk = row[self.field_name], row["id"]
+        else:
+            value, pk = getattr(row, self.field_name), row.pk
+        if value is None:
+            value = ""
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        raw = f"{value}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last_row))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+class LessonCursorPagination(KeysetPagination):
+    ordering_field = "starts_at_utc"
+
+
+class ApplicationQueuePagination(KeysetPagination):
+    ordering_field = "submitted_at"
+    ordering_choices = ("submitted_at", "-submitted_at", "completion_percent", "-completion_percent")
@@ -19,3 +19,8 @@ class IsAdminRole(permissions.BasePermission):
 class IsTeacherOrAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_authenticated and request.user.role in {"teacher", "admin"})
+
+
+class IsStudentOrTeacher(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.role in {"student", "teacher"})
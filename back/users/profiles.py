@@ -0,0 +1,98 @@
+from django.http import Http404
+
+from .models import CustomUser, Lesson, StudentProfile, TeacherProfile
+
+PROFILE_MODELS = {"student": StudentProfile, "teacher": TeacherProfile}
+
+# Reverse one-to-one names on CustomUser; authentication select_related()s
+# them so the caller's profile arrives with the user row.
+PROFILE_RELATIONS = ("student_profile", "teacher_profile")
+
+_UNRESOLVED = object()
+
+
+def _joined_profile(user, model):
+    """The profile loaded along with ``user`` (None if it has none), or _UNRESOLVED."""
+    if not isinstance(user, CustomUser):
+        return _UNRESOLVED
+    descriptor = getattr(CustomUser, model._meta.get_field("user").remote_field.related_name)
+    if not descriptor.is_cached(user):
+        return _UNRESOLVED
+    return descriptor.related.get_cached_value(user)
+
+
+def _cached(request, model):
+    profile = getattr(request, "_role_profile", _UNRESOLVED)
+    if profile is _UNRESOLVED:
+        profile = _joined_profile(request.user, model)
+    return profile
+
+
+def _created(request, profile):
+    if isinstance(request.user, CustomUser):
+        profile.user = request.user
+    request._role_profile = profile
+    return profile
+
+
+def role_profile(request, create=False):
+    """
+    Returns the caller's StudentProfile or TeacherProfile, or None for other
+    roles, resolving it once per request.
+
+    Authentication loads the profile in the same query as the user; users
+    built from token claims cost one query. A missing profile raises Http404
+    unless ``create`` is set.
+    """
+    model = PROFILE_MODELS.get(request.user.role)
+    if model is None:
+        return None
+    profile = _cached(request, model)
+    if profile is _UNRESOLVED:
+        profile = model.objects.select_related("user").filter(user_id=request.user.id).first()
+    request._role_profile = profile
+    if profile is None:
+        if not create:
+            raise Http404(f"No {model._meta.verbose_name} for this user")
+        profile, _ = model.objects.get_or_create(user_id=request.user.id)
+        return _created(request, profile)
+    return profile
+
+
+async def arole_profile(request, create=False):
+    """Async counterpart of ``role_profile``."""
+    model = PROFILE_MODELS.get(request.user.role)
+    if model is None:
+        return None
+    profile = _cached(request, model)
+    if profile is _UNRESOLVED:
+        profile = await model.objects.select_related("user").filter(user_id=request.user.id).afirst()
+    request._role_profile = profile
+    if profile is None:
+        if not create:
+            raise Http404(f"No {model._meta.verbose_name} for this user")
+        profile, _ = await model.objects.aget_or_create(user_id=request.user.id)
+        return _created(request, profile)
+    return profile
+
+
+def _lessons_of(role, profile):
+    if role == "admin":
+        return Lesson.objects.all()
+    if profile is None:
+        return Lesson.objects.none()
+    if role == "teacher":
+        return Lesson.objects.filter(teacher_id=profile.id)
+    return Lesson.objects.filter(student_id=profile.id)
+
+
+def scoped_lessons(request):
+    """Lessons the caller may act on: every lesson for admins, otherwise their own."""
+    role = request.user.role
+    return _lessons_of(role, None if role == "admin" else role_profile(request))
+
+
+async def ascoped_lessons(request):
+    """Async counterpart of ``scoped_lessons``."""
+    role = request.user.role
+    return _lessons_of(role, None if role == "admin" else await arole_profile(request))
@@ -0,0 +1,39 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# orjson writes these as raw UTF-8; DRF escapes them to stay a strict JavaScript subset.
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes compact, non-ASCII-escaped output with orjson.
+
+    Types orjson does not handle the way DRF's encoder does (dates and
+    times, decimals, lazy strings, querysets) go through that encoder, so
+    the bytes match ``JSONRenderer``. Indented or ASCII-escaped output and
+    anything orjson refuses fall back to the stock renderer.
+
+    Two differences remain, pinned by users/tests/test_renderers.py: floats
+    that need an exponent are spelled the way orjson does (``1e16`` rather
+    than ``1e+16``), which parses to the same value, and NaN or infinity
+    render as ``null`` where ``JSONRenderer`` raises under ``STRICT_JSON``.
+    The API's payloads hold no such floats.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in _LINE_SEPARATORS:
+            ret = ret.replace(raw, escaped)
+        return ret
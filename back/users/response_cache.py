@@ -0,0 +1,115 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+USER_SCOPE = "user"
+ROLE_SCOPE = "role"
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def response_cache_key(view_name, scope, value):
+    return f"response:{view_name}:{scope}:{value}"
+
+
+def invalidate_responses(view_names, scope, *values):
+    """
+    Drops the cached responses of ``view_names`` for each scope value once
+    the current transaction commits, so readers cannot re-cache old rows.
+    """
+    keys = [response_cache_key(view_name, scope, value) for view_name in view_names for value in values]
+    transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def _key(view, request, scope):
+    # Only plain JSON GETs are cached; anything with parameters goes through.
+    if request.query_params or getattr(request.accepted_renderer, "format", None) != "json":
+        return None
+    value = request.user.id if scope == USER_SCOPE else request.user.role
+    return response_cache_key(type(view).__name__, scope, value)
+
+
+def _entry(view, request, response, args, kwargs):
+    """Renders a fresh response to bytes; returns None when it must not be cached."""
+    if not isinstance(response, Response) or response.status_code != 200:
+        return None
+    response = view.finalize_response(request, response, *args, **kwargs)
+    content = response.rendered_content
+    return {
+        "content": content,
+        # Content-Type plus the Allow and Vary headers DRF adds on finalize.
+        "headers": [(key, value) for key, value in response.items() if key.lower() != "content-length"],
+        "etag": f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"',
+    }
+
+
+def _respond(request, entry):
+    response = HttpResponse(entry["content"])
+    for key, value in entry["headers"]:
+        response[key] = value
+    response["ETag"] = entry["etag"]
+    response["Cache-Control"] = "private, no-cache"
+    # Handles "*", weak W/ validators and lists of tags in If-None-Match.
+    return get_conditional_response(request, etag=entry["etag"], response=response)
+
+
+def cached_response(scope):
+    """
+    Caches a GET handler's rendered JSON per user (``USER_SCOPE``) or per
+    role (``ROLE_SCOPE``) until ``invalidate_responses`` drops it, and
+    answers ``If-None-Match`` with 304. Works on sync and async handlers.
+    """
+
+    def decorator(handler):
+        if iscoroutinefunction(handler):
+
+            @wraps(handler)
+            async def wrapper(self, request, *args, **kwargs):
+                key = _key(self, request, scope)
+                if key is None:
+                    return await handler(self, request, *args, **kwargs)
+                cache = _cache()
+                # The local-memory backend never blocks; others go through a thread.
+                local = isinstance(cache, LocMemCache)
+                entry = cache.get(key) if local else await cache.aget(key)
+                if entry is None:
+                    response = await handler(self, request, *args, **kwargs)
+                    entry = _entry(self, request, response, args, kwargs)
+                    if entry is None:
+                        return response
+                    if local:
+                        cache.set(key, entry, settings.RESPONSE_CACHE_TTL)
+                    else:
+                        await cache.aset(key, entry, settings.RESPONSE_CACHE_TTL)
+                return _respond(request, entry)
+
+            return wrapper
+
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            key = _key(self, request, scope)
+            if key is None:
+                return handler(self, request, *args, **kwargs)
+            cache = _cache()
+            entry = cache.get(key)
+            if entry is None:
+                response = handler(self, request, *args, **kwargs)
+                entry = _entry(self, request, response, args, kwargs)
+                if entry is None:
+                    return response
+                cache.set(key, entry, settings.RESPONSE_CACHE_TTL)
+            return _respond(request, entry)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,135 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+# Blacklist rows can commit out of id order; every sync re-reads the ids
+# added during this many seconds before it.
+COMMIT_MARGIN_SECONDS = 60
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, key):
+        positions = list(self._positions(key))
+        if all(self.bits[position >> 3] & (1 << (position & 7)) for position in positions):
+            return
+        for position in positions:
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevokedTokenFilter:
+    """
+    Process-local Bloom filter of blacklisted refresh token ``jti`` values.
+
+    A miss means the token is not blacklisted, so the database check can be
+    skipped; a hit still goes to the database. The filter picks up new
+    blacklist rows at most every ``JWT_BLACKLIST_SYNC_INTERVAL`` seconds and
+    is rebuilt from scratch once it holds more entries than it was sized for.
+    Tokens blacklisted by this process are added right away.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._synced_at = None
+        self._checkpoints = []
+
+    def _new_filter(self, entries=0):
+        capacity = max(getattr(settings, "JWT_BLACKLIST_BLOOM_CAPACITY", 100000), entries * 2)
+        return BloomFilter(capacity, getattr(settings, "JWT_BLACKLIST_BLOOM_ERROR_RATE", 0.001))
+
+    def _floor(self, now):
+        # The highest id seen by the newest sync that is older than the margin.
+        floor = 0
+        for synced_at, max_id in self._checkpoints:
+            if now - synced_at < COMMIT_MARGIN_SECONDS:
+                break
+            floor = max_id
+        return floor
+
+    def _sync(self, now):
+        if self._filter is None or self._filter.count > self._filter.capacity:
+            rows = list(BlacklistedToken.objects.values_list("id", "token__jti"))
+            self._filter = self._new_filter(len(rows))
+            self._checkpoints = []
+        else:
+            rows = list(BlacklistedToken.objects.filter(id__gt=self._floor(now)).values_list("id", "token__jti"))
+        for _, jti in rows:
+            self._filter.add(jti)
+
+        max_id = max((pk for pk, _ in rows), default=self._checkpoints[-1][1] if self._checkpoints else 0)
+        self._checkpoints.append((now, max_id))
+        # Keep the newest checkpoint past the margin, it is the next floor.
+        while len(self._checkpoints) > 1 and now - self._checkpoints[1][0] >= COMMIT_MARGIN_SECONDS:
+            self._checkpoints.pop(0)
+        self._synced_at = now
+
+    def might_be_revoked(self, jti):
+        now = time.monotonic()
+        with self._lock:
+            interval = getattr(settings, "JWT_BLACKLIST_SYNC_INTERVAL", 5.0)
+            if self._synced_at is None or now - self._synced_at >= interval:
+                self._sync(now)
+            return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._filter, self._synced_at, self._checkpoints = None, None, []
+
+
+revoked_tokens = RevokedTokenFilter()
+
+
+def prune_expired_tokens(batch_size=5000, now=None, pause=0.0, log=None):
+    """
+    Deletes outstanding refresh tokens past their expiry, and their
+    blacklist entries, in id-ordered batches of ``batch_size`` so no
+    transaction holds many row locks. Returns the number of tokens deleted.
+    """
+    now = now or timezone.now()
+    deleted = last_id = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(id__gt=last_id, expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+        last_id = ids[-1]
+        if log:
+            log(f"Deleted {deleted} expired tokens")
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+REPLICA_DATABASE = "replica"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Routes ORM reads made inside the block to the read replica, when one is configured."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads to the ``replica`` alias inside ``replica_reads()`` and
+    everything else, including all writes and migrations, to ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and REPLICA_DATABASE in settings.DATABASES:
+            return REPLICA_DATABASE
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA_DATABASE else None
+
+
+class ReplicaReadMixin:
+    """
+    Serves a view's GET and HEAD requests from the read replica. Reads may
+    lag the primary slightly, so only list and detail views opt in.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return await super().adispatch(request, *args, **kwargs)
@@ -1,12 +1,16 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer, Serializer
+from .fast_serializers import FastSerializer
+from .slots import series_occurrences
 from .models import (
     CustomUser,
     StudentProfile,
     TeacherProfile,
     AvailabilityBlock,
     Lesson,
+    LessonEventLog,
+    validate_timezone,
 )
 
 
@@ -51,9 +55,8 @@ class LoginUserSerializer(Serializer):
 class StudentProfileSerializer(ModelSerializer):
     email = serializers.EmailField(source="user.email", read_only=True)
     full_name = serializers.CharField(source="user.full_name")
-    timezone = serializers.CharField(source="user.timezone")
+    timezone = serializers.CharField(source="user.timezone", validators=[validate_timezone])
     role = serializers.CharField(source="user.role", read_only=True)
-    completion_percent = serializers.SerializerMethodField()
 
     class Meta:
         model = StudentProfile
@@ -87,9 +90,6 @@ class StudentProfileSerializer(ModelSerializer):
         ]
         read_only_fields = ["application_status", "submitted_at", "matched_teacher", "onboarding_notes"]
 
-    def get_completion_percent(self, obj):
-        return obj.completion_percent()
-
     def update(self, instance, validated_data):
         user_data = validated_data.pop("user", {})
         for attr, value in user_data.items():
@@ -101,7 +101,7 @@ class StudentProfileSerializer(ModelSerializer):
 class TeacherProfileSerializer(ModelSerializer):
     email = serializers.EmailField(source="user.email", read_only=True)
     full_name = serializers.CharField(source="user.full_name")
-    timezone = serializers.CharField(source="user.timezone")
+    timezone = serializers.CharField(source="user.timezone", validators=[validate_timezone])
     role = serializers.CharField(source="user.role", read_only=True)
 
     class Meta:
@@ -128,6 +128,30 @@ class TeacherProfileSerializer(ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class TeacherListSerializer(TeacherProfileSerializer):
+    """Admin teacher list row; expects the ``counters.with_workload()`` annotation on the queryset."""
+
+    matched_students = serializers.IntegerField(source="counters.matched_students", read_only=True)
+    requested_lessons = serializers.IntegerField(source="counters.requested_lessons", read_only=True)
+    proposed_lessons = serializers.IntegerField(source="counters.proposed_lessons", read_only=True)
+    confirmed_lessons = serializers.IntegerField(source="counters.confirmed_lessons", read_only=True)
+    canceled_lessons = serializers.IntegerField(source="counters.canceled_lessons", read_only=True)
+    completed_lessons = serializers.IntegerField(source="counters.completed_lessons", read_only=True)
+    minutes_this_week = serializers.IntegerField(read_only=True)
+
+    class Meta(TeacherProfileSerializer.Meta):
+        fields = [
+            *TeacherProfileSerializer.Meta.fields,
+            "matched_students",
+            "requested_lessons",
+            "proposed_lessons",
+            "confirmed_lessons",
+            "canceled_lessons",
+            "completed_lessons",
+            "minutes_this_week",
+        ]
+
+
 class AvailabilityBlockSerializer(ModelSerializer):
     class Meta:
         model = AvailabilityBlock
@@ -151,16 +175,105 @@ class LessonSerializer(ModelSerializer):
         ]
 
 
+class LessonEventSerializer(ModelSerializer):
+    payload = serializers.JSONField(source="payload_json")
+
+    class Meta:
+        model = LessonEventLog
+        fields = ["id", "lesson", "actor", "event_type", "payload", "created_at"]
+
+
 class LessonRequestSerializer(Serializer):
     starts_at_utc = serializers.DateTimeField()
     duration_minutes = serializers.ChoiceField(choices=[30, 60])
 
 
+class LessonSeriesSerializer(Serializer):
+    max_occurrences = 52
+
+    starts_at_utc = serializers.DateTimeField()
+    duration_minutes = serializers.ChoiceField(choices=[30, 60])
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), min_length=1, max_length=7, required=False
+    )
+    count = serializers.IntegerField(min_value=1, max_value=max_occurrences, required=False)
+    until = serializers.DateField(required=False)
+    skip_conflicts = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if ("count" in data) == ("until" in data):
+            raise serializers.ValidationError("Provide exactly one of count or until")
+
+        occurrences = series_occurrences(
+            data["starts_at_utc"],
+            data["duration_minutes"],
+            data.get("weekdays"),
+            self.context.get("timezone"),
+            count=data.get("count"),
+            until=data.get("until"),
+            limit=self.max_occurrences,
+        )
+        if not occurrences:
+            raise serializers.ValidationError("The series has no occurrences")
+        if len(occurrences) > self.max_occurrences:
+            raise serializers.ValidationError(f"A series is limited to {self.max_occurrences} lessons")
+        data["occurrences"] = occurrences
+        return data
+
+
+class LessonSeriesConflictSerializer(Serializer):
+    index = serializers.IntegerField()
+    starts_at_utc = serializers.DateTimeField()
+    ends_at_utc = serializers.DateTimeField()
+    lesson_ids = serializers.ListField(child=serializers.IntegerField())
+
+
+class LessonBulkSerializer(Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), min_length=1, max_length=200)
+
+
 class LessonProposeSerializer(Serializer):
     starts_at_utc = serializers.DateTimeField()
     duration_minutes = serializers.ChoiceField(choices=[30, 60])
 
 
+class AdminAutoMatchSerializer(Serializer):
+    # The assignment graph holds students x top_k x capacity edges, so both
+    # stay bounded. Omitting capacity uses MATCHING_TEACHER_CAPACITY.
+    capacity = serializers.IntegerField(min_value=1, max_value=50, required=False)
+    top_k = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    min_score = serializers.FloatField(min_value=0.0, max_value=1.0, default=0.5)
+    dry_run = serializers.BooleanField(default=False)
+
+
 class AdminStudentProfileSerializer(StudentProfileSerializer):
     class Meta(StudentProfileSerializer.Meta):
         read_only_fields = []
+
+
+class AdminApplicationListSerializer(ModelSerializer):
+    email = serializers.EmailField(source="user.email", read_only=True)
+    full_name = serializers.CharField(source="user.full_name", read_only=True)
+
+    class Meta:
+        model = StudentProfile
+        fields = [
+            "id",
+            "email",
+            "full_name",
+            "cefr_level",
+            "preparing_for",
+            "target_field",
+            "application_status",
+            "submitted_at",
+            "matched_teacher",
+            "completion_percent",
+        ]
+        read_only_fields = fields
+
+
+fast_student_profile_serializer = FastSerializer(StudentProfileSerializer)
+fast_teacher_profile_serializer = FastSerializer(TeacherProfileSerializer)
+fast_lesson_serializer = FastSerializer(LessonSerializer)
+fast_teacher_list_serializer = FastSerializer(TeacherListSerializer)
+fast_application_list_serializer = FastSerializer(AdminApplicationListSerializer)
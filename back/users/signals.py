@@ -0,0 +1,138 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .counters import (
+    lesson_state,
+    loaded_lesson_state,
+    rebuild_counters,
+    rebuild_lesson_owners,
+    rebuild_weekly_loads,
+    record_lesson_changes,
+    record_match_changes,
+    saved_lesson_state,
+)
+from .middleware import install_query_recorder
+from .models import CustomUser, Lesson, StudentCounters, StudentProfile, TeacherCounters, TeacherProfile
+from .response_cache import ROLE_SCOPE, USER_SCOPE, invalidate_responses
+
+USER_RESPONSE_VIEWS = ("AuthMeView", "StudentMeView", "TeacherMeView")
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_responses(sender, instance, update_fields=None, **kwargs):
+    # Logging in only stamps last_login, which no cached response shows.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate_responses(USER_RESPONSE_VIEWS, USER_SCOPE, instance.pk)
+    if instance.role == "teacher":
+        invalidate_responses(["TeachersListView"], ROLE_SCOPE, "admin")
+
+
+@receiver(post_save, sender=CustomUser)
+def rebuild_teacher_weeks(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Weekly loads are keyed by the teacher's local weeks, which move with their zone.
+    if created or raw or instance.role != "teacher":
+        return
+    if update_fields is not None and "timezone" not in update_fields:
+        return
+    dirty = instance.get_dirty_fields()
+    if dirty is not None and "timezone" not in dirty:
+        return
+    teacher_ids = list(TeacherProfile.objects.filter(user_id=instance.pk).values_list("pk", flat=True))
+    if teacher_ids:
+        rebuild_weekly_loads(teacher_ids)
+
+
+@receiver(post_save, sender=TeacherProfile)
+@receiver(post_delete, sender=TeacherProfile)
+def invalidate_teacher_responses(sender, instance, **kwargs):
+    invalidate_responses(["TeacherMeView"], USER_SCOPE, instance.user_id)
+    invalidate_responses(["TeachersListView"], ROLE_SCOPE, "admin")
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def invalidate_student_responses(sender, instance, **kwargs):
+    invalidate_responses(["StudentMeView"], USER_SCOPE, instance.user_id)
+
+
+@receiver(post_save, sender=TeacherProfile)
+def create_teacher_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TeacherCounters.objects.bulk_create([TeacherCounters(teacher=instance)], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=StudentProfile)
+def create_student_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        StudentCounters.objects.bulk_create([StudentCounters(student=instance)], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Lesson)
+def count_lesson_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        record_lesson_changes([(None, lesson_state(instance))])
+        return
+    before = loaded_lesson_state(instance)
+    if before is None:
+        rebuild_lesson_owners(instance)
+        return
+    record_lesson_changes([(before, saved_lesson_state(instance, before, update_fields))])
+
+
+@receiver(post_delete, sender=Lesson)
+def count_lesson_delete(sender, instance, **kwargs):
+    # The owners' counter rows may be going away in the same cascade.
+    record_lesson_changes([(loaded_lesson_state(instance) or lesson_state(instance), None)], rebuild_missing=False)
+
+
+def _saves_match(update_fields):
+    return update_fields is None or bool({"matched_teacher", "matched_teacher_id"} & set(update_fields))
+
+
+@receiver(pre_save, sender=StudentProfile)
+def read_previous_match(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Without the loaded value the previous teacher is only known from the row.
+    if raw or instance._state.adding or not _saves_match(update_fields):
+        return
+    if "matched_teacher_id" not in instance.__dict__.get("_loaded_values", {}):
+        previous = StudentProfile.objects.filter(pk=instance.pk).values_list("matched_teacher_id", flat=True)
+        instance._previous_match = previous.first()
+
+
+@receiver(post_save, sender=StudentProfile)
+def count_student_match(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not _saves_match(update_fields):
+        return
+    if created:
+        record_match_changes([(None, instance.matched_teacher_id)])
+        return
+    if "_previous_match" in instance.__dict__:
+        # Read outside the save, so both teachers are rebuilt rather than trusting a delta.
+        teacher_ids = {instance.__dict__.pop("_previous_match"), instance.matched_teacher_id} - {None}
+        if teacher_ids:
+            rebuild_counters(TeacherCounters, teacher_ids)
+        return
+    loaded = instance.__dict__.get("_loaded_values", {})
+    record_match_changes([(loaded["matched_teacher_id"], instance.matched_teacher_id)])
+
+
+@receiver(post_delete, sender=StudentProfile)
+def count_student_unmatch(sender, instance, **kwargs):
+    record_match_changes([(instance.matched_teacher_id, None)], rebuild_missing=False)
+
+
+@receiver(connection_created)
+def attach_query_recorder(sender, connection, **kwargs):
+    install_query_recorder(connection)
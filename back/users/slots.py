@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from .models import AvailabilityBlock, Lesson, TeacherProfile
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday == 0).
+SECONDS_PER_DAY = 86400
+
+
+def zone_or_utc(name):
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def _local_to_utc_seconds(local_seconds, tz):
+    """Converts naive local epoch seconds one by one, skipping times in a DST gap."""
+    converted = np.empty_like(local_seconds)
+    keep = np.ones(local_seconds.shape, dtype=bool)
+    for index, value in enumerate(local_seconds.tolist()):
+        naive = EPOCH + timedelta(seconds=value)
+        aware = naive.replace(tzinfo=tz)
+        if aware.astimezone(dt_timezone.utc).astimezone(tz).replace(tzinfo=None) != naive:
+            keep[index] = False
+            continue
+        converted[index] = value - int(aware.utcoffset().total_seconds())
+    return converted, keep
+
+
+def _day_offsets(days, tz):
+    """Returns each local day's UTC offset in seconds and whether it changes during the day."""
+    offsets = np.empty(len(days) + 1, dtype=np.int64)
+    for index, day in enumerate(np.append(days, days[-1] + 1).tolist()):
+        midnight = (EPOCH + timedelta(days=day)).replace(tzinfo=tz)
+        offsets[index] = int(midnight.utcoffset().total_seconds())
+    return offsets[:-1], offsets[:-1] != offsets[1:]
+
+
+def expand_blocks(blocks, start_date, end_date, tz):
+    """
+    Expands weekly availability blocks into concrete slots between two local
+    dates (end exclusive).
+
+    ``blocks`` is a sequence of ``(day_of_week, start_time, end_time,
+    slot_duration)`` tuples. Returns sorted, de-duplicated arrays of slot
+    start and end instants as UTC epoch seconds.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    first_day = (start_date - EPOCH.date()).days
+    last_day = (end_date - EPOCH.date()).days
+    if not blocks or last_day <= first_day:
+        return empty, empty
+
+    dow, block_start, block_end, duration = (np.array(column, dtype=np.int64) for column in zip(*(
+        (day, start.hour * 3600 + start.minute * 60, end.hour * 3600 + end.minute * 60, minutes * 60)
+        for day, start, end, minutes in blocks
+    )))
+
+    counts = np.maximum((block_end - block_start) // duration, 0)
+    block_index = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    slot_offset = block_start[block_index] + step * duration[block_index]
+    slot_duration = duration[block_index]
+    slot_dow = dow[block_index]
+
+    days = np.arange(first_day, last_day, dtype=np.int64)
+    offsets, transitions = _day_offsets(days, tz)
+    weekdays = (days + EPOCH_WEEKDAY) % 7
+
+    starts, durations, day_positions = [], [], []
+    for weekday in range(7):
+        day_mask = weekdays == weekday
+        slot_mask = slot_dow == weekday
+        if not day_mask.any() or not slot_mask.any():
+            continue
+        positions = np.flatnonzero(day_mask)
+        local = days[positions][:, None] * SECONDS_PER_DAY + slot_offset[slot_mask][None, :]
+        starts.append(local.ravel())
+        durations.append(np.broadcast_to(slot_duration[slot_mask], local.shape).ravel())
+        day_positions.append(np.broadcast_to(positions[:, None], local.shape).ravel())
+
+    if not starts:
+        return empty, empty
+
+    local_starts = np.concatenate(starts)
+    durations = np.concatenate(durations)
+    day_positions = np.concatenate(day_positions)
+
+    utc_starts = local_starts - offsets[day_positions]
+    on_transition = transitions[day_positions]
+    if on_transition.any():
+        converted, keep = _local_to_utc_seconds(local_starts[on_transition], tz)
+        utc_starts[on_transition] = converted
+        valid = np.ones(utc_starts.shape, dtype=bool)
+        valid[on_transition] = keep
+        utc_starts, durations = utc_starts[valid], durations[valid]
+
+    # Overlapping blocks can yield the same slot twice; np.unique also sorts.
+    keys = np.unique(utc_starts * SECONDS_PER_DAY + durations)
+    utc_starts, durations = keys // SECONDS_PER_DAY, keys % SECONDS_PER_DAY
+    return utc_starts, utc_starts + durations
+
+
+def subtract_busy(starts, ends, busy_starts, busy_ends):
+    """
+    Drops slots overlapping any busy interval with a sorted sweep:
+    ``busy_starts`` must be sorted; a slot is free unless the furthest end of
+    the busy intervals starting before it ends reaches past its start.
+    """
+    if not len(busy_starts) or not len(starts):
+        return starts, ends
+    reach = np.maximum.accumulate(busy_ends)
+    last_before_end = np.searchsorted(busy_starts, ends, side="left") - 1
+    blocked = (last_before_end >= 0) & (reach[np.maximum(last_before_end, 0)] > starts)
+    return starts[~blocked], ends[~blocked]
+
+
+def series_occurrences(starts_at, duration_minutes, weekdays, tz_name, count=None, until=None, limit=None):
+    """
+    Expands a weekly recurrence into sorted ``(starts_at, ends_at)`` UTC
+    pairs.
+
+    Occurrences fall on ``weekdays`` (Monday == 0; by default the weekday
+    of ``starts_at``) from the local date of ``starts_at`` onwards and keep
+    its wall-clock time in ``tz_name`` across DST changes. Expansion stops
+    after ``count`` occurrences, after the local date ``until``, or once
+    ``limit`` is exceeded.
+    """
+    tz = zone_or_utc(tz_name)
+    local = starts_at.astimezone(tz)
+    wall_time, day = local.time(), local.date()
+    weekdays = set(weekdays) if weekdays else {day.weekday()}
+    duration = timedelta(minutes=duration_minutes)
+    occurrences = []
+    while (count is None or len(occurrences) < count) and (until is None or day <= until):
+        if day.weekday() in weekdays:
+            start = datetime.combine(day, wall_time, tzinfo=tz).astimezone(dt_timezone.utc)
+            occurrences.append((start, start + duration))
+            if limit is not None and len(occurrences) > limit:
+                break
+        day += timedelta(days=1)
+    return occurrences
+
+
+def _to_epoch_seconds(values):
+    return np.array([int(value.timestamp()) for value in values], dtype=np.int64)
+
+
+def _format_utc(seconds):
+    return [value + "Z" for value in np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s").tolist()]
+
+
+def bookable_slots(teacher_id, start_date, end_date, now=None):
+    """
+    Returns the teacher's free slots between two dates in the teacher's
+    timezone (end exclusive), minus confirmed lessons and past slots.
+
+    Returns None when the teacher does not exist.
+    """
+    rows = list(
+        AvailabilityBlock.objects.filter(teacher_id=teacher_id).values_list(
+            "day_of_week", "start_time", "end_time", "slot_duration", "teacher__user__timezone"
+        )
+    )
+    if not rows:
+        return [] if TeacherProfile.objects.filter(pk=teacher_id).exists() else None
+
+    tz = zone_or_utc(rows[0][4])
+    starts, ends = expand_blocks([row[:4] for row in rows], start_date, end_date, tz)
+    if not len(starts):
+        return []
+
+    now_seconds = int((now or datetime.now(dt_timezone.utc)).timestamp())
+    upcoming = starts >= now_seconds
+    starts, ends = starts[upcoming], ends[upcoming]
+    if not len(starts):
+        return []
+
+    busy = list(
+        Lesson.objects.filter(
+            teacher_id=teacher_id,
+            status="confirmed",
+            starts_at_utc__lt=datetime.fromtimestamp(int(ends.max()), dt_timezone.utc),
+            ends_at_utc__gt=datetime.fromtimestamp(int(starts[0]), dt_timezone.utc),
+        )
+        .order_by("starts_at_utc")
+        .values_list("starts_at_utc", "ends_at_utc")
+    )
+    if busy:
+        busy_starts, busy_ends = zip(*busy)
+        starts, ends = subtract_busy(starts, ends, _to_epoch_seconds(busy_starts), _to_epoch_seconds(busy_ends))
+
+    durations = ((ends - starts) // 60).tolist()
+    return [
+        {"starts_at_utc": start, "ends_at_utc": end, "duration_minutes": minutes}
+        for start, end, minutes in zip(_format_utc(starts), _format_utc(ends), durations)
+    ]
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import cache
+
+import orjson
+import psycopg
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from .models import LessonEventLog
+from .renderers import ORJSONRenderer
+from .serializers import LessonEventSerializer
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CHANNEL = "admin"
+
+# Handed to a subscriber that fell too far behind; its stream ends and the
+# client reconnects with Last-Event-ID to catch up from the database.
+OVERFLOW = object()
+
+
+def lesson_channels(lesson):
+    return (f"teacher:{lesson.teacher_id}", f"student:{lesson.student_id}", ADMIN_CHANNEL)
+
+
+def user_channel(role, profile):
+    return ADMIN_CHANNEL if role == "admin" else f"{role}:{profile.id}"
+
+
+class Subscription:
+    """A subscriber's bounded message queue, owned by the event loop that created it."""
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        # Publishers run in request or writer threads.
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            pass
+
+    def _put(self, message):
+        if self._queue.full():
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            message = OVERFLOW
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    In-process pub/sub: publish() fans a message out to this process's
+    subscribers of any of its channels. Messages published by other
+    processes are not seen; use a broker that relays them for that.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels, getattr(settings, "LESSON_STREAM_QUEUE_SIZE", 100))
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channels, message):
+        self.dispatch(channels, message)
+
+    def dispatch(self, channels, message):
+        with self._lock:
+            targets = {subscription for channel in channels for subscription in self._subscribers.get(channel, ())}
+        for subscription in targets:
+            subscription.deliver(message)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    LocalBroker whose messages travel through Postgres NOTIFY, so every
+    process running a listener sees every worker's events. A process only
+    listens once something subscribes in it.
+    """
+
+    notify_channel = "lesson_events"
+    # NOTIFY payloads are capped at 8000 bytes.
+    max_payload = 7900
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def subscribe(self, channels):
+        self._ensure_listener()
+        return super().subscribe(channels)
+
+    def publish(self, channels, message):
+        event_id, frame = message
+        payload = orjson.dumps({"channels": list(channels), "id": event_id, "frame": frame}).decode()
+        if len(payload.encode()) > self.max_payload:
+            # Too large to relay; subscribers reconnect and replay it instead.
+            payload = orjson.dumps({"channels": list(channels), "id": event_id, "frame": None}).decode()
+        with connections["default"].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.notify_channel, payload])
+
+    def _ensure_listener(self):
+        with self._start_lock:
+            # Threads do not survive fork, so a forked worker starts its own.
+            if self._listener is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._listener = threading.Thread(target=self._listen, name="lesson-event-listener", daemon=True)
+            self._listener.start()
+
+    def _conninfo(self):
+        params = connections["default"].get_connection_params()
+        return {key: value for key, value in params.items() if key not in {"cursor_factory", "context"}}
+
+    def _listen(self):
+        while True:
+            try:
+                with psycopg.connect(**self._conninfo(), autocommit=True) as conn:
+                    conn.execute(f"LISTEN {self.notify_channel}")
+                    for notify in conn.notifies():
+                        message = orjson.loads(notify.payload)
+                        frame = message["frame"]
+                        self.dispatch(message["channels"], OVERFLOW if frame is None else (message["id"], frame))
+            except Exception:
+                logger.exception("Lesson event listener lost its connection")
+                time.sleep(1)
+
+
+@cache
+def lesson_broker():
+    return import_string(getattr(settings, "LESSON_STREAM_BROKER", "users.streams.LocalBroker"))()
+
+
+def event_frame(event):
+    data = ORJSONRenderer().render(LessonEventSerializer(event).data).decode()
+    return f"id: {event.id}\ndata: {data}\n\n"
+
+
+def publish_lesson_events(events):
+    broker = lesson_broker()
+    for event in events:
+        broker.publish(lesson_channels(event.lesson), (event.id, event_frame(event)))
+
+
+def _replay_events(role, profile, after_id, limit):
+    events = LessonEventLog.objects.filter(id__gt=after_id)
+    if role != "admin":
+        events = events.filter(**{f"lesson__{role}_id": profile.id})
+    # Newest first so an oversized backlog still tells us where it ends.
+    return list(events.order_by("-id")[: limit + 1])[::-1]
+
+
+async def lesson_event_stream(role, profile, last_event_id):
+    """
+    Yields Server-Sent Events for the lesson events visible to one user:
+    first those after ``last_event_id`` from the database, then live ones
+    from the broker, with a comment line every ``LESSON_STREAM_HEARTBEAT``
+    seconds. A backlog over ``LESSON_STREAM_REPLAY_LIMIT`` is skipped with
+    a ``resync`` event telling the client to reload its lessons.
+    """
+    subscription = lesson_broker().subscribe([user_channel(role, profile)])
+    try:
+        yield f"retry: {getattr(settings, 'LESSON_STREAM_RETRY_MS', 3000)}\n\n"
+        replayed = set()
+        if last_event_id is not None:
+            limit = getattr(settings, "LESSON_STREAM_REPLAY_LIMIT", 500)
+            backlog = await sync_to_async(_replay_events)(role, profile, last_event_id, limit)
+            if len(backlog) > limit:
+                yield f"id: {backlog[-1].id}\nevent: resync\ndata: {{}}\n\n"
+                replayed.update(event.id for event in backlog)
+            else:
+                for event in backlog:
+                    replayed.add(event.id)
+                    yield event_frame(event)
+        # The stream may stay open for hours; it must not pin a connection.
+        await sync_to_async(connections.close_all)()
+
+        heartbeat = getattr(settings, "LESSON_STREAM_HEARTBEAT", 15)
+        while True:
+            message = await subscription.get(heartbeat)
+            if message is None:
+                yield ": keepalive\n\n"
+            elif message is OVERFLOW:
+                return
+            elif message[0] not in replayed:
+                yield message[1]
+    finally:
+        subscription.close()
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from rest_framework.test import APIClient
+
+from users.models import CustomUser, Lesson, StudentProfile, TeacherProfile
+from users.tokens import UserRefreshToken
+
+
+def make_user(email, role, **fields):
+    """Creates a user and, for students and teachers, an empty profile."""
+    fields.setdefault("full_name", email.split("@")[0])
+    user = CustomUser.objects.create_user(email=email, password="pw-12345!", role=role, **fields)
+    if role == "student":
+        StudentProfile.objects.create(user=user)
+    elif role == "teacher":
+        TeacherProfile.objects.create(user=user)
+    return user
+
+
+def make_lesson(student, teacher, starts_at, duration=60, status="requested", **fields):
+    return Lesson.objects.create(
+        student=student,
+        teacher=teacher,
+        starts_at_utc=starts_at,
+        ends_at_utc=starts_at + timedelta(minutes=duration),
+        duration_minutes=duration,
+        status=status,
+        requested_by_role=fields.pop("requested_by_role", "student"),
+        **fields,
+    )
+
+
+def client_for(user, client_class=APIClient):
+    """A test client (APIClient unless given another class) signed in as ``user``."""
+    client = client_class()
+    client.cookies["access_token"] = str(UserRefreshToken.for_user(user).access_token)
+    return client
@@ -0,0 +1,23 @@
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from users.async_views import AsyncReadAPIView
+
+
+class RenderedResponseTests(SimpleTestCase):
+    def test_rendered_response_keeps_headers_and_cookies(self):
+        response = Response({"ok": True}, status=201, headers={"X-Extra": "1"})
+        response.accepted_renderer = JSONRenderer()
+        response.accepted_media_type = "application/json"
+        response.renderer_context = {}
+        response.set_cookie("session_hint", "abc", httponly=True)
+
+        rendered = async_to_sync(AsyncReadAPIView()._rendered)(response)
+
+        self.assertEqual(rendered.status_code, 201)
+        self.assertEqual(rendered.content, b'{"ok":true}')
+        self.assertEqual(rendered["X-Extra"], "1")
+        self.assertEqual(rendered.cookies["session_hint"].value, "abc")
+        self.assertTrue(rendered.cookies["session_hint"]["httponly"])
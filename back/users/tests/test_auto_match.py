@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.models import AvailabilityBlock, StudentProfile, TeacherCounters
+from users.tests.helpers import client_for, make_user
+
+URL = "/api/v1/admin/applications/auto-match/"
+
+
+def make_teacher(email):
+    profile = make_user(email, "teacher").teacher_profile
+    profile.levels_supported = ["B1"]
+    profile.teaching_tracks = ["business"]
+    profile.save()
+    AvailabilityBlock.objects.create(teacher=profile, day_of_week=1, start_time="09:00", end_time="12:00", slot_duration=60)
+    return profile
+
+
+def make_applicant(email, level="B1", track="business", status="submitted"):
+    profile = make_user(email, "student").student_profile
+    profile.cefr_level = level
+    profile.target_field = track
+    profile.weekly_time_budget_hours = 3
+    profile.application_status = status
+    profile.submitted_at = timezone.now()
+    profile.save()
+    return profile
+
+
+class AdminAutoMatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin@example.com", "admin")
+        cls.busy = make_teacher("busy@example.com")
+        cls.free = make_teacher("free@example.com")
+        # Already holds one of the busy teacher's two seats.
+        matched = make_applicant("matched@example.com", status="matched")
+        matched.matched_teacher = cls.busy
+        matched.save()
+        cls.applicants = [make_applicant(f"student{index}@example.com") for index in range(4)]
+        # Scores 0.3 at best against a B1 business teacher, below the default min_score.
+        cls.mismatch = make_applicant("mismatch@example.com", level="C2", track="art")
+
+    def setUp(self):
+        self.client = client_for(self.admin)
+
+    def matches(self):
+        return {
+            pk: (teacher_id, status)
+            for pk, teacher_id, status in StudentProfile.objects.values_list("pk", "matched_teacher_id", "application_status")
+        }
+
+    def test_rejects_out_of_range_parameters(self):
+        for payload, field in (
+            ({"capacity": 0}, "capacity"),
+            ({"capacity": 10_000}, "capacity"),
+            ({"top_k": 1_000_000}, "top_k"),
+            ({"top_k": "many"}, "top_k"),
+            ({"min_score": 1.5}, "min_score"),
+        ):
+            response = self.client.post(URL, payload, format="json")
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn(field, response.json())
+
+    def test_assigns_within_capacity_and_min_score(self):
+        response = self.client.post(URL, {"capacity": 2}, format="json")
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result["students"], result["matched"], result["unmatched"]), (5, 3, 2))
+
+        assignments = {row["student_id"]: row["teacher_id"] for row in result["assignments"]}
+        self.assertNotIn(self.mismatch.pk, assignments)
+        self.assertLessEqual(set(assignments), {applicant.pk for applicant in self.applicants})
+        teachers = list(assignments.values())
+        self.assertEqual((teachers.count(self.busy.pk), teachers.count(self.free.pk)), (1, 2))
+
+        matches = self.matches()
+        for student_id, teacher_id in assignments.items():
+            self.assertEqual(matches[student_id], (teacher_id, "matched"))
+        self.assertEqual(matches[self.mismatch.pk], (None, "submitted"))
+        self.assertEqual(
+            dict(TeacherCounters.objects.values_list("pk", "matched_students")), {self.busy.pk: 2, self.free.pk: 2}
+        )
+
+    def test_dry_run_writes_nothing(self):
+        before = self.matches()
+        response = self.client.post(URL, {"capacity": 2, "dry_run": True}, format="json")
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertTrue(result["dry_run"])
+        self.assertEqual(result["matched"], 3)
+        self.assertEqual(self.matches(), before)
+
+    def test_failed_write_leaves_applications_untouched(self):
+        before = self.matches()
+        # Fails once matched_teacher and application_status are both written.
+        with mock.patch("users.matching.record_match_changes", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(URL, {"capacity": 2}, format="json")
+        self.assertEqual(self.matches(), before)
@@ -0,0 +1,50 @@
+from django.db.models import Count
+from django.test import TestCase
+
+from users.benchmarking import seed_benchmark_data
+from users.counters import BOOKED_STATUSES, STATUS_FIELDS, teacher_zones, week_start
+from users.models import Lesson, StudentCounters, StudentProfile, TeacherCounters, TeacherWeeklyLoad
+
+
+class SeedBenchmarkDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_benchmark_data(teachers=3, students=8, lessons=40, batch_size=16)
+
+    def test_completion_percent_is_computed(self):
+        profiles = StudentProfile.objects.select_related("user")
+        self.assertEqual(profiles.count(), 8)
+        for profile in profiles:
+            self.assertEqual(profile.completion_percent, profile.compute_completion_percent())
+        self.assertEqual(set(profiles.values_list("completion_percent", flat=True)), {92, 100})
+
+    def test_counters_match_lessons(self):
+        for model, owner in ((TeacherCounters, "teacher"), (StudentCounters, "student")):
+            expected = {}
+            for row in Lesson.objects.values(f"{owner}_id", "status").annotate(total=Count("id")):
+                expected.setdefault(row[f"{owner}_id"], {})[STATUS_FIELDS[row["status"]]] = row["total"]
+            counters = model.objects.all()
+            self.assertEqual(len(counters), 3 if owner == "teacher" else 8)
+            for counter in counters:
+                for field in STATUS_FIELDS.values():
+                    self.assertEqual(getattr(counter, field), expected.get(counter.pk, {}).get(field, 0), (owner, field))
+
+        matched = dict(
+            StudentProfile.objects.exclude(matched_teacher=None)
+            .values("matched_teacher_id")
+            .annotate(total=Count("id"))
+            .values_list("matched_teacher_id", "total")
+        )
+        for counter in TeacherCounters.objects.all():
+            self.assertEqual(counter.matched_students, matched.get(counter.pk, 0))
+
+    def test_weekly_loads_match_lessons(self):
+        zones = teacher_zones(TeacherCounters.objects.values_list("pk", flat=True))
+        expected = {}
+        for teacher_id, starts_at, minutes in Lesson.objects.filter(status__in=BOOKED_STATUSES).values_list(
+            "teacher_id", "starts_at_utc", "duration_minutes"
+        ):
+            key = (teacher_id, week_start(starts_at, zones[teacher_id]))
+            expected[key] = expected.get(key, 0) + minutes
+        loads = TeacherWeeklyLoad.objects.values_list("teacher_id", "week_start", "booked_minutes")
+        self.assertEqual({(teacher_id, week): minutes for teacher_id, week, minutes in loads}, expected)
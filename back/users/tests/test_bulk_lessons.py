@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+
+from users.models import Lesson
+from users.tests.helpers import client_for, make_lesson, make_user
+
+URL = "/api/v1/lessons/bulk/confirm/"
+START = datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc)
+
+
+class LessonBulkConfirmTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = make_user("teacher@example.com", "teacher")
+        cls.other_teacher = make_user("other@example.com", "teacher")
+        cls.admin = make_user("admin@example.com", "admin")
+        teacher, other_teacher = cls.teacher.teacher_profile, cls.other_teacher.teacher_profile
+        first, second = (make_user(f"student{index}@example.com", "student").student_profile for index in range(2))
+
+        cls.early = make_lesson(first, teacher, START)
+        cls.late = make_lesson(second, teacher, START + timedelta(minutes=30))
+        make_lesson(second, teacher, START + timedelta(hours=2, minutes=30), status="confirmed")
+        cls.clashing = make_lesson(first, teacher, START + timedelta(hours=2))
+        # Same student as ``early``, another teacher.
+        cls.foreign = make_lesson(first, other_teacher, START + timedelta(minutes=45))
+
+    def statuses(self):
+        return dict(Lesson.objects.values_list("pk", "status"))
+
+    def confirm(self, user, ids):
+        return client_for(user).post(URL, {"ids": ids}, format="json")
+
+    def test_conflicts_are_reported_per_lesson(self):
+        before = self.statuses()
+        missing = max(before) + 1
+        ids = [self.late.pk, self.early.pk, self.clashing.pk, self.foreign.pk, missing]
+        response = self.confirm(self.teacher, ids)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+
+        self.assertEqual([lesson["id"] for lesson in body["lessons"]], [self.early.pk])
+        self.assertEqual(
+            body["errors"],
+            [
+                # Listed first, but starts after ``early`` and overlaps it.
+                {"id": self.late.pk, "error": "Overlaps another lesson in this batch"},
+                {"id": self.clashing.pk, "error": "Overlapping confirmed lesson"},
+                # Another teacher's lesson is outside the caller's scope.
+                {"id": self.foreign.pk, "error": "Not found"},
+                {"id": missing, "error": "Not found"},
+            ],
+        )
+        self.assertEqual(self.statuses(), {**before, self.early.pk: "confirmed"})
+
+    def test_batch_overlap_through_the_student(self):
+        before = self.statuses()
+        response = self.confirm(self.admin, [self.foreign.pk, self.early.pk])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([lesson["id"] for lesson in body["lessons"]], [self.early.pk])
+        self.assertEqual(body["errors"], [{"id": self.foreign.pk, "error": "Overlaps another lesson in this batch"}])
+        self.assertEqual(self.statuses(), {**before, self.early.pk: "confirmed"})
+
+    def test_nothing_confirmable_is_rejected(self):
+        before = self.statuses()
+        response = self.confirm(self.other_teacher, [self.early.pk, self.late.pk])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["errors"],
+            [{"id": self.early.pk, "error": "Not found"}, {"id": self.late.pk, "error": "Not found"}],
+        )
+        self.assertEqual(self.statuses(), before)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+from django.utils import timezone
+
+from users.counters import rebuild_weekly_loads, week_start, with_workload
+from users.models import CustomUser, Lesson, StudentProfile, TeacherCounters, TeacherProfile, TeacherWeeklyLoad
+from users.tests.helpers import make_lesson, make_user
+
+
+class WeeklyLoadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = make_user("auckland@example.com", "teacher", timezone="Pacific/Auckland").teacher_profile
+        cls.student = make_user("student@example.com", "student").student_profile
+
+    def book(self, starts_at, duration=60):
+        return make_lesson(self.student, self.teacher, starts_at, duration, status="confirmed")
+
+    def loads(self):
+        return dict(TeacherWeeklyLoad.objects.filter(teacher=self.teacher).values_list("week_start", "booked_minutes"))
+
+    def test_lessons_count_towards_the_teachers_local_week(self):
+        # Sunday 20:00 UTC is already Monday morning in Auckland.
+        sunday_evening = datetime(2030, 6, 2, 20, tzinfo=dt_timezone.utc)
+        self.book(sunday_evening)
+        self.book(sunday_evening - timedelta(days=1), duration=30)
+        self.assertEqual(self.loads(), {datetime(2030, 6, 3).date(): 60, datetime(2030, 5, 27).date(): 30})
+
+    def test_rebuild_matches_incremental_weeks(self):
+        sunday_evening = datetime(2030, 6, 2, 20, tzinfo=dt_timezone.utc)
+        self.book(sunday_evening)
+        self.book(sunday_evening - timedelta(days=1), duration=30)
+        incremental = self.loads()
+        TeacherWeeklyLoad.objects.all().delete()
+        rebuild_weekly_loads([self.teacher.pk])
+        self.assertEqual(self.loads(), incremental)
+
+    def test_timezone_change_rebuilds_weeks(self):
+        self.book(datetime(2030, 6, 2, 20, tzinfo=dt_timezone.utc))
+        user = CustomUser.objects.get(pk=self.teacher.user_id)
+        user.timezone = "UTC"
+        user.save()
+        self.assertEqual(self.loads(), {datetime(2030, 5, 27).date(): 60})
+
+        lesson = Lesson.objects.get()
+        lesson.status = "canceled"
+        lesson.save()
+        self.assertEqual(self.loads(), {datetime(2030, 5, 27).date(): 0})
+
+    def test_workload_uses_the_current_local_week(self):
+        now = timezone.now()
+        self.book(now + timedelta(minutes=1))
+        expected = 60 if week_start(now + timedelta(minutes=1), "Pacific/Auckland") == week_start(now, "Pacific/Auckland") else None
+        row = with_workload(TeacherProfile.objects.filter(pk=self.teacher.pk)).values("minutes_this_week").get()
+        self.assertEqual(row["minutes_this_week"], expected)
+
+
+class MatchCounterTests(TestCase):
+    def test_match_change_without_loaded_teacher_rebuilds_both(self):
+        first, second = (make_user(email, "teacher").teacher_profile for email in ("first@example.com", "second@example.com"))
+        user = CustomUser.objects.create_user(email="student@example.com", password="pw-12345!", role="student")
+        StudentProfile.objects.create(user=user, matched_teacher=first)
+
+        profile = StudentProfile.objects.only("id").get(user=user)
+        profile.matched_teacher = second
+        profile.save()
+
+        matched = dict(TeacherCounters.objects.values_list("pk", "matched_students"))
+        self.assertEqual(matched, {first.pk: 0, second.pk: 1})
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from users.events import BATCHED, LessonEventWriter, record_lesson_events
+from users.models import LessonEventLog
+from users.tests.helpers import make_lesson, make_user
+
+
+class LessonEventWriterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.actor = make_user("teacher@example.com", "teacher")
+        student = make_user("student@example.com", "student").student_profile
+        start = datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc)
+        cls.lessons = [
+            make_lesson(student, cls.actor.teacher_profile, start + timedelta(days=index)) for index in range(3)
+        ]
+
+    def setUp(self):
+        LessonEventLog.objects.all().delete()
+        self.writer = LessonEventWriter(batch_size=3, flush_interval=60, max_attempts=2)
+        # Keep the writer thread out of the test transaction.
+        self.writer._ensure_thread = lambda: None
+
+    def event(self, lesson, payload=None):
+        return LessonEventLog(lesson=lesson, actor=self.actor, event_type="confirmed", payload_json=payload or {})
+
+    def test_full_batch_signals_the_writer_thread(self):
+        for lesson in self.lessons[:3]:
+            self.writer.enqueue(self.event(lesson))
+        self.assertTrue(self.writer._wake.is_set())
+        self.assertEqual(self.writer.pending(), 3)
+        self.assertFalse(LessonEventLog.objects.exists())
+
+    @override_settings(LESSON_EVENT_LOG_MODE=BATCHED)
+    def test_batched_events_are_enqueued_together_on_commit(self):
+        with mock.patch("users.events.event_writer", self.writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                record_lesson_events(self.lessons, self.actor.id, "confirmed")
+                self.assertEqual(self.writer.pending(), 0)
+        self.assertEqual(self.writer.pending(), 3)
+        self.assertTrue(self.writer._wake.is_set())
+        self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(sorted(LessonEventLog.objects.values_list("lesson_id", flat=True)), [lesson.pk for lesson in self.lessons])
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        # jsonb rejects NUL characters.
+        bad = self.event(self.lessons[0], {"note": "\x00"})
+        for event in (self.event(self.lessons[0]), bad, self.event(self.lessons[1])):
+            self.writer.enqueue(event)
+
+        with self.assertLogs("users.events", "WARNING"):
+            self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(LessonEventLog.objects.count(), 2)
+        self.assertEqual(self.writer.pending(), 1)
+
+        with self.assertLogs("users.events", "ERROR"):
+            self.assertEqual(self.writer.flush(), 0)
+        self.assertEqual(self.writer.pending(), 0)
+        self.assertEqual(LessonEventLog.objects.count(), 2)
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase
+
+from users.exports import FORMATS, stream_export
+from users.models import LessonEventLog
+from users.tests.helpers import client_for, make_lesson, make_user
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = make_user("admin@example.com", "admin")
+        teacher = make_user("teacher@example.com", "teacher").teacher_profile
+        student = make_user("student@example.com", "student", full_name='Zoë "Z", Lefèvre').student_profile
+        start = datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc)
+        for index, status in enumerate(("requested", "confirmed", "canceled")):
+            lesson = make_lesson(student, teacher, start + timedelta(days=index), status=status, notes="line\nbreak, comma")
+            LessonEventLog.objects.create(lesson=lesson, actor=cls.admin, event_type=status, payload_json={"index": index})
+
+    def test_async_export_matches_sync(self):
+        for dataset in ("lessons", "events"):
+            for export_format in FORMATS:
+                expected = "".join(stream_export(dataset, export_format))
+                chunks = stream_export(dataset, export_format, asynchronous=True)
+                self.assertEqual("".join(async_to_sync(_collect)(chunks)), expected, (dataset, export_format))
+        self.assertEqual(len("".join(stream_export("lessons", "ndjson")).splitlines()), 3)
+
+    def test_view_streams_asynchronously_under_asgi(self):
+        url = "/api/v1/admin/exports/lessons/?as=ndjson"
+        response = client_for(self.admin).get(url)
+        self.assertFalse(response.is_async)
+        expected = b"".join(response.streaming_content)
+
+        async_client = client_for(self.admin, AsyncClient)
+
+        async def fetch():
+            response = await async_client.get(url)
+            self.assertTrue(response.is_async)
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(async_to_sync(fetch)(), expected)
+
+    def test_command_writes_to_its_stdout(self):
+        stdout = StringIO()
+        # Naive bounds are read in the current time zone, as the admin export does.
+        call_command("export_data", "lessons", "--format", "ndjson", "--from", "2030-06-04T00:00", stdout=stdout)
+        start = datetime(2030, 6, 4, tzinfo=dt_timezone.utc)
+        self.assertEqual(stdout.getvalue(), "".join(stream_export("lessons", "ndjson", start=start)))
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase
+from django.utils.http import parse_http_date
+
+from users import ical
+from users.models import CustomUser, Lesson
+from users.tests.helpers import make_lesson, make_user
+
+START = datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc)
+
+
+class FoldTests(SimpleTestCase):
+    def test_multibyte_text_is_folded_between_characters(self):
+        for text in ("é" * 60, "先" * 40, "a" + "😀" * 30, "x" * 74 + "é"):
+            line = f"DESCRIPTION:{text}"
+            folded = ical._fold(line)
+            pieces = folded.split("\r\n ")
+            self.assertGreater(len(pieces), 1, text)
+            self.assertLessEqual(len(pieces[0].encode()), 75)
+            # Continuation lines start with a space, which counts towards the 75 octets.
+            self.assertTrue(all(len(piece.encode()) <= 74 for piece in pieces[1:]), text)
+            self.assertEqual("".join(pieces), line)
+
+    def test_short_lines_are_unchanged(self):
+        self.assertEqual(ical._fold("SUMMARY:Leçon"), "SUMMARY:Leçon")
+
+
+class CalendarFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        teacher = make_user("teacher@example.com", "teacher", calendar_token="feed-token")
+        student = make_user("student@example.com", "student").student_profile
+        cls.first = make_lesson(student, teacher.teacher_profile, START, status="confirmed", notes="Préparer l'entretien")
+        cls.second = make_lesson(student, teacher.teacher_profile, START + timedelta(days=1), status="confirmed")
+        make_lesson(student, teacher.teacher_profile, START + timedelta(days=2))
+        cls.url = "/api/v1/calendar/feed-token.ics"
+
+    def setUp(self):
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+    def uids(self, response):
+        return [line for line in response.content.decode().split("\r\n") if line.startswith("UID:")]
+
+    def test_feed_lists_confirmed_lessons(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        domain = settings.CALENDAR_UID_DOMAIN
+        self.assertEqual(self.uids(response), [f"UID:lesson-{self.first.pk}@{domain}", f"UID:lesson-{self.second.pk}@{domain}"])
+        self.assertEqual(self.client.get("/api/v1/calendar/unknown.ics").status_code, 404)
+
+    def test_conditional_requests(self):
+        response = self.client.get(self.url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        for headers in ({"HTTP_IF_NONE_MATCH": etag}, {"HTTP_IF_MODIFIED_SINCE": last_modified}):
+            not_modified = self.client.get(self.url, **headers)
+            self.assertEqual(not_modified.status_code, 304, headers)
+            self.assertEqual(not_modified.content, b"")
+            self.assertEqual(not_modified["ETag"], etag)
+
+    def test_unchanged_feed_runs_one_query(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).content, response.content)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_changed_lesson_is_rendered_again_alone(self):
+        self.client.get(self.url)
+        lesson = Lesson.objects.get(pk=self.second.pk)
+        lesson.notes = "Bring the contract"
+        lesson.save()
+        with mock.patch("users.ical.render_event", wraps=ical.render_event) as render_event:
+            response = self.client.get(self.url)
+        self.assertEqual([call.args[0]["id"] for call in render_event.call_args_list], [self.second.pk])
+        self.assertEqual(len(self.uids(response)), 2)
+        self.assertIn("DESCRIPTION:Bring the contract", response.content.decode())
+        self.assertIn("DESCRIPTION:Préparer l'entretien", response.content.decode())
+
+    def test_deletion_moves_last_modified_forward(self):
+        response = self.client.get(self.url)
+        before = parse_http_date(response["Last-Modified"])
+        # The remaining lessons are all older than the feed that listed the deleted one.
+        Lesson.objects.filter(pk=self.second.pk).delete()
+        after = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(after.status_code, 200)
+        self.assertGreater(parse_http_date(after["Last-Modified"]), before)
+        self.assertNotEqual(after["ETag"], response["ETag"])
+        self.assertEqual(len(self.uids(after)), 1)
+        # The moved date is kept for the feed's next version.
+        self.assertEqual(self.client.get(self.url)["Last-Modified"], after["Last-Modified"])
+
+    def test_feed_without_lessons_has_no_last_modified(self):
+        make_user("new@example.com", "teacher", calendar_token="empty-token")
+        response = self.client.get("/api/v1/calendar/empty-token.ics")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        self.assertNotIn("BEGIN:VEVENT", response.content.decode())
+        CustomUser.objects.filter(email="new@example.com").update(is_active=False)
+        self.assertEqual(self.client.get("/api/v1/calendar/empty-token.ics").status_code, 404)
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+from django.utils.dateparse import parse_datetime
+
+from users.models import Lesson, LessonEventLog, TeacherCounters
+from users.tests.helpers import client_for, make_lesson, make_user
+
+URL = "/api/v1/lessons/series/"
+# Monday 09:00 in Paris (CEST).
+START = datetime(2030, 6, 3, 7, tzinfo=dt_timezone.utc)
+
+
+class LessonSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = make_user("teacher@example.com", "teacher").teacher_profile
+        cls.student = make_user("student@example.com", "student", timezone="Europe/Paris")
+        profile = cls.student.student_profile
+        profile.matched_teacher = cls.teacher
+        profile.save()
+        cls.other_student = make_user("other@example.com", "student").student_profile
+
+    def setUp(self):
+        self.client = client_for(self.student)
+
+    def post(self, **fields):
+        return self.client.post(URL, {"starts_at_utc": START.isoformat(), "duration_minutes": 60, **fields}, format="json")
+
+    def created_starts(self, response):
+        self.assertEqual(response.status_code, 201, response.content)
+        return [parse_datetime(lesson["starts_at_utc"]) for lesson in response.json()["lessons"]]
+
+    def test_needs_exactly_one_of_count_or_until(self):
+        for fields in ({}, {"count": 2, "until": "2030-06-30"}):
+            response = self.post(**fields)
+            self.assertEqual(response.status_code, 400, fields)
+            self.assertEqual(response.json()["non_field_errors"], ["Provide exactly one of count or until"])
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_count_and_until_bound_the_series(self):
+        week = timedelta(days=7)
+        self.assertEqual(self.created_starts(self.post(count=3)), [START, START + week, START + 2 * week])
+        Lesson.objects.all().delete()
+        # until is an inclusive local date; Monday and Wednesday each week.
+        starts = self.created_starts(self.post(until="2030-06-10", weekdays=[0, 2]))
+        self.assertEqual(starts, [START, START + timedelta(days=2), START + week])
+
+    def test_until_limits(self):
+        response = self.post(until="2030-06-02")
+        self.assertEqual(response.json()["non_field_errors"], ["The series has no occurrences"])
+        response = self.post(until="2031-06-03")
+        self.assertEqual(response.json()["non_field_errors"], ["A series is limited to 52 lessons"])
+        self.assertEqual(self.post(count=53).status_code, 400)
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_series_keeps_local_time_across_dst(self):
+        # 09:00 in Paris is 08:00 UTC before 2030-03-31 and 07:00 UTC after.
+        start = datetime(2030, 3, 25, 8, tzinfo=dt_timezone.utc)
+        starts = self.created_starts(self.post(starts_at_utc=start.isoformat(), count=2))
+        self.assertEqual(starts, [start, datetime(2030, 4, 1, 7, tzinfo=dt_timezone.utc)])
+
+    def test_conflicts_are_reported_per_occurrence(self):
+        # The teacher is busy during the second occurrence.
+        busy = make_lesson(self.other_student, self.teacher, START + timedelta(days=7, minutes=30), status="confirmed")
+        response = self.post(count=3)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["conflicts"],
+            [
+                {
+                    "index": 1,
+                    "starts_at_utc": "2030-06-10T07:00:00Z",
+                    "ends_at_utc": "2030-06-10T08:00:00Z",
+                    "lesson_ids": [busy.pk],
+                }
+            ],
+        )
+        self.assertEqual(Lesson.objects.filter(status="requested").count(), 0)
+
+        response = self.post(count=3, skip_conflicts=True)
+        self.assertEqual(self.created_starts(response), [START, START + timedelta(days=14)])
+        self.assertEqual([conflict["index"] for conflict in response.json()["conflicts"]], [1])
+
+    def test_every_occurrence_conflicting_is_rejected(self):
+        make_lesson(self.other_student, self.teacher, START, status="confirmed")
+        response = self.post(count=1, skip_conflicts=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Lesson.objects.filter(status="requested").count(), 0)
+
+    def test_insert_is_all_or_nothing(self):
+        counters = list(TeacherCounters.objects.values_list("pk", "requested_lessons"))
+        with mock.patch("users.views.record_lesson_events", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post(count=4)
+        self.assertFalse(Lesson.objects.exists())
+        self.assertFalse(LessonEventLog.objects.exists())
+        self.assertEqual(list(TeacherCounters.objects.values_list("pk", "requested_lessons")), counters)
@@ -0,0 +1,57 @@
+import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from users.models import CustomUser, StudentProfile, TeacherProfile
+from users.serializers import StudentProfileSerializer, TeacherProfileSerializer
+from users.tests.helpers import client_for, make_user
+
+
+class ProfileReadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = make_user("student@example.com", "student", full_name="Zoë", timezone="Europe/Paris")
+        StudentProfile.objects.filter(user=cls.student).update(
+            focus_skills=["speaking", "writing"],
+            weekly_time_budget_hours=4,
+            target_start_date=datetime.date(2026, 9, 1),
+            terms_accepted_at=timezone.now(),
+        )
+        cls.teacher = make_user("teacher@example.com", "teacher")
+
+    def setUp(self):
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+    def get(self, user, url):
+        response = client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_claims_reads_match_model_serializer(self):
+        student = StudentProfile.objects.select_related("user").get(user=self.student)
+        teacher = TeacherProfile.objects.select_related("user").get(user=self.teacher)
+        expected_student = StudentProfileSerializer(student).data
+        expected_teacher = TeacherProfileSerializer(teacher).data
+        for stateless in (False, True):
+            caches[settings.RESPONSE_CACHE_ALIAS].clear()
+            with self.subTest(stateless=stateless), override_settings(JWT_STATELESS_AUTH=stateless):
+                self.assertEqual(self.get(self.student, "/api/v1/students/me/"), expected_student)
+                self.assertEqual(self.get(self.teacher, "/api/v1/teachers/me/"), expected_teacher)
+
+    # Creating the profile on first read is outside the steady-state budget.
+    @override_settings(JWT_STATELESS_AUTH=True, QUERY_BUDGET_ENFORCE=False)
+    def test_claims_read_creates_missing_profile(self):
+        StudentProfile.objects.filter(user=self.student).delete()
+        self.assertEqual(self.get(self.student, "/api/v1/students/me/")["email"], self.student.email)
+        self.assertTrue(StudentProfile.objects.filter(user=self.student).exists())
+
+    def test_unknown_timezone_is_rejected(self):
+        client = client_for(self.teacher)
+        for name in ("Mars/Olympus_Mons", "localtime", "../etc/passwd"):
+            response = client.patch("/api/v1/teachers/me/", {"timezone": name}, format="json")
+            self.assertEqual(response.status_code, 400, name)
+            self.assertIn("timezone", response.json())
+        self.assertEqual(CustomUser.objects.get(pk=self.teacher.pk).timezone, "UTC")
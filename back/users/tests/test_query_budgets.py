@@ -0,0 +1,229 @@
+import re
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+
+from users.authentication import user_cache
+from users.models import AvailabilityBlock
+from users.tests.helpers import client_for, make_lesson, make_user
+
+# Every view in QUERY_BUDGETS must be exercised below.
+BUDGETED_VIEWS = {
+    "AuthMeView",
+    "StudentMeView",
+    "SubmitApplicationView",
+    "TeacherMeView",
+    "StudentDashboardView",
+    "TeacherDashboardView",
+    "TeachersListView",
+    "TeacherSlotsView",
+    "AvailabilityBlockListCreateView",
+    "AvailabilityBlockDetailView",
+    "AdminApplicationsListView",
+    "AdminApplicationDetailView",
+    "AdminApplicationMatchView",
+    "LessonListCreateView",
+    "LessonSeriesCreateView",
+    "LessonEventStreamView",
+    "LessonDetailView",
+    "LessonProposeView",
+    "LessonConfirmView",
+    "LessonCancelView",
+    "LessonBulkConfirmView",
+    "LessonBulkCancelView",
+    "CalendarFeedTokenView",
+    "calendar_feed",
+}
+
+
+def complete_profile(profile):
+    now = timezone.now()
+    for name, value in {
+        "cefr_level": "B1",
+        "preparing_for": "job",
+        "target_field": "business",
+        "target_field_other_text": "-",
+        "target_start_date_unknown": True,
+        "focus_skills": ["spoken"],
+        "learning_style": ["conversation_heavy"],
+        "weekly_time_budget_hours": 3,
+        "preferred_session_duration": 60,
+        "books_resources_text": "-",
+        "homework_preference": "light",
+        "availability_notes": "-",
+        "goals_summary": "-",
+        "terms_accepted_at": now,
+        "privacy_accepted_at": now,
+    }.items():
+        setattr(profile, name, value)
+    profile.save()
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Calls every view in ``QUERY_BUDGETS`` through the full middleware stack.
+    ``manage.py test`` turns on QUERY_BUDGET_ENFORCE, so a view going over its
+    budget raises QueryBudgetExceeded from the request; each test also checks
+    the Server-Timing count so the failure names the view and its budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = make_user("teacher@example.com", "teacher", timezone="Europe/Paris")
+        cls.student = make_user("student@example.com", "student")
+        cls.other_student = make_user("other@example.com", "student")
+        cls.admin = make_user("admin@example.com", "admin")
+        cls.teacher_profile = cls.teacher.teacher_profile
+        cls.student_profile = cls.student.student_profile
+        cls.student_profile.matched_teacher = cls.teacher_profile
+        cls.student_profile.application_status = "matched"
+        cls.student_profile.save()
+        cls.block = AvailabilityBlock.objects.create(
+            teacher=cls.teacher_profile, day_of_week=1, start_time="09:00", end_time="12:00", slot_duration=60
+        )
+        cls.start = (timezone.now() + timedelta(days=14)).replace(hour=9, minute=0, second=0, microsecond=0)
+        cls.lessons = [
+            make_lesson(cls.student_profile, cls.teacher_profile, cls.start + timedelta(days=index)) for index in range(3)
+        ]
+
+    def setUp(self):
+        user_cache.clear()
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+
+    def assertWithinBudget(self, response, view, status_code=200):
+        self.assertEqual(response.status_code, status_code, getattr(response, "content", b"")[:300])
+        queries = int(re.search(r'desc="(\d+) queries"', response["Server-Timing"]).group(1))
+        self.assertLessEqual(queries, settings.QUERY_BUDGETS[view], f"{view} ran {queries} queries")
+        return response
+
+    def test_budgets_cover_tested_views(self):
+        self.assertEqual(set(settings.QUERY_BUDGETS), BUDGETED_VIEWS)
+
+    def test_auth_me(self):
+        client = client_for(self.student)
+        self.assertWithinBudget(client.get("/api/v1/auth/me/"), "AuthMeView")
+        # Served from the response cache.
+        self.assertWithinBudget(client.get("/api/v1/auth/me/"), "AuthMeView")
+
+    def test_student_me(self):
+        client = client_for(self.student)
+        self.assertWithinBudget(client.get("/api/v1/students/me/"), "StudentMeView")
+        response = client.patch("/api/v1/students/me/", {"goals_summary": "Speak at work"}, format="json")
+        self.assertWithinBudget(response, "StudentMeView")
+
+    def test_submit_application(self):
+        client = client_for(self.other_student)
+        self.assertWithinBudget(client.post("/api/v1/students/me/submit-application/"), "SubmitApplicationView", 400)
+        complete_profile(self.other_student.student_profile)
+        self.assertWithinBudget(client.post("/api/v1/students/me/submit-application/"), "SubmitApplicationView")
+
+    def test_teacher_me(self):
+        client = client_for(self.teacher)
+        self.assertWithinBudget(client.get("/api/v1/teachers/me/"), "TeacherMeView")
+        response = client.patch("/api/v1/teachers/me/", {"bio_short": "Hello"}, format="json")
+        self.assertWithinBudget(response, "TeacherMeView")
+
+    def test_dashboards(self):
+        self.assertWithinBudget(client_for(self.student).get("/api/v1/dashboard/student/"), "StudentDashboardView")
+        self.assertWithinBudget(client_for(self.teacher).get("/api/v1/dashboard/teacher/"), "TeacherDashboardView")
+
+    def test_teachers_list(self):
+        client = client_for(self.admin)
+        self.assertWithinBudget(client.get("/api/v1/teachers/"), "TeachersListView")
+
+    def test_teacher_slots(self):
+        client = client_for(self.student)
+        response = client.get(f"/api/v1/teachers/{self.teacher_profile.pk}/slots/")
+        self.assertWithinBudget(response, "TeacherSlotsView")
+
+    def test_availability_blocks(self):
+        client = client_for(self.teacher)
+        self.assertWithinBudget(client.get("/api/v1/teachers/me/availability-blocks/"), "AvailabilityBlockListCreateView")
+        block = {"day_of_week": 2, "start_time": "13:00", "end_time": "15:00", "slot_duration": 30}
+        response = client.post("/api/v1/teachers/me/availability-blocks/", block, format="json")
+        self.assertWithinBudget(response, "AvailabilityBlockListCreateView", 201)
+        url = f"/api/v1/teachers/me/availability-blocks/{self.block.pk}/"
+        self.assertWithinBudget(client.put(url, block, format="json"), "AvailabilityBlockDetailView")
+        self.assertWithinBudget(client.delete(url), "AvailabilityBlockDetailView", 204)
+
+    def test_admin_applications(self):
+        client = client_for(self.admin)
+        self.assertWithinBudget(client.get("/api/v1/admin/applications/"), "AdminApplicationsListView")
+        response = client.get("/api/v1/admin/applications/", {"q": "student", "status": "matched,draft"})
+        self.assertWithinBudget(response, "AdminApplicationsListView")
+        url = f"/api/v1/admin/applications/{self.student_profile.pk}/"
+        self.assertWithinBudget(client.get(url), "AdminApplicationDetailView")
+
+    def test_admin_application_match(self):
+        client = client_for(self.admin)
+        url = f"/api/v1/admin/applications/{self.other_student.student_profile.pk}/match/"
+        self.assertWithinBudget(client.get(url), "AdminApplicationMatchView")
+        response = client.post(url, {"teacher_id": self.teacher_profile.pk}, format="json")
+        self.assertWithinBudget(response, "AdminApplicationMatchView")
+
+    def test_lesson_list_and_detail(self):
+        for user in (self.student, self.teacher, self.admin):
+            client = client_for(user)
+            self.assertWithinBudget(client.get("/api/v1/lessons/"), "LessonListCreateView")
+            self.assertWithinBudget(client.get(f"/api/v1/lessons/{self.lessons[0].pk}/"), "LessonDetailView")
+
+    def test_lesson_create(self):
+        client = client_for(self.student)
+        lesson = {"starts_at_utc": (self.start + timedelta(days=30)).isoformat(), "duration_minutes": 30}
+        self.assertWithinBudget(client.post("/api/v1/lessons/", lesson, format="json"), "LessonListCreateView", 201)
+
+    def test_lesson_series(self):
+        client = client_for(self.student)
+        series = {"starts_at_utc": (self.start + timedelta(days=30)).isoformat(), "duration_minutes": 60, "count": 4}
+        response = client.post("/api/v1/lessons/series/", series, format="json")
+        self.assertWithinBudget(response, "LessonSeriesCreateView", 201)
+
+    def test_lesson_transitions(self):
+        client = client_for(self.teacher)
+        lesson = self.lessons[0]
+        proposal = {"starts_at_utc": (self.start + timedelta(hours=2)).isoformat(), "duration_minutes": 30}
+        response = client.post(f"/api/v1/lessons/{lesson.pk}/propose/", proposal, format="json")
+        self.assertWithinBudget(response, "LessonProposeView")
+        self.assertWithinBudget(client.post(f"/api/v1/lessons/{lesson.pk}/confirm/"), "LessonConfirmView")
+        self.assertWithinBudget(client.post(f"/api/v1/lessons/{lesson.pk}/cancel/"), "LessonCancelView")
+        response = client_for(self.admin).post(f"/api/v1/lessons/{self.lessons[1].pk}/cancel/")
+        self.assertWithinBudget(response, "LessonCancelView")
+
+    def test_lesson_bulk_transitions(self):
+        client = client_for(self.teacher)
+        ids = {"ids": [lesson.pk for lesson in self.lessons]}
+        self.assertWithinBudget(client.post("/api/v1/lessons/bulk/confirm/", ids, format="json"), "LessonBulkConfirmView")
+        self.assertWithinBudget(client.post("/api/v1/lessons/bulk/cancel/", ids, format="json"), "LessonBulkCancelView")
+
+    def test_calendar_feed(self):
+        client = client_for(self.teacher)
+        self.assertWithinBudget(client.get("/api/v1/calendar/feed/"), "CalendarFeedTokenView")
+        self.assertWithinBudget(client.get("/api/v1/calendar/feed/"), "CalendarFeedTokenView")
+        url = self.assertWithinBudget(client.post("/api/v1/calendar/feed/"), "CalendarFeedTokenView").json()["url"]
+
+        client.post("/api/v1/lessons/bulk/confirm/", {"ids": [self.lessons[0].pk]}, format="json")
+        feed = self.assertWithinBudget(self.client.get(url), "calendar_feed")
+        self.assertIn(b"BEGIN:VEVENT", feed.content)
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=feed["ETag"])
+        self.assertWithinBudget(revalidated, "calendar_feed", 304)
+
+    def test_lesson_event_stream(self):
+        client = client_for(self.student, AsyncClient)
+
+        async def first_frame():
+            response = await client.get("/api/v1/lessons/events/", HTTP_ACCEPT="text/event-stream")
+            self.assertWithinBudget(response, "LessonEventStreamView")
+            stream = aiter(response.streaming_content)
+            try:
+                return await anext(stream)
+            finally:
+                await stream.aclose()
+
+        self.assertEqual(async_to_sync(first_frame)(), b"retry: 3000\n\n")
+
+        refused = client_for(self.student).get("/api/v1/lessons/events/", HTTP_ACCEPT="text/event-stream")
+        self.assertWithinBudget(refused, "LessonEventStreamView", 501)
@@ -0,0 +1,73 @@
+import json
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from users.counters import with_workload
+from users.matching import rank_teachers
+from users.models import AvailabilityBlock, Lesson, StudentProfile, TeacherProfile
+from users.renderers import ORJSONRenderer
+from users.serializers import (
+    AdminApplicationListSerializer,
+    fast_application_list_serializer,
+    fast_lesson_serializer,
+    fast_teacher_list_serializer,
+)
+from users.tests.helpers import make_lesson, make_user
+
+
+class ORJSONRendererTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        teachers = []
+        for email, name in (("zoe@example.com", "Zoë Lefèvre 先生"), ("sam@example.com", "Sam")):
+            profile = make_user(email, "teacher", full_name=name, timezone="Europe/Paris").teacher_profile
+            profile.levels_supported = ["B1", "B2"]
+            profile.teaching_tracks = ["business", "general"]
+            profile.save()
+            AvailabilityBlock.objects.create(teacher=profile, day_of_week=1, start_time="09:00", end_time="11:30", slot_duration=60)
+            teachers.append(profile)
+        students = []
+        for email in ("ana@example.com", "ben@example.com"):
+            profile = make_user(email, "student").student_profile
+            profile.cefr_level = "B1"
+            profile.target_field = "business"
+            profile.weekly_time_budget_hours = 3
+            profile.save()
+            students.append(profile)
+        students[0].matched_teacher = teachers[0]
+        students[0].application_status = "matched"
+        students[0].save()
+
+        start = datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc)
+        for index, status in enumerate(("requested", "confirmed", "canceled")):
+            make_lesson(students[index % 2], teachers[index % 2], start + timedelta(days=index), status=status)
+        Lesson.objects.filter(pk=Lesson.objects.first().pk).update(notes="line\u2028break\u2029 \"quoted\" \\ \x01")
+
+    def assertSameBytes(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_hot_payloads_render_identically(self):
+        self.assertSameBytes(fast_lesson_serializer.many(fast_lesson_serializer.values(Lesson.objects.all())))
+        self.assertSameBytes(
+            fast_teacher_list_serializer.many(fast_teacher_list_serializer.values(with_workload(TeacherProfile.objects.all())))
+        )
+        profiles = StudentProfile.objects.select_related("user")
+        self.assertSameBytes(fast_application_list_serializer.many(fast_application_list_serializer.values(profiles)))
+        self.assertSameBytes(AdminApplicationListSerializer(profiles, many=True).data)
+        self.assertSameBytes({"candidates": rank_teachers(profiles.first())})
+
+    def test_documented_differences(self):
+        # Exponent floats are spelled differently but parse to the same value.
+        data = {"value": 1e16, "small": 1.5e-05}
+        orjson_bytes, drf_bytes = ORJSONRenderer().render(data), JSONRenderer().render(data)
+        self.assertEqual(orjson_bytes, b'{"value":1e16,"small":0.000015}')
+        self.assertEqual(drf_bytes, b'{"value":1e+16,"small":1.5e-05}')
+        self.assertEqual(json.loads(orjson_bytes), json.loads(drf_bytes))
+
+        # Non-finite floats are rejected by DRF (STRICT_JSON) and written as null by orjson.
+        with self.assertRaises(ValueError):
+            JSONRenderer().render({"value": math.nan})
+        self.assertEqual(ORJSONRenderer().render({"value": math.nan}), b'{"value":null}')
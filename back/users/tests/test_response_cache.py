@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase
+
+from users.tests.helpers import client_for, make_user
+
+URL = "/api/v1/auth/me/"
+
+
+class CachedResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user("teacher@example.com", "teacher")
+
+    def setUp(self):
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        self.client = client_for(self.user)
+
+    def test_replayed_response_keeps_drf_headers(self):
+        fresh = self.client.get(URL)
+        replayed = self.client.get(URL)
+        self.assertEqual(replayed.content, fresh.content)
+        for header in ("Content-Type", "Vary", "Allow", "ETag"):
+            self.assertEqual(replayed[header], fresh[header], header)
+        self.assertIn("Accept", fresh["Vary"])
+
+    def test_if_none_match(self):
+        etag = self.client.get(URL)["ETag"]
+        for header in (etag, f"W/{etag}", "*", f'"other", {etag}'):
+            response = self.client.get(URL, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 304, header)
+            self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=f'"x{etag[1:]}').status_code, 200)
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from users.revocation import COMMIT_MARGIN_SECONDS, RevokedTokenFilter, prune_expired_tokens
+
+
+def outstanding(jti, expires_at):
+    return OutstandingToken.objects.create(jti=jti, token=f"token-{jti}", expires_at=expires_at)
+
+
+@override_settings(JWT_BLACKLIST_SYNC_INTERVAL=5.0, JWT_BLACKLIST_BLOOM_CAPACITY=1000)
+class RevokedTokenFilterTests(TestCase):
+    def setUp(self):
+        self.filter = RevokedTokenFilter()
+        self.clock = 1000.0
+        patcher = mock.patch("users.revocation.time.monotonic", side_effect=lambda: self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.expires_at = timezone.now() + timedelta(days=1)
+
+    def revoke(self, jti, **fields):
+        return BlacklistedToken.objects.create(token=outstanding(jti, self.expires_at), **fields)
+
+    def test_new_blacklist_rows_are_caught_after_a_sync(self):
+        self.revoke("old")
+        self.assertTrue(self.filter.might_be_revoked("old"))
+        self.assertFalse(self.filter.might_be_revoked("new"))
+
+        self.revoke("new")
+        # Not synced again within the interval.
+        self.clock += 4
+        self.assertFalse(self.filter.might_be_revoked("new"))
+        self.clock += 1
+        self.assertTrue(self.filter.might_be_revoked("new"))
+        self.assertTrue(self.filter.might_be_revoked("old"))
+
+    def test_rows_committed_out_of_id_order_are_caught(self):
+        placeholder = self.revoke("placeholder")
+        low_id = placeholder.pk
+        placeholder.delete()
+        self.revoke("high")
+        self.assertTrue(self.filter.might_be_revoked("high"))
+
+        # A transaction that took the lower id commits after the sync.
+        self.revoke("late", id=low_id)
+        self.clock += COMMIT_MARGIN_SECONDS / 2
+        self.assertTrue(self.filter.might_be_revoked("late"))
+
+    def test_tokens_blacklisted_here_are_added_at_once(self):
+        self.assertFalse(self.filter.might_be_revoked("local"))
+        self.filter.add("local")
+        self.assertTrue(self.filter.might_be_revoked("local"))
+
+
+class PruneExpiredTokensTests(TestCase):
+    def test_deletes_only_expired_tokens_in_batches(self):
+        now = timezone.now()
+        kept, expired, blacklisted = [], [], []
+        for index in range(9):
+            # Expired and live tokens interleave in id order.
+            is_expired = index % 3 != 2
+            token = outstanding(f"jti-{index}", now + timedelta(minutes=-1 if is_expired else 1))
+            if index % 2:
+                blacklisted.append(BlacklistedToken.objects.create(token=token).token_id)
+            (expired if is_expired else kept).append(token.pk)
+
+        log = []
+        self.assertEqual(prune_expired_tokens(batch_size=2, now=now, log=log.append), len(expired))
+        self.assertEqual(log, ["Deleted 2 expired tokens", "Deleted 4 expired tokens", "Deleted 6 expired tokens"])
+        self.assertEqual(sorted(OutstandingToken.objects.values_list("pk", flat=True)), kept)
+        self.assertEqual(
+            sorted(BlacklistedToken.objects.values_list("token_id", flat=True)), [pk for pk in blacklisted if pk in kept]
+        )
+        self.assertEqual(prune_expired_tokens(batch_size=2, now=now), 0)
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+
+from users.models import AvailabilityBlock
+from users.slots import bookable_slots
+from users.tests.helpers import client_for, make_lesson, make_user
+
+LONG_AGO = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def starts(slots):
+    return [slot["starts_at_utc"] for slot in slots]
+
+
+class BookableSlotsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.paris = make_user("paris@example.com", "teacher", timezone="Europe/Paris").teacher_profile
+        # Sunday 01:00-04:00 local, which holds both 2030 DST changes.
+        AvailabilityBlock.objects.create(teacher=cls.paris, day_of_week=6, start_time="01:00", end_time="04:00", slot_duration=60)
+        cls.utc = make_user("utc@example.com", "teacher").teacher_profile
+        # Monday 09:00-12:00 UTC.
+        AvailabilityBlock.objects.create(teacher=cls.utc, day_of_week=0, start_time="09:00", end_time="12:00", slot_duration=60)
+        cls.student = make_user("student@example.com", "student")
+
+    def test_block_spanning_dst_changes(self):
+        # 02:00 does not exist on 2030-03-31; the slots either side are an hour apart in UTC.
+        spring = bookable_slots(self.paris.pk, date(2030, 3, 31), date(2030, 4, 1), now=LONG_AGO)
+        self.assertEqual(starts(spring), ["2030-03-31T00:00:00Z", "2030-03-31T01:00:00Z"])
+        # 02:00 happens twice on 2030-10-27; the slot takes the first one.
+        autumn = bookable_slots(self.paris.pk, date(2030, 10, 27), date(2030, 10, 28), now=LONG_AGO)
+        self.assertEqual(starts(autumn), ["2030-10-26T23:00:00Z", "2030-10-27T00:00:00Z", "2030-10-27T02:00:00Z"])
+        self.assertEqual({slot["duration_minutes"] for slot in spring + autumn}, {60})
+
+    def test_partially_overlapping_lessons(self):
+        student = self.student.student_profile
+        monday = datetime(2030, 6, 3, tzinfo=dt_timezone.utc)
+        # Covers the second half of the 09:00 slot and the first half of the 10:00 one.
+        make_lesson(student, self.utc, monday.replace(hour=9, minute=30), status="confirmed")
+        # Starts as the 11:00 slot ends.
+        make_lesson(student, self.utc, monday.replace(hour=12), status="confirmed")
+        # Only confirmed lessons take a slot.
+        make_lesson(student, self.utc, monday.replace(hour=11), status="requested")
+        slots = bookable_slots(self.utc.pk, date(2030, 6, 3), date(2030, 6, 4), now=LONG_AGO)
+        self.assertEqual(slots, [{"starts_at_utc": "2030-06-03T11:00:00Z", "ends_at_utc": "2030-06-03T12:00:00Z", "duration_minutes": 60}])
+
+    def test_empty_ranges(self):
+        self.assertEqual(bookable_slots(self.utc.pk, date(2030, 6, 3), date(2030, 6, 3), now=LONG_AGO), [])
+        # A Tuesday-to-Sunday window holds no Monday.
+        self.assertEqual(bookable_slots(self.utc.pk, date(2030, 6, 4), date(2030, 6, 9), now=LONG_AGO), [])
+        # Every slot already started.
+        self.assertEqual(bookable_slots(self.utc.pk, date(2020, 6, 1), date(2020, 6, 2)), [])
+
+        client = client_for(self.student)
+        response = client.get(f"/api/v1/teachers/{self.utc.pk}/slots/", {"from": "2030-06-03", "to": "2030-06-03"})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_slots_view_queries(self):
+        # With claims authentication the view reads the blocks and the confirmed lessons only.
+        client = client_for(self.student)
+        make_lesson(self.student.student_profile, self.utc, datetime(2030, 6, 3, 9, tzinfo=dt_timezone.utc), status="confirmed")
+        with self.assertNumQueries(2):
+            response = client.get(f"/api/v1/teachers/{self.utc.pk}/slots/", {"from": "2030-06-01", "to": "2030-06-15"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 5)
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import CustomUser
+from users.tokens import UserRefreshToken
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="teacher@example.com", password="pw-12345!", role="teacher")
+        self.client = APIClient()
+        self.client.cookies["refresh_token"] = str(UserRefreshToken.for_user(self.user))
+
+    def test_refresh_uses_current_role(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(role="student")
+        response = self.client.post("/api/v1/auth/refresh/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.json()["access_token"])["role"], "student")
+
+    def test_deactivated_user_cannot_refresh(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post("/api/v1/auth/refresh/")
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user_cannot_refresh(self):
+        self.user.delete()
+        response = self.client.post("/api/v1/auth/refresh/")
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .revocation import revoked_tokens
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the identity claims the API needs, so access tokens
+    derived from it can be authenticated without loading the user row.
+
+    The blacklist is only queried for tokens the process-local revocation
+    filter cannot rule out.
+    """
+
+    IDENTITY_CLAIMS = ("role", "email", "is_active")
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in cls.IDENTITY_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    def current_access_token(self):
+        """
+        Access token with the identity claims read from the user row now
+        rather than copied from this refresh token, so a deactivated user
+        cannot refresh and a role change applies to the next access token.
+        """
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise TokenError("No active account found for the given token")
+        access = self.access_token
+        for claim in self.IDENTITY_CLAIMS:
+            access[claim] = getattr(user, claim)
+        return access
+
+    def check_blacklist(self):
+        if revoked_tokens.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        revoked_tokens.add(self.payload[api_settings.JTI_CLAIM])
+        return result
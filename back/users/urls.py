@@ -8,18 +8,29 @@ from .views import (
     StudentMeView,
     SubmitApplicationView,
     TeacherMeView,
+    StudentDashboardView,
+    TeacherDashboardView,
     TeachersListView,
+    TeacherSlotsView,
     AvailabilityBlockListCreateView,
     AvailabilityBlockDetailView,
     AdminApplicationsListView,
     AdminApplicationDetailView,
     AdminApplicationNotesView,
     AdminApplicationMatchView,
+    AdminAutoMatchView,
+    AdminExportView,
     LessonListCreateView,
+    LessonSeriesCreateView,
+    LessonEventStreamView,
     LessonDetailView,
     LessonProposeView,
     LessonConfirmView,
     LessonCancelView,
+    LessonBulkConfirmView,
+    LessonBulkCancelView,
+    CalendarFeedTokenView,
+    calendar_feed,
 )
 
 urlpatterns = [
@@ -39,17 +50,30 @@ urlpatterns = [
 
     path("teachers/me/", TeacherMeView.as_view(), name="teacher_me"),
     path("teachers/", TeachersListView.as_view(), name="teachers_list"),
+    path("teachers/<int:pk>/slots/", TeacherSlotsView.as_view(), name="teacher_slots"),
     path("teachers/me/availability-blocks/", AvailabilityBlockListCreateView.as_view(), name="availability_blocks"),
     path("teachers/me/availability-blocks/<int:pk>/", AvailabilityBlockDetailView.as_view(), name="availability_block_detail"),
 
+    path("dashboard/student/", StudentDashboardView.as_view(), name="student_dashboard"),
+    path("dashboard/teacher/", TeacherDashboardView.as_view(), name="teacher_dashboard"),
+
     path("admin/applications/", AdminApplicationsListView.as_view(), name="admin_applications"),
+    path("admin/applications/auto-match/", AdminAutoMatchView.as_view(), name="admin_applications_auto_match"),
     path("admin/applications/<int:pk>/", AdminApplicationDetailView.as_view(), name="admin_application_detail"),
     path("admin/applications/<int:pk>/notes/", AdminApplicationNotesView.as_view(), name="admin_application_notes"),
     path("admin/applications/<int:pk>/match/", AdminApplicationMatchView.as_view(), name="admin_application_match"),
+    path("admin/exports/<str:dataset>/", AdminExportView.as_view(), name="admin_export"),
 
     path("lessons/", LessonListCreateView.as_view(), name="lessons"),
+    path("lessons/events/", LessonEventStreamView.as_view(), name="lesson_events"),
+    path("lessons/series/", LessonSeriesCreateView.as_view(), name="lesson_series"),
+    path("lessons/bulk/confirm/", LessonBulkConfirmView.as_view(), name="lesson_bulk_confirm"),
+    path("lessons/bulk/cancel/", LessonBulkCancelView.as_view(), name="lesson_bulk_cancel"),
     path("lessons/<int:pk>/", LessonDetailView.as_view(), name="lesson_detail"),
     path("lessons/<int:pk>/propose/", LessonProposeView.as_view(), name="lesson_propose"),
     path("lessons/<int:pk>/confirm/", LessonConfirmView.as_view(), name="lesson_confirm"),
     path("lessons/<int:pk>/cancel/", LessonCancelView.as_view(), name="lesson_cancel"),
+
+    path("calendar/feed/", CalendarFeedTokenView.as_view(), name="calendar_feed_token"),
+    path("calendar/<str:token>.ics", calendar_feed, name="calendar_feed"),
 ]
@@ -1,17 +1,30 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
 from datetime import timedelta
-from django.shortcuts import get_object_or_404
+from itertools import accumulate
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import RetrieveUpdateAPIView, CreateAPIView, ListAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
-from .models import StudentProfile, TeacherProfile, AvailabilityBlock, Lesson, LessonEventLog
+from .models import CustomUser, StudentProfile, TeacherProfile, AvailabilityBlock, Lesson
 from .serializers import (
     CustomUserSerializer,
     RegisterUserSerializer,
@@ -21,17 +34,91 @@ from .serializers import (
     AvailabilityBlockSerializer,
     LessonSerializer,
     LessonRequestSerializer,
+    LessonBulkSerializer,
+    LessonSeriesConflictSerializer,
+    LessonSeriesSerializer,
     LessonProposeSerializer,
+    AdminAutoMatchSerializer,
     AdminStudentProfileSerializer,
+    AdminApplicationListSerializer,
+    fast_application_list_serializer,
+    fast_lesson_serializer,
+    fast_student_profile_serializer,
+    fast_teacher_list_serializer,
+    fast_teacher_profile_serializer,
 )
-from .permissions import IsStudentRole, IsTeacherRole, IsAdminRole, IsTeacherOrAdmin
+from .pagination import ApplicationQueuePagination, LessonCursorPagination
+from .events import record_lesson_event, record_lesson_events
+from .exports import DATASETS, FORMATS, stream_export
+from .middleware import view_metrics
+from .matching import auto_match_submitted, rank_teachers
+from .slots import bookable_slots
+from .response_cache import ROLE_SCOPE, USER_SCOPE, cached_response
+from .routers import ReplicaReadMixin
+from .permissions import IsStudentRole, IsTeacherRole, IsAdminRole, IsTeacherOrAdmin, IsStudentOrTeacher
+from .async_views import AsyncReadAPIView, is_asgi
+from .authentication import ClaimsUser, aresolve_user
+from .profiles import arole_profile, ascoped_lessons, role_profile, scoped_lessons
+from .tokens import UserRefreshToken
+from .ical import feed_for_token, new_feed_token
+from .streams import lesson_event_stream
+from .counters import lesson_state, record_lesson_changes, with_workload
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    elif not settings.DEBUG:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    return HttpResponse(view_metrics.render_prometheus(), content_type="text/plain; version=0.0.4")
+
+
+@require_safe
+def calendar_feed(request, token):
+    feed = feed_for_token(token)
+    if feed is None:
+        raise Http404
+    response = get_conditional_response(request, etag=feed.etag, last_modified=feed.last_modified)
+    if response is None:
+        response = HttpResponse(feed.body(), content_type="text/calendar; charset=utf-8")
+    response["ETag"] = feed.etag
+    response["Cache-Control"] = "private, no-cache"
+    if feed.last_modified is not None:
+        response["Last-Modified"] = http_date(feed.last_modified)
+    return response
+
+
+class CalendarFeedTokenView(APIView):
+    """GET returns the caller's calendar feed URL, creating it once; POST replaces it."""
+
+    permission_classes = [IsStudentOrTeacher]
+
+    def _feed_url(self, request, token):
+        return Response({"url": request.build_absolute_uri(reverse("calendar_feed", args=[token]))})
+
+    def get(self, request):
+        users = CustomUser.objects.filter(pk=request.user.id)
+        token = users.values_list("calendar_token", flat=True).first()
+        if token is None:
+            token = new_feed_token()
+            if not users.filter(calendar_token__isnull=True).update(calendar_token=token):
+                token = users.values_list("calendar_token", flat=True).first()
+        return self._feed_url(request, token)
+
+    def post(self, request):
+        token = new_feed_token()
+        CustomUser.objects.filter(pk=request.user.id).update(calendar_token=token)
+        return self._feed_url(request, token)
 
 
-class AuthMeView(APIView):
+class AuthMeView(AsyncReadAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        return Response(CustomUserSerializer(request.user).data)
+    @cached_response(USER_SCOPE)
+    async def get(self, request):
+        return Response(CustomUserSerializer(await aresolve_user(request.user)).data)
 
 
 class UserRegisterView(CreateAPIView):
@@ -47,7 +134,7 @@ class UserLoginView(APIView):
         serializer = LoginUserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             access_token = str(refresh.access_token)
 
             response = Response(
@@ -86,7 +173,7 @@ class UserLogoutView(APIView):
 
         if refresh_token:
             try:
-                refresh = RefreshToken(refresh_token)
+                refresh = UserRefreshToken(refresh_token)
                 refresh.blacklist()
             except Exception as exc:
                 return Response({"error": "Invalid refresh token" + str(exc)}, status=status.HTTP_400_BAD_REQUEST)
@@ -107,8 +194,8 @@ class CookieTokenRefreshView(TokenRefreshView):
             return Response({"error": "Refresh token not provided"}, status=status.HTTP_401_UNAUTHORIZED)
 
         try:
-            refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
+            refresh = UserRefreshToken(refresh_token)
+            access_token = str(refresh.current_access_token())
 
             response = Response(
                 {"message": "Access token refreshed successfully", "access_token": access_token},
@@ -124,24 +211,38 @@ class CookieTokenRefreshView(TokenRefreshView):
                 samesite=same_site,
             )
             return response
-        except InvalidToken:
+        except (InvalidToken, TokenError):
             return Response({"error": "Invalid token"}, status=status.HTTP_401_UNAUTHORIZED)
 
 
-class StudentMeView(RetrieveUpdateAPIView):
+class StudentMeView(AsyncReadAPIView, RetrieveUpdateAPIView):
     serializer_class = StudentProfileSerializer
     permission_classes = [IsAuthenticated, IsStudentRole]
 
     def get_object(self):
-        profile, _ = StudentProfile.objects.get_or_create(user=self.request.user)
-        return profile
+        return role_profile(self.request, create=True)
+
+    @cached_response(USER_SCOPE)
+    async def get(self, request):
+        # A user built from token claims has no joined profile, so read it as
+        # a values() row; a loaded profile is serialized as it is.
+        if isinstance(request.user, ClaimsUser):
+            profiles = StudentProfile.objects.filter(user_id=request.user.id)
+            row = await fast_student_profile_serializer.values(profiles).afirst()
+            if row is not None:
+                return Response(fast_student_profile_serializer.to_representation(row))
+            request._role_profile = None
+        profile = await arole_profile(request, create=True)
+        if not StudentProfile.user.is_cached(profile):
+            profile.user = await aresolve_user(request.user)
+        return Response(self.get_serializer(profile).data)
 
 
 class SubmitApplicationView(APIView):
     permission_classes = [IsAuthenticated, IsStudentRole]
 
     def post(self, request):
-        profile, _ = StudentProfile.objects.get_or_create(user=request.user)
+        profile = role_profile(request, create=True)
         if not profile.is_profile_complete():
             return Response({"error": "Profile is not complete"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -160,28 +261,145 @@ class TeacherMeView(RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated, IsTeacherRole]
 
     def get_object(self):
-        profile, _ = TeacherProfile.objects.get_or_create(user=self.request.user)
-        return profile
+        return role_profile(self.request, create=True)
+
+    @cached_response(USER_SCOPE)
+    def get(self, request, *args, **kwargs):
+        # See StudentMeView.get.
+        if isinstance(request.user, ClaimsUser):
+            profiles = TeacherProfile.objects.filter(user_id=request.user.id)
+            row = fast_teacher_profile_serializer.values(profiles).first()
+            if row is not None:
+                return Response(fast_teacher_profile_serializer.to_representation(row))
+            request._role_profile = None
+        return super().get(request, *args, **kwargs)
+
+
+class DashboardView(AsyncReadAPIView):
+    """
+    Everything a role's dashboard renders in one response and a fixed
+    number of queries: the user, their profile, upcoming confirmed lessons,
+    lesson counts by status and pending actions.
+    """
+
+    upcoming_limit = 10
+    pending_limit = 20
+
+    async def _lessons(self, lessons):
+        return fast_lesson_serializer.many([row async for row in fast_lesson_serializer.values(lessons)])
+
+    async def _context(self, request, profile):
+        lessons = Lesson.objects.filter(**{f"{request.user.role}_id": profile.id})
+        upcoming = lessons.filter(status="confirmed", starts_at_utc__gte=timezone.now()).order_by("starts_at_utc", "id")
+        counts = {choice: 0 for choice, _ in Lesson.STATUS_CHOICES}
+        async for row in lessons.order_by().values("status").annotate(total=Count("id")):
+            counts[row["status"]] = row["total"]
+        if not type(profile).user.is_cached(profile):
+            profile.user = await aresolve_user(request.user)
+        return {
+            "user": CustomUserSerializer(profile.user).data,
+            "upcoming_lessons": await self._lessons(upcoming[: self.upcoming_limit]),
+            "lesson_counts": counts,
+        }
+
+
+class StudentDashboardView(DashboardView):
+    permission_classes = [IsAuthenticated, IsStudentRole]
+
+    async def get(self, request):
+        profile = await arole_profile(request, create=True)
+        data = await self._context(request, profile)
+        matched_teacher = None
+        if profile.matched_teacher_id:
+            matched_teacher = await TeacherProfile.objects.select_related("user").filter(pk=profile.matched_teacher_id).afirst()
+
+        actions = []
+        if profile.application_status == "draft":
+            actions.append({"type": "submit_application" if profile.is_profile_complete() else "complete_profile"})
+        elif matched_teacher is not None and not data["upcoming_lessons"] and not (
+            data["lesson_counts"]["requested"] or data["lesson_counts"]["proposed"]
+        ):
+            actions.append({"type": "request_lesson"})
+        return Response(
+            {
+                **data,
+                "profile": StudentProfileSerializer(profile).data,
+                "matched_teacher": TeacherProfileSerializer(matched_teacher).data if matched_teacher else None,
+                "pending_actions": actions,
+            }
+        )
+
+
+class TeacherDashboardView(DashboardView):
+    permission_classes = [IsAuthenticated, IsTeacherRole]
 
+    async def get(self, request):
+        profile = await arole_profile(request, create=True)
+        data = await self._context(request, profile)
+        requests = Lesson.objects.filter(
+            teacher_id=profile.id, status="requested", starts_at_utc__gte=timezone.now()
+        ).order_by("starts_at_utc", "id")
+        actions = [
+            {"type": "review_lesson_request", "lesson": lesson}
+            for lesson in await self._lessons(requests[: self.pending_limit])
+        ]
+        return Response({**data, "profile": TeacherProfileSerializer(profile).data, "pending_actions": actions})
 
-class TeachersListView(ListAPIView):
+
+class TeachersListView(ReplicaReadMixin, ListAPIView):
     serializer_class = TeacherProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminRole]
 
+    @cached_response(ROLE_SCOPE)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return TeacherProfile.objects.select_related("user").all()
+        return fast_teacher_list_serializer.values(with_workload(TeacherProfile.objects.all()))
+
+    def list(self, request, *args, **kwargs):
+        return Response(fast_teacher_list_serializer.many(self.get_queryset()))
+
+
+class TeacherSlotsView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_window_days = 92
+
+    def get(self, request, pk):
+        dates = {}
+        for param in ("from", "to"):
+            value = request.query_params.get(param)
+            try:
+                dates[param] = parse_date(value) if value else None
+            except ValueError:
+                dates[param] = None
+            if value and dates[param] is None:
+                return Response({param: ["Invalid date"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_date = dates["from"] or timezone.now().date()
+        end_date = dates["to"] or start_date + timedelta(days=28)
+        if end_date <= start_date or (end_date - start_date).days > self.max_window_days:
+            return Response(
+                {"error": f"to must be after from and at most {self.max_window_days} days later"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        slots = bookable_slots(pk, start_date, end_date)
+        if slots is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(slots)
 
 
 class AvailabilityBlockListCreateView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherRole]
 
     def get(self, request):
-        profile = get_object_or_404(TeacherProfile, user=request.user)
+        profile = role_profile(request)
         blocks = AvailabilityBlock.objects.filter(teacher=profile)
         return Response(AvailabilityBlockSerializer(blocks, many=True).data)
 
     def post(self, request):
-        profile = get_object_or_404(TeacherProfile, user=request.user)
+        profile = role_profile(request)
         serializer = AvailabilityBlockSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(teacher=profile)
@@ -193,7 +411,7 @@ class AvailabilityBlockDetailView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherRole]
 
     def put(self, request, pk):
-        profile = get_object_or_404(TeacherProfile, user=request.user)
+        profile = role_profile(request)
         block = get_object_or_404(AvailabilityBlock, pk=pk, teacher=profile)
         serializer = AvailabilityBlockSerializer(block, data=request.data)
         if serializer.is_valid():
@@ -202,25 +420,83 @@ class AvailabilityBlockDetailView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
-        profile = get_object_or_404(TeacherProfile, user=request.user)
+        profile = role_profile(request)
         block = get_object_or_404(AvailabilityBlock, pk=pk, teacher=profile)
         block.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class AdminApplicationsListView(ListAPIView):
-    serializer_class = AdminStudentProfileSerializer
+def _search_query(term):
+    # Prefix-match every word; characters with a meaning in tsquery syntax are dropped.
+    words = re.findall(r"[\w@.+-]+", term)
+    if not words:
+        return None
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config="simple")
+
+
+def _filter_applications(profiles, params):
+    errors = {}
+
+    for param, field in (
+        ("status", "application_status"),
+        ("cefr_level", "cefr_level"),
+        ("target_field", "target_field"),
+        ("preparing_for", "preparing_for"),
+    ):
+        value = params.get(param)
+        if value:
+            profiles = profiles.filter(**{f"{field}__in": [item for item in value.split(",") if item]})
+
+    min_completion = params.get("min_completion")
+    if min_completion:
+        if not min_completion.isdigit():
+            errors["min_completion"] = ["Must be an integer"]
+        else:
+            profiles = profiles.filter(completion_percent__gte=int(min_completion))
+
+    term = params.get("q", "").strip()
+    if term:
+        query = _search_query(term)
+        if query is None:
+            errors["q"] = ["Enter at least one word"]
+        else:
+            # Each side is served by its own GIN index; the union keeps the
+            # planner from falling back to a scan of every profile.
+            by_goals = (
+                StudentProfile.objects.annotate(search=SearchVector("goals_summary", config="simple"))
+                .filter(search=query)
+                .values("id")
+            )
+            by_user = (
+                StudentProfile.objects.filter(
+                    user__in=CustomUser.objects.annotate(search=SearchVector("full_name", "email", config="simple"))
+                    .filter(Q(search=query) | Q(email__istartswith=term))
+                    .values("id")
+                )
+                .values("id")
+            )
+            profiles = profiles.filter(id__in=by_goals.union(by_user))
+
+    return profiles, errors
+
+
+class AdminApplicationsListView(ReplicaReadMixin, ListAPIView):
+    serializer_class = AdminApplicationListSerializer
+    pagination_class = ApplicationQueuePagination
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get_queryset(self):
-        queryset = StudentProfile.objects.select_related("user", "matched_teacher", "matched_teacher__user")
-        status_param = self.request.query_params.get("status")
-        if status_param:
-            queryset = queryset.filter(application_status=status_param)
-        return queryset
+        queryset, errors = _filter_applications(StudentProfile.objects.all(), self.request.query_params)
+        if errors:
+            raise ValidationError(errors)
+        return fast_application_list_serializer.values(queryset)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(fast_application_list_serializer.many(page))
 
 
-class AdminApplicationDetailView(APIView):
+class AdminApplicationDetailView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
 
     def get(self, request, pk):
@@ -244,9 +520,19 @@ class AdminApplicationNotesView(APIView):
 
 class AdminApplicationMatchView(APIView):
     permission_classes = [IsAuthenticated, IsAdminRole]
+    max_candidates = 50
 
-    def post(self, request, pk):
+    def get(self, request, pk):
         profile = get_object_or_404(StudentProfile, pk=pk)
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response({"limit": ["Must be an integer"]}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.max_candidates))
+        return Response({"student_id": profile.pk, "candidates": rank_teachers(profile, limit=limit)})
+
+    def post(self, request, pk):
+        profile = get_object_or_404(StudentProfile.objects.select_related("user"), pk=pk)
         teacher_id = request.data.get("teacher_id")
         if not teacher_id:
             return Response({"error": "teacher_id is required"}, status=status.HTTP_400_BAD_REQUEST)
@@ -258,27 +544,96 @@ class AdminApplicationMatchView(APIView):
         return Response(AdminStudentProfileSerializer(profile).data)
 
 
-class LessonListCreateView(APIView):
+class AdminAutoMatchView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def post(self, request):
+        serializer = AdminAutoMatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        result = auto_match_submitted(**serializer.validated_data)
+        return Response(result)
+
+
+class AdminExportView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        export_format = request.query_params.get("as", "csv")
+        if export_format not in FORMATS:
+            return Response({"as": [f"Must be one of: {', '.join(FORMATS)}"]}, status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for param, key in (("from", "start"), ("to", "end")):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            parsed = parse_datetime(value)
+            if parsed is None:
+                return Response({param: ["Invalid datetime"]}, status=status.HTTP_400_BAD_REQUEST)
+            bounds[key] = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+        response = StreamingHttpResponse(
+            stream_export(dataset, export_format, asynchronous=is_asgi(request), **bounds),
+            content_type=FORMATS[export_format],
+        )
+        filename = f"{dataset}-{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+def _filter_lessons(lessons, params):
+    errors = {}
+
+    status_param = params.get("status")
+    if status_param:
+        lessons = lessons.filter(status__in=[value for value in status_param.split(",") if value])
+
+    for param, lookup in (("from", "starts_at_utc__gte"), ("to", "starts_at_utc__lt")):
+        value = params.get(param)
+        if not value:
+            continue
+        parsed = parse_datetime(value)
+        if parsed is None:
+            errors[param] = ["Invalid datetime"]
+            continue
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        lessons = lessons.filter(**{lookup: parsed})
+
+    for param in ("teacher", "student"):
+        value = params.get(param)
+        if not value:
+            continue
+        if not value.isdigit():
+            errors[param] = ["Must be an integer id"]
+            continue
+        lessons = lessons.filter(**{f"{param}_id": int(value)})
+
+    return lessons, errors
+
+
+class LessonListCreateView(ReplicaReadMixin, AsyncReadAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        if request.user.role == "admin":
-            lessons = Lesson.objects.select_related("student__user", "teacher__user").all()
-        elif request.user.role == "teacher":
-            teacher = get_object_or_404(TeacherProfile, user=request.user)
-            lessons = Lesson.objects.select_related("student__user", "teacher__user").filter(teacher=teacher)
-        else:
-            student = get_object_or_404(StudentProfile, user=request.user)
-            lessons = Lesson.objects.select_related("student__user", "teacher__user").filter(student=student)
+    async def get(self, request):
+        lessons, errors = _filter_lessons(await ascoped_lessons(request), request.query_params)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(LessonSerializer(lessons, many=True).data)
+        paginator = LessonCursorPagination()
+        page = await paginator.apaginate_queryset(fast_lesson_serializer.values(lessons), request, view=self)
+        return paginator.get_paginated_response(fast_lesson_serializer.many(page))
 
     def post(self, request):
         if request.user.role != "student":
             return Response({"error": "Only students can request lessons"}, status=status.HTTP_403_FORBIDDEN)
 
-        student = get_object_or_404(StudentProfile, user=request.user)
-        if not student.matched_teacher:
+        student = role_profile(request)
+        if not student.matched_teacher_id:
             return Response({"error": "Student is not matched to a teacher"}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = LessonRequestSerializer(data=request.data)
@@ -289,60 +644,167 @@ class LessonListCreateView(APIView):
         duration = serializer.validated_data["duration_minutes"]
         ends_at = starts_at + timedelta(minutes=duration)
 
-        lesson = Lesson.objects.create(
-            student=student,
-            teacher=student.matched_teacher,
-            starts_at_utc=starts_at,
-            ends_at_utc=ends_at,
-            duration_minutes=duration,
-            status="requested",
-            requested_by_role="student",
+        with transaction.atomic():
+            lesson = Lesson.objects.create(
+                student=student,
+                teacher_id=student.matched_teacher_id,
+                starts_at_utc=starts_at,
+                ends_at_utc=ends_at,
+                duration_minutes=duration,
+                status="requested",
+                requested_by_role="student",
+            )
+            record_lesson_event(
+                lesson,
+                request.user.id,
+                "requested",
+                {"starts_at_utc": str(starts_at), "duration_minutes": duration},
+            )
+
+        return Response(LessonSerializer(lesson).data, status=status.HTTP_201_CREATED)
+
+
+def _series_conflicts(student_id, teacher_id, occurrences):
+    """
+    Lists the occurrences that overlap a confirmed lesson of the student or
+    the teacher, fetching every candidate with one range query.
+    """
+    busy = list(
+        Lesson.objects.filter(
+            Q(student_id=student_id) | Q(teacher_id=teacher_id),
+            status="confirmed",
+            starts_at_utc__lt=occurrences[-1][1],
+            ends_at_utc__gt=occurrences[0][0],
         )
+        .order_by("starts_at_utc", "id")
+        .values_list("starts_at_utc", "ends_at_utc", "id")
+    )
+    busy_starts = [row[0] for row in busy]
+    conflicts = []
+    for index, (starts_at, ends_at) in enumerate(occurrences):
+        # Only lessons starting before this occurrence ends can overlap it.
+        candidates = busy[: bisect_left(busy_starts, ends_at)]
+        lesson_ids = [pk for _, busy_end, pk in candidates if busy_end > starts_at]
+        if lesson_ids:
+            conflicts.append(
+                {"index": index, "starts_at_utc": starts_at, "ends_at_utc": ends_at, "lesson_ids": lesson_ids}
+            )
+    return conflicts
+
+
+class LessonSeriesCreateView(APIView):
+    permission_classes = [IsAuthenticated, IsStudentRole]
+
+    def post(self, request):
+        student = role_profile(request)
+        if not student.matched_teacher_id:
+            return Response({"error": "Student is not matched to a teacher"}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = LessonSeriesSerializer(data=request.data, context={"timezone": student.user.timezone})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        duration = serializer.validated_data["duration_minutes"]
+        occurrences = serializer.validated_data["occurrences"]
+        conflicts = _series_conflicts(student.id, student.matched_teacher_id, occurrences)
+        conflict_data = LessonSeriesConflictSerializer(conflicts, many=True).data
+        skipped = {conflict["index"] for conflict in conflicts}
+        if conflicts and (not serializer.validated_data["skip_conflicts"] or len(skipped) == len(occurrences)):
+            return Response(
+                {"error": "Overlapping confirmed lesson", "conflicts": conflict_data},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lessons = [
+            Lesson(
+                student=student,
+                teacher_id=student.matched_teacher_id,
+                starts_at_utc=starts_at,
+                ends_at_utc=ends_at,
+                duration_minutes=duration,
+                status="requested",
+                requested_by_role="student",
+            )
+            for index, (starts_at, ends_at) in enumerate(occurrences)
+            if index not in skipped
+        ]
+        with transaction.atomic():
+            Lesson.objects.bulk_create(lessons)
+            # bulk_create sends no post_save.
+            record_lesson_changes((None, lesson_state(lesson)) for lesson in lessons)
+            record_lesson_events(
+                lessons,
+                request.user.id,
+                "requested",
+                [{"starts_at_utc": str(lesson.starts_at_utc), "duration_minutes": duration} for lesson in lessons],
+            )
+        for lesson in lessons:
+            lesson._snapshot_fields()
 
-        LessonEventLog.objects.create(
-            lesson=lesson,
-            actor=request.user,
-            event_type="requested",
-            payload_json={"starts_at_utc": str(starts_at), "duration_minutes": duration},
+        return Response(
+            {"lessons": LessonSerializer(lessons, many=True).data, "conflicts": conflict_data},
+            status=status.HTTP_201_CREATED,
         )
 
-        return Response(LessonSerializer(lesson).data, status=status.HTTP_201_CREATED)
 
+class LessonEventStreamView(AsyncReadAPIView):
+    """Server-sent stream of the caller's lesson events; see streams.lesson_event_stream."""
 
-class LessonDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
-        lesson = get_object_or_404(Lesson.objects.select_related("student__user", "teacher__user"), pk=pk)
-        if request.user.role == "student" and lesson.student.user_id != request.user.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-        if request.user.role == "teacher" and lesson.teacher.user_id != request.user.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-        return Response(LessonSerializer(lesson).data)
+    def perform_content_negotiation(self, request, force=False):
+        # EventSource asks for text/event-stream only; errors still go out as JSON.
+        return super().perform_content_negotiation(request, force=True)
+
+    async def get(self, request):
+        if not is_asgi(request):
+            # A sync server reads an async body to its end before sending
+            # any of it, so the stream would never reach the client.
+            return Response(
+                {"error": "Lesson events are only served by the ASGI application"},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        role = request.user.role
+        profile = None if role == "admin" else await arole_profile(request)
+        last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id")
+        if last_event_id is not None and not last_event_id.isdigit():
+            return Response({"last_event_id": ["Must be an integer"]}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            lesson_event_stream(role, profile, None if last_event_id is None else int(last_event_id)),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Keeps nginx from buffering the stream.
+        response["X-Accel-Buffering"] = "no"
+        return response
 
 
-def _has_overlap(lesson, starts_at, ends_at):
-    teacher_overlap = Lesson.objects.filter(
-        teacher=lesson.teacher,
-        status="confirmed",
-    ).exclude(pk=lesson.pk).filter(starts_at_utc__lt=ends_at, ends_at_utc__gt=starts_at).exists()
+class LessonDetailView(ReplicaReadMixin, AsyncReadAPIView):
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, pk):
+        lesson = await aget_object_or_404(await ascoped_lessons(request), pk=pk)
+        return Response(LessonSerializer(lesson).data)
 
-    student_overlap = Lesson.objects.filter(
-        student=lesson.student,
-        status="confirmed",
-    ).exclude(pk=lesson.pk).filter(starts_at_utc__lt=ends_at, ends_at_utc__gt=starts_at).exists()
 
-    return teacher_overlap or student_overlap
+def _has_overlap(lesson, starts_at, ends_at):
+    return (
+        Lesson.objects.filter(
+            Q(teacher_id=lesson.teacher_id) | Q(student_id=lesson.student_id),
+            status="confirmed",
+            starts_at_utc__lt=ends_at,
+            ends_at_utc__gt=starts_at,
+        )
+        .exclude(pk=lesson.pk)
+        .exists()
+    )
 
 
 class LessonProposeView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherRole]
 
     def post(self, request, pk):
-        lesson = get_object_or_404(Lesson, pk=pk)
-        if lesson.teacher.user_id != request.user.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
+        lesson = get_object_or_404(scoped_lessons(request), pk=pk)
         serializer = LessonProposeSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -356,14 +818,14 @@ class LessonProposeView(APIView):
         lesson.duration_minutes = duration
         lesson.status = "proposed"
         lesson.requested_by_role = "teacher"
-        lesson.save()
-
-        LessonEventLog.objects.create(
-            lesson=lesson,
-            actor=request.user,
-            event_type="proposed",
-            payload_json={"starts_at_utc": str(starts_at), "duration_minutes": duration},
-        )
+        with transaction.atomic():
+            lesson.save()
+            record_lesson_event(
+                lesson,
+                request.user.id,
+                "proposed",
+                {"starts_at_utc": str(starts_at), "duration_minutes": duration},
+            )
 
         return Response(LessonSerializer(lesson).data)
 
@@ -372,22 +834,19 @@ class LessonConfirmView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
     def post(self, request, pk):
-        lesson = get_object_or_404(Lesson, pk=pk)
-        if request.user.role == "teacher" and lesson.teacher.user_id != request.user.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
+        lesson = get_object_or_404(scoped_lessons(request), pk=pk)
         if _has_overlap(lesson, lesson.starts_at_utc, lesson.ends_at_utc):
             return Response({"error": "Overlapping confirmed lesson"}, status=status.HTTP_400_BAD_REQUEST)
 
         lesson.status = "confirmed"
-        lesson.save()
-
-        LessonEventLog.objects.create(
-            lesson=lesson,
-            actor=request.user,
-            event_type="confirmed",
-            payload_json={},
-        )
+        try:
+            # The exclusion constraints reject a concurrent double booking
+            # that slipped in between the overlap check and this write.
+            with transaction.atomic():
+                lesson.save()
+                record_lesson_event(lesson, request.user.id, "confirmed")
+        except IntegrityError:
+            return Response({"error": "Overlapping confirmed lesson"}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(LessonSerializer(lesson).data)
 
@@ -396,18 +855,132 @@ class LessonCancelView(APIView):
     permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
 
     def post(self, request, pk):
-        lesson = get_object_or_404(Lesson, pk=pk)
-        if request.user.role == "teacher" and lesson.teacher.user_id != request.user.id:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-
+        lesson = get_object_or_404(scoped_lessons(request), pk=pk)
         lesson.status = "canceled"
-        lesson.save()
+        with transaction.atomic():
+            lesson.save()
+            record_lesson_event(lesson, request.user.id, "canceled")
+
+        return Response(LessonSerializer(lesson).data)
 
-        LessonEventLog.objects.create(
-            lesson=lesson,
-            actor=request.user,
-            event_type="canceled",
-            payload_json={},
+
+def _confirm_conflicts(lessons):
+    """
+    Returns ``{lesson id: error}`` for the lessons that cannot be confirmed
+    together: those overlapping a confirmed lesson of their teacher or
+    student, and the later of two overlapping lessons in the batch.
+
+    Confirmed lessons come from one range query; the checks are a sweep
+    over each teacher's and student's intervals sorted by start.
+    """
+    busy = defaultdict(list)
+    rows = (
+        Lesson.objects.filter(
+            Q(teacher_id__in={lesson.teacher_id for lesson in lessons})
+            | Q(student_id__in={lesson.student_id for lesson in lessons}),
+            status="confirmed",
+            starts_at_utc__lt=max(lesson.ends_at_utc for lesson in lessons),
+            ends_at_utc__gt=min(lesson.starts_at_utc for lesson in lessons),
         )
+        .exclude(pk__in=[lesson.pk for lesson in lessons])
+        .order_by("starts_at_utc")
+        .values_list("teacher_id", "student_id", "starts_at_utc", "ends_at_utc")
+    )
+    for teacher_id, student_id, starts_at, ends_at in rows:
+        busy["teacher", teacher_id].append((starts_at, ends_at))
+        busy["student", student_id].append((starts_at, ends_at))
+    # Per owner: interval starts, and the furthest end reached up to each one.
+    sweeps = {
+        key: ([start for start, _ in intervals], list(accumulate((end for _, end in intervals), max)))
+        for key, intervals in busy.items()
+    }
+
+    def overlaps_confirmed(key, lesson):
+        if key not in sweeps:
+            return False
+        starts, reach = sweeps[key]
+        position = bisect_left(starts, lesson.ends_at_utc)
+        return position > 0 and reach[position - 1] > lesson.starts_at_utc
+
+    errors = {}
+    accepted_reach = {}
+    for lesson in sorted(lessons, key=lambda lesson: (lesson.starts_at_utc, lesson.pk)):
+        keys = (("teacher", lesson.teacher_id), ("student", lesson.student_id))
+        if any(overlaps_confirmed(key, lesson) for key in keys):
+            errors[lesson.pk] = "Overlapping confirmed lesson"
+        elif any(key in accepted_reach and accepted_reach[key] > lesson.starts_at_utc for key in keys):
+            errors[lesson.pk] = "Overlaps another lesson in this batch"
+        else:
+            for key in keys:
+                accepted_reach[key] = max(accepted_reach.get(key, lesson.ends_at_utc), lesson.ends_at_utc)
+    return errors
 
-        return Response(LessonSerializer(lesson).data)
+
+class LessonBulkTransitionView(APIView):
+    """
+    Moves a batch of lessons to ``target_status`` with one locking read, one
+    UPDATE and one event INSERT. Lessons that cannot move are reported per
+    id; the rest are applied.
+    """
+
+    permission_classes = [IsAuthenticated, IsTeacherOrAdmin]
+    target_status = None
+
+    def transition_errors(self, lessons):
+        return {}
+
+    def post(self, request):
+        serializer = LessonBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+
+        try:
+            with transaction.atomic():
+                # Locked in id order so concurrent batches cannot deadlock.
+                lessons = {
+                    lesson.pk: lesson
+                    for lesson in scoped_lessons(request).select_for_update().filter(pk__in=ids).order_by("pk")
+                }
+                errors = {}
+                for pk in ids:
+                    lesson = lessons.get(pk)
+                    if lesson is None:
+                        errors[pk] = "Not found"
+                    elif lesson.status == self.target_status:
+                        errors[pk] = f"Lesson is already {self.target_status}"
+                pending = [lesson for pk, lesson in lessons.items() if pk not in errors]
+                if pending:
+                    errors.update(self.transition_errors(pending))
+                    pending = [lesson for lesson in pending if lesson.pk not in errors]
+                if pending:
+                    now = timezone.now()
+                    Lesson.objects.filter(pk__in=[lesson.pk for lesson in pending]).update(
+                        status=self.target_status, status_changed_at=now, updated_at=now
+                    )
+                    before = [lesson_state(lesson) for lesson in pending]
+                    for lesson in pending:
+                        lesson.status, lesson.status_changed_at, lesson.updated_at = self.target_status, now, now
+                        lesson._snapshot_fields()
+                    record_lesson_changes(zip(before, map(lesson_state, pending)))
+                    record_lesson_events(pending, request.user.id, self.target_status)
+        except IntegrityError:
+            # A concurrent confirmation took one of the slots after the sweep.
+            return Response({"error": "Overlapping confirmed lesson"}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            "lessons": LessonSerializer(pending, many=True).data,
+            "errors": [{"id": pk, "error": errors[pk]} for pk in ids if pk in errors],
+        }
+        return Response(data, status=status.HTTP_200_OK if pending else status.HTTP_400_BAD_REQUEST)
+
+
+class LessonBulkConfirmView(LessonBulkTransitionView):
+    target_status = "confirmed"
+
+    def transition_errors(self, lessons):
+        return _confirm_conflicts(lessons)
+
+
+class LessonBulkCancelView(LessonBulkTransitionView):
+    target_status = "canceled"
@@ -4,6 +4,22 @@ import { SESSION_COOKIE, clearSessionCookie, setSessionCookie } from "@/lib/bff/
 import { getSession, updateSession } from "@/lib/bff/sessionStore"
 import { djangoFetch, refreshAccessToken } from "@/lib/bff/django"
 
+function isEventStream(response: Response) {
+  return (response.headers.get("content-type") || "").startsWith("text/event-stream")
+}
+
+// Event streams are piped through as they arrive instead of buffered.
+function eventStreamResponse(response: Response) {
+  return new NextResponse(response.body, {
+    status: response.status,
+    headers: {
+      "Content-Type": "text/event-stream",
+      "Cache-Control": "no-cache",
+      "X-Accel-Buffering": "no",
+    },
+  })
+}
+
 async function handler(request: Request, params: { path: Promise<{ path: string[] }> | { path: string[] } }) {
   const cookieStore = await cookies()
   const sessionToken = cookieStore.get(SESSION_COOKIE)?.value
@@ -16,12 +32,15 @@ async function handler(request: Request, params: { path: Promise<{ path: string[
   const resolvedParams = "then" in params ? await params : params
   const urlPath = `/${resolvedParams.path.join("/")}/`
   const body = request.method === "GET" || request.method === "HEAD" ? undefined : await request.text()
+  const lastEventId = request.headers.get("last-event-id")
 
   let response = await djangoFetch(
     urlPath,
     {
       method: request.method,
       body,
+      headers: lastEventId ? { "Last-Event-ID": lastEventId } : undefined,
+      signal: request.signal,
     },
     session.accessToken
   )
@@ -35,9 +54,16 @@ async function handler(request: Request, params: { path: Promise<{ path: string[
         {
           method: request.method,
           body,
+          headers: lastEventId ? { "Last-Event-ID": lastEventId } : undefined,
+          signal: request.signal,
         },
         newAccessToken
       )
+      if (response.ok && isEventStream(response)) {
+        const nextResponse = eventStreamResponse(response)
+        setSessionCookie(nextResponse, newSessionToken)
+        return nextResponse
+      }
       if (response.ok) {
         const responseBody = await response.text()
         const nextResponse = new NextResponse(responseBody, {
@@ -59,6 +85,11 @@ async function handler(request: Request, params: { path: Promise<{ path: string[
   }
 
   const contentType = response.headers.get("content-type") || "application/json"
+
+  if (isEventStream(response)) {
+    return eventStreamResponse(response)
+  }
+
   const responseBody = await response.text()
 
   return new NextResponse(responseBody, {
@@ -6,22 +6,25 @@ import { Navigation } from "@/components/Navigation"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Calendar } from "lucide-react"
-import { authApi } from "@/lib/userClient"
+import { dashboardApi, subscribeLessonChanges, type StudentDashboard } from "@/lib/userClient"
 
 export default function StudentDashboardPage() {
   const router = useRouter()
-  const [userProfile, setUserProfile] = useState<{ full_name: string; email: string; role: "student" } | null>(null)
+  const [dashboard, setDashboard] = useState<StudentDashboard | null>(null)
+  const userProfile = dashboard?.user ?? null
+  const upcomingLessons = dashboard?.upcoming_lessons ?? []
 
   useEffect(() => {
-    const checkAuth = async () => {
+    const loadDashboard = async () => {
       try {
-        const response = await authApi.me()
-        setUserProfile(response.data as any)
+        const response = await dashboardApi.student()
+        setDashboard(response.data)
       } catch {
         router.push("/auth/signin")
       }
     }
-    void checkAuth()
+    void loadDashboard()
+    return subscribeLessonChanges(() => void loadDashboard())
   }, [router])
 
   return (
@@ -42,13 +45,24 @@ export default function StudentDashboardPage() {
                 <CardDescription>Your scheduled French lessons</CardDescription>
               </CardHeader>
               <CardContent>
-                <div className="text-center py-8">
-                  <Calendar className="w-12 h-12 text-gray-400 mx-auto mb-3" />
-                  <p className="text-gray-600">No upcoming lessons</p>
-                  <Button asChild className="mt-4 bg-[#4361ee] hover:bg-[#3651de]">
-                    <a href="/student/application">Check application status</a>
-                  </Button>
-                </div>
+                {upcomingLessons.length > 0 ? (
+                  <div className="space-y-3">
+                    {upcomingLessons.map((lesson) => (
+                      <div key={lesson.id} className="flex items-center justify-between p-4 border border-gray-200 rounded-lg">
+                        <span className="text-gray-900">{new Date(lesson.starts_at_utc).toLocaleString()}</span>
+                        <span className="text-sm text-gray-600">{lesson.duration_minutes} min</span>
+                      </div>
+                    ))}
+                  </div>
+                ) : (
+                  <div className="text-center py-8">
+                    <Calendar className="w-12 h-12 text-gray-400 mx-auto mb-3" />
+                    <p className="text-gray-600">No upcoming lessons</p>
+                    <Button asChild className="mt-4 bg-[#4361ee] hover:bg-[#3651de]">
+                      <a href="/student/application">Check application status</a>
+                    </Button>
+                  </div>
+                )}
               </CardContent>
             </Card>
           </div>
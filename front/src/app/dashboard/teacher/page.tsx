@@ -1,6 +1,7 @@
 import { redirect } from "next/navigation"
 import { cookies } from "next/headers"
 import { Navigation } from "@/components/Navigation"
+import { LessonEventsRefresher } from "@/components/LessonEventsRefresher"
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card"
 import { Button } from "@/components/ui/button"
 import { Calendar, Clock, Users, Star } from "lucide-react"
@@ -17,31 +18,33 @@ export default async function TeacherDashboardPage() {
   const origin = process.env.NEXT_PUBLIC_SITE_URL || "http://localhost:3000"
 
   try {
-    const userResponse = await fetch(`${origin}/api/auth/me`, {
+    const dashboardResponse = await fetch(`${origin}/api/bff/dashboard/teacher/`, {
       headers: { cookie: cookieHeader },
       cache: "no-store",
     })
 
-    if (!userResponse.ok) redirect("/auth/signin")
-    const userProfile = await userResponse.json()
-
-    if (userProfile.role !== "teacher") {
-      redirect(`/dashboard/${userProfile.role}`)
+    if (!dashboardResponse.ok) {
+      const userResponse = await fetch(`${origin}/api/auth/me`, {
+        headers: { cookie: cookieHeader },
+        cache: "no-store",
+      })
+      if (!userResponse.ok) redirect("/auth/signin")
+      const user = await userResponse.json()
+      redirect(`/dashboard/${user.role}`)
     }
 
-    const lessonsResponse = await fetch(`${origin}/api/bff/lessons/`, {
-      headers: { cookie: cookieHeader },
-      cache: "no-store",
-    })
-
-    const lessons = lessonsResponse.ok ? await lessonsResponse.json() : []
-    const upcomingLessons = lessons.filter(
-      (lesson: any) => lesson.status === "confirmed" && new Date(lesson.starts_at_utc).getTime() > Date.now()
+    const dashboard = await dashboardResponse.json()
+    const userProfile = dashboard.user
+    const upcomingLessons = dashboard.upcoming_lessons
+    const totalLessons = Object.values(dashboard.lesson_counts as Record<string, number>).reduce(
+      (total, count) => total + count,
+      0
     )
 
     return (
       <div className="min-h-screen bg-gray-50">
         <Navigation user={userProfile} />
+        <LessonEventsRefresher />
 
         <main className="container mx-auto px-4 py-8">
           <div className="mb-8">
@@ -55,7 +58,7 @@ export default async function TeacherDashboardPage() {
                 <div className="flex items-center justify-between">
                   <div>
                     <p className="text-sm text-gray-600">Total Lessons</p>
-                    <p className="text-2xl font-bold text-gray-900">{lessons.length}</p>
+                    <p className="text-2xl font-bold text-gray-900">{totalLessons}</p>
                   </div>
                   <Calendar className="w-8 h-8 text-[#4361ee]" />
                 </div>
@@ -0,0 +1,14 @@
+"use client"
+
+import { useEffect } from "react"
+import { useRouter } from "next/navigation"
+import { subscribeLessonChanges } from "@/lib/userClient"
+
+// Re-renders the surrounding server component when the caller's lessons change.
+export function LessonEventsRefresher() {
+  const router = useRouter()
+
+  useEffect(() => subscribeLessonChanges(() => router.refresh()), [router])
+
+  return null
+}
@@ -77,10 +77,20 @@ export interface TeacherProfile {
   availability_notes: string
 }
 
+export interface TeacherListItem extends TeacherProfile {
+  matched_students: number
+  requested_lessons: number
+  proposed_lessons: number
+  confirmed_lessons: number
+  canceled_lessons: number
+  completed_lessons: number
+  minutes_this_week: number | null
+}
+
 export const teacherApi = {
   me: () => apiClient.get<TeacherProfile>("/teachers/me/"),
   update: (data: Partial<TeacherProfile>) => apiClient.put<TeacherProfile>("/teachers/me/", data),
-  list: () => apiClient.get<TeacherProfile[]>("/teachers/"),
+  list: () => apiClient.get<TeacherListItem[]>("/teachers/"),
 }
 
 export interface AvailabilityBlock {
@@ -112,22 +122,174 @@ export interface Lesson {
   notes: string | null
 }
 
+export interface LessonPage {
+  next: string | null
+  results: Lesson[]
+}
+
+export interface LessonFilters {
+  status?: string
+  from?: string
+  to?: string
+  teacher?: number
+  student?: number
+  cursor?: string
+  page_size?: number
+}
+
+export interface LessonSeriesRequest {
+  starts_at_utc: string
+  duration_minutes: number
+  weekdays?: number[]
+  count?: number
+  until?: string
+  skip_conflicts?: boolean
+}
+
+export interface LessonSeriesConflict {
+  index: number
+  starts_at_utc: string
+  ends_at_utc: string
+  lesson_ids: number[]
+}
+
+export interface LessonSeriesResult {
+  lessons: Lesson[]
+  conflicts: LessonSeriesConflict[]
+}
+
+export interface LessonBulkResult {
+  lessons: Lesson[]
+  errors: { id: number; error: string }[]
+}
+
 export const lessonsApi = {
-  list: () => apiClient.get<Lesson[]>("/lessons/"),
+  list: (filters: LessonFilters = {}) => apiClient.get<LessonPage>("/lessons/", { params: filters }),
   get: (id: number) => apiClient.get<Lesson>(`/lessons/${id}/`),
   request: (data: { starts_at_utc: string; duration_minutes: number }) =>
     apiClient.post<Lesson>("/lessons/", data),
+  requestSeries: (data: LessonSeriesRequest) => apiClient.post<LessonSeriesResult>("/lessons/series/", data),
   propose: (id: number, data: { starts_at_utc: string; duration_minutes: number }) =>
     apiClient.post<Lesson>(`/lessons/${id}/propose/`, data),
   confirm: (id: number) => apiClient.post<Lesson>(`/lessons/${id}/confirm/`, {}),
   cancel: (id: number) => apiClient.post<Lesson>(`/lessons/${id}/cancel/`, {}),
+  bulkConfirm: (ids: number[]) => apiClient.post<LessonBulkResult>("/lessons/bulk/confirm/", { ids }),
+  bulkCancel: (ids: number[]) => apiClient.post<LessonBulkResult>("/lessons/bulk/cancel/", { ids }),
+}
+
+export type LessonCounts = Record<Lesson["status"], number>
+
+export interface StudentDashboard {
+  user: User
+  profile: StudentProfile
+  matched_teacher: TeacherProfile | null
+  upcoming_lessons: Lesson[]
+  lesson_counts: LessonCounts
+  pending_actions: { type: "complete_profile" | "submit_application" | "request_lesson" }[]
+}
+
+export interface TeacherDashboard {
+  user: User
+  profile: TeacherProfile
+  upcoming_lessons: Lesson[]
+  lesson_counts: LessonCounts
+  pending_actions: { type: "review_lesson_request"; lesson: Lesson }[]
+}
+
+export const dashboardApi = {
+  student: () => apiClient.get<StudentDashboard>("/dashboard/student/"),
+  teacher: () => apiClient.get<TeacherDashboard>("/dashboard/teacher/"),
+}
+
+export interface LessonEvent {
+  id: number
+  lesson: number
+  actor: number
+  event_type: string
+  payload: Record<string, unknown>
+  created_at: string
+}
+
+// Pushes the caller's lesson events as they happen; `onResync` fires when
+// too many were missed and the lesson list should be reloaded instead.
+export function subscribeLessonEvents(onEvent: (event: LessonEvent) => void, onResync?: () => void) {
+  const source = new EventSource("/api/bff/lessons/events", { withCredentials: true })
+  source.onmessage = (message) => onEvent(JSON.parse(message.data) as LessonEvent)
+  if (onResync) source.addEventListener("resync", () => onResync())
+  return () => source.close()
+}
+
+// Calls `onChange` once per burst of lesson events (a bulk confirm sends one
+// per lesson) or after a resync, so a page can reload what it shows.
+export function subscribeLessonChanges(onChange: () => void, delayMs = 300) {
+  let timer: ReturnType<typeof setTimeout> | undefined
+  const schedule = () => {
+    clearTimeout(timer)
+    timer = setTimeout(onChange, delayMs)
+  }
+  const unsubscribe = subscribeLessonEvents(schedule, schedule)
+  return () => {
+    clearTimeout(timer)
+    unsubscribe()
+  }
+}
+
+export const calendarApi = {
+  feedUrl: () => apiClient.get<{ url: string }>("/calendar/feed/"),
+  rotateFeedUrl: () => apiClient.post<{ url: string }>("/calendar/feed/", {}),
+}
+
+export interface TeacherCandidate {
+  teacher_id: number
+  email: string
+  full_name: string
+  score: number
+  level_match: number
+  track_match: number
+  availability: number
+  matched_students: number
+  weekly_available_hours: number
+}
+
+export interface ApplicationRow {
+  id: number
+  email: string
+  full_name: string
+  cefr_level: string
+  preparing_for: string
+  target_field: string
+  application_status: string
+  submitted_at: string | null
+  matched_teacher: number | null
+  completion_percent: number
+}
+
+export interface ApplicationPage {
+  next: string | null
+  results: ApplicationRow[]
+}
+
+export interface ApplicationFilters {
+  status?: string
+  cefr_level?: string
+  target_field?: string
+  preparing_for?: string
+  min_completion?: number
+  q?: string
+  ordering?: "submitted_at" | "-submitted_at" | "completion_percent" | "-completion_percent"
+  cursor?: string
+  page_size?: number
 }
 
 export const adminApi = {
-  listApplications: (status?: string) =>
-    apiClient.get<StudentProfile[]>(`/admin/applications/${status ? `?status=${encodeURIComponent(status)}` : ""}`),
+  listApplications: (filters: ApplicationFilters = {}) =>
+    apiClient.get<ApplicationPage>("/admin/applications/", { params: filters }),
   getApplication: (id: number) => apiClient.get<StudentProfile>(`/admin/applications/${id}/`),
   addNotes: (id: number, notes: string) => apiClient.post<StudentProfile>(`/admin/applications/${id}/notes/`, { notes }),
+  matchCandidates: (id: number, limit = 10) =>
+    apiClient.get<{ student_id: number; candidates: TeacherCandidate[] }>(`/admin/applications/${id}/match/`, {
+      params: { limit },
+    }),
   matchTeacher: (id: number, teacher_id: number) =>
     apiClient.post<StudentProfile>(`/admin/applications/${id}/match/`, { teacher_id }),
 }